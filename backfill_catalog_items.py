@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Script para reconstruir el modelo de lectura catalog_items de Vantage.ai
+desde las tablas products y services
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from vantage_backend import create_app
+from vantage_backend.catalog_read_model import rebuild_catalog_items
+
+def backfill_catalog_items():
+    app = create_app()
+
+    with app.app_context():
+        print("Reconstruyendo catalog_items...")
+        total = rebuild_catalog_items()
+        print(f"✅ catalog_items reconstruido: {total} items")
+
+if __name__ == "__main__":
+    backfill_catalog_items()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los filtros de /catalog/search: bitsets en memoria contra
+predicados SQL sobre catalog_items.
+
+Genera un catálogo sintético determinista (100k y 1M items por defecto),
+construye el modelo de lectura y el índice de bitsets, y mide la mediana
+de cada combinación de filtros en ambos caminos (primera página y una
+página profunda).
+
+    python benchmarks/bitset_filters.py
+    python benchmarks/bitset_filters.py --sizes 100000 --database-url postgresql://...
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vantage_backend import create_app
+from vantage_backend.models import db
+from vantage_backend.catalog_read_model import search_catalog_items
+from vantage_backend.bitset_index import bitset_index
+from benchmarks.synthetic_catalog import generate_catalog
+from benchmarks.search_suite import BenchmarkConfig
+
+
+FILTER_MIX = [
+    ('sin filtros', {}),
+    ('tipo', {'type': 'servicio'}),
+    ('categoría', {'category_id': 7}),
+    ('categoría + ISO 9001', {'category_id': 7, 'has_cert_iso9001': True}),
+    ('ISO 9001 + ISO 14001', {'has_cert_iso9001': True, 'has_cert_iso14001': True}),
+    ('destacados', {'is_featured': True}),
+    ('proveedor + ISO 9001', {'provider_id': 123, 'has_cert_iso9001': True}),
+    ('producto + categoría + ISO 14001', {'type': 'producto', 'category_id': 3, 'has_cert_iso14001': True}),
+]
+
+
+def _median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run(n_items, database_url, repeat, per_page):
+    config = type('Config', (BenchmarkConfig,), {'SQLALCHEMY_DATABASE_URI': database_url or 'sqlite://'})
+    app = create_app(config)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        generate_catalog(n_items)
+        print(f"\n=== {n_items:,} items (generados en {time.perf_counter() - started:.1f}s) ===")
+
+        started = time.perf_counter()
+        bitset_index.rebuild()
+        stats = bitset_index.stats()
+        print(f"Índice de bitsets: {time.perf_counter() - started:.2f}s, "
+              f"{stats['bitsets']} bitsets, {stats['bytes'] / 1024 / 1024:.1f} MiB")
+
+        print(f"{'filtros':36} {'página':>6} {'total':>9} {'SQL ms':>9} {'bitset ms':>10} {'x':>6}")
+        for label, filters in FILTER_MIX:
+            for page in (1, 50):
+                sql_refs, total = search_catalog_items(filters, None, page, per_page)
+                bitset_refs, bitset_total = bitset_index.search(filters, None, page, per_page)
+                assert bitset_total == total, (label, bitset_total, total)
+                sql_ms = _median_ms(lambda: search_catalog_items(filters, None, page, per_page), repeat)
+                bitset_ms = _median_ms(lambda: bitset_index.search(filters, None, page, per_page), repeat)
+                print(f"{label:36} {page:>6} {total:>9,} {sql_ms:>9.2f} {bitset_ms:>10.2f} {sql_ms / bitset_ms:>6.1f}")
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--database-url', default=os.environ.get('BENCHMARK_DATABASE_URL'))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--per-page', type=int, default=12)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.database_url, args.repeat, args.per_page)
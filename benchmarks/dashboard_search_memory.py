@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria del buscador IA del dashboard (índice invertido).
+
+Para cada tamaño de catálogo sintético mide con tracemalloc:
+
+- el sobrecosto transitorio de reconstruir el índice (pico menos lo que
+  queda retenido en el índice), que con yield_per depende del tamaño del
+  lote y no del catálogo; como referencia, lo que ocupa cargar todas las
+  filas de una vez (buffered_rows_mb);
+- el pico de cada búsqueda de la mezcla y el tamaño del resultado, acotado
+  por el top-k por nivel.
+
+    python benchmarks/dashboard_search_memory.py
+    python benchmarks/dashboard_search_memory.py --sizes 10000 50000 --output memoria.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vantage_backend import create_app
+from vantage_backend.models import db
+from vantage_backend.catalog_indexes import document_rows, ITEM_TYPES
+from vantage_backend.search_index import catalog_search_index
+from benchmarks.synthetic_catalog import generate_catalog
+from benchmarks.search_suite import BenchmarkConfig, QUERY_MIX, git_commit
+
+MB = 1024 * 1024
+
+
+def _traced(function):
+    """(resultado, memoria retenida MB, pico MB) de una llamada"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        result = function()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current / MB, peak / MB
+
+
+def run(n_items, database_url, k):
+    config = type('Config', (BenchmarkConfig,), {'SQLALCHEMY_DATABASE_URI': database_url or 'sqlite://'})
+    app = create_app(config)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        generate_catalog(n_items)
+
+        _rows, buffered, _peak = _traced(lambda: [row for item_type in ITEM_TYPES for row in document_rows(item_type).all()])
+        del _rows
+
+        catalog_search_index.invalidate()
+        started = time.perf_counter()
+        _count, retained, peak = _traced(catalog_search_index.rebuild)
+        result = {
+            'items': n_items,
+            'rebuild_s': round(time.perf_counter() - started, 2),
+            'index_mb': round(retained, 1),
+            'rebuild_transient_mb': round(peak - retained, 1),
+            'buffered_rows_mb': round(buffered, 1),
+            'searches': []
+        }
+
+        for entry in QUERY_MIX:
+            (exact, near), _retained, peak = _traced(lambda: catalog_search_index.search(entry['q'], k=k))
+            result['searches'].append({
+                'q': entry['q'],
+                'peak_mb': round(peak, 2),
+                'results': len(exact) + len(near)
+            })
+        result['search_peak_mb'] = max(search['peak_mb'] for search in result['searches'])
+        db.session.remove()
+        db.drop_all()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000, 100000])
+    parser.add_argument('--database-url', default=os.environ.get('BENCHMARK_DATABASE_URL'))
+    parser.add_argument('--k', type=int, default=50, help='resultados por nivel')
+    parser.add_argument('--output', default='-', help="archivo JSON de salida ('-' = stdout)")
+    args = parser.parse_args()
+
+    runs = []
+    for size in args.sizes:
+        print(f"[BENCH] {size:,} items...", file=sys.stderr)
+        runs.append(run(size, args.database_url, args.k))
+        print(f"  índice {runs[-1]['index_mb']} MB, transitorio {runs[-1]['rebuild_transient_mb']} MB "
+              f"(filas completas: {runs[-1]['buffered_rows_mb']} MB), pico búsqueda {runs[-1]['search_peak_mb']} MB",
+              file=sys.stderr)
+
+    payload = json.dumps({'commit': git_commit(), 'k': args.k, 'runs': runs}, indent=2, ensure_ascii=False)
+    if args.output == '-':
+        print(payload)
+    else:
+        with open(args.output, 'w') as handle:
+            handle.write(payload + '\n')
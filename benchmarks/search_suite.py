@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Suite de rendimiento de las búsquedas del catálogo.
+
+Para cada tamaño (10k, 100k y 1M items por defecto) genera un catálogo
+sintético determinista, construye los índices en memoria y ejecuta una
+mezcla fija de consultas contra cada camino de búsqueda:
+
+    catalog_search     GET  /catalog/search?q=...
+    dashboard_ia       POST /api/ia/search-catalog
+    public_products    GET  /catalog/public/products?search=...
+    public_services    GET  /catalog/public/services?search=...
+
+Reporta latencia p50/p95/p99, consultas SQL por request y el pico de RSS.
+Cada tamaño corre en un proceso aparte para que el pico de memoria sea el
+de ese catálogo. La salida es JSON (con el commit actual) para comparar
+regresiones entre commits:
+
+    python -m benchmarks.search_suite --output bench.json
+    python -m benchmarks.search_suite --sizes 10000 --repeat 3 --output -
+    python -m benchmarks.search_suite --compare base.json bench.json
+
+Las cachés de resultados quedan desactivadas salvo con --warm-caches, así
+se mide el camino de búsqueda y no la caché.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+PATHS = ('catalog_search', 'dashboard_ia', 'public_products', 'public_services')
+
+# Mezcla fija: consultas populares, multi-término, con errores de tipeo y con filtros
+QUERY_MIX = [
+    {'q': 'bomba'},
+    {'q': 'bomba centrífuga acero inoxidable'},
+    {'q': 'válvula de bola', 'category': 8},
+    {'q': 'mantenimiento preventivo compresores', 'type': 'servicio'},
+    {'q': 'calibración instrumentación', 'iso9001': True},
+    {'q': 'guante dieléctrico', 'category': 6},
+    {'q': 'motr trifasico'},
+    {'q': 'variador de frecuencia', 'featured': True},
+    {'q': 'termografía tableros eléctricos'},
+    {'q': 'rodamiento de rodillos para minería', 'iso9001': True, 'category': 9},
+]
+
+
+class BenchmarkConfig:
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JWT_SECRET_KEY = 'benchmark'
+    SEMANTIC_INDEX_PATH = None
+    CATALOG_RESPONSE_CACHE_ENABLED = False
+    CATALOG_TOTALS_CACHE_SIZE = 0
+    CATALOG_SEARCH_CACHE_SIZE = 0
+
+
+def _request_args(path, entry):
+    """Traducir una entrada de QUERY_MIX a los parámetros de cada endpoint"""
+    if path == 'dashboard_ia':
+        return {'query': entry['q']}
+    if path == 'catalog_search':
+        args = {'q': entry['q'], 'type': entry.get('type', 'all')}
+        if entry.get('category'):
+            args['category'] = entry['category']
+        if entry.get('iso9001'):
+            args['has_cert_iso9001'] = 'true'
+        if entry.get('featured'):
+            args['is_featured'] = 'true'
+        return args
+    args = {'search': entry['q']}
+    if entry.get('category'):
+        args['category_id'] = entry['category']
+    if entry.get('featured'):
+        args['is_featured'] = 'true'
+    return args
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def peak_rss_mb():
+    """Pico de memoria residente del proceso (ru_maxrss es KiB en Linux y bytes en macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(n_items, database_url=None, repeat=5, seed=42, warm_caches=False):
+    """Generar un catálogo de n_items y medir cada camino; devuelve el resultado como dict"""
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event
+    from vantage_backend import create_app
+    from vantage_backend.models import db, User
+    from vantage_backend.catalog_indexes import catalog_indexes
+    from benchmarks.synthetic_catalog import generate_catalog
+
+    overrides = {'SQLALCHEMY_DATABASE_URI': database_url or 'sqlite://'}
+    if warm_caches:
+        overrides.update(CATALOG_RESPONSE_CACHE_ENABLED=True, CATALOG_TOTALS_CACHE_SIZE=2048,
+                         CATALOG_SEARCH_CACHE_SIZE=1024)
+    app = create_app(type('Config', (BenchmarkConfig,), overrides))
+    result = {'items': n_items, 'seed': seed}
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        generate_catalog(n_items, seed=seed)
+        result['generate_s'] = round(time.perf_counter() - started, 2)
+
+        started = time.perf_counter()
+        for index in catalog_indexes:
+            index.rebuild()
+        result['index_build_s'] = round(time.perf_counter() - started, 2)
+        result['rss_after_build_mb'] = peak_rss_mb()
+
+        user = User(email='cliente@bench.test', password_hash='x', role='cliente', status='activo')
+        db.session.add(user)
+        db.session.commit()
+        headers = {'Authorization': f"Bearer {create_access_token(identity=str(user.id))}"}
+        # Aplicar cualquier cambio pendiente antes de medir
+        for index in catalog_indexes:
+            index.refresh()
+
+        statements = []
+        engine = db.engine
+        counter = lambda *args, **kwargs: statements.append(1)
+        event.listen(engine, 'before_cursor_execute', counter)
+        client = app.test_client()
+        # Los endpoints imprimen trazas; se descartan para no ensuciar la salida
+        sink = open(os.devnull, 'w')
+        paths = {}
+        try:
+            for path in PATHS:
+                latencies, per_request = [], []
+                for _ in range(repeat):
+                    for entry in QUERY_MIX:
+                        args = _request_args(path, entry)
+                        statements.clear()
+                        with contextlib.redirect_stdout(sink):
+                            started = time.perf_counter()
+                            if path == 'dashboard_ia':
+                                response = client.post('/api/ia/search-catalog', json=args, headers=headers)
+                            elif path == 'catalog_search':
+                                response = client.get('/catalog/search', query_string=args)
+                            else:
+                                response = client.get(f"/catalog/public/{path.split('_')[1]}", query_string=args)
+                            elapsed = (time.perf_counter() - started) * 1000
+                        if response.status_code != 200:
+                            raise RuntimeError(f"{path} {args}: HTTP {response.status_code}")
+                        latencies.append(elapsed)
+                        per_request.append(len(statements))
+                paths[path] = {
+                    'requests': len(latencies),
+                    'p50_ms': round(_percentile(latencies, 50), 2),
+                    'p95_ms': round(_percentile(latencies, 95), 2),
+                    'p99_ms': round(_percentile(latencies, 99), 2),
+                    'queries_per_request': round(sum(per_request) / len(per_request), 2),
+                    'max_queries': max(per_request),
+                    'peak_rss_mb': peak_rss_mb(),
+                }
+        finally:
+            event.remove(engine, 'before_cursor_execute', counter)
+            sink.close()
+        result['paths'] = paths
+        result['peak_rss_mb'] = peak_rss_mb()
+        db.session.remove()
+        db.drop_all()
+    return result
+
+
+def _run_isolated(n_items, args):
+    """Ejecutar un tamaño en un proceso nuevo para aislar su pico de RSS"""
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as handle:
+        result_path = handle.name
+    command = [sys.executable, '-m', 'benchmarks.search_suite', '--child', str(n_items),
+               '--result-file', result_path, '--repeat', str(args.repeat), '--seed', str(args.seed)]
+    if args.database_url:
+        command += ['--database-url', args.database_url]
+    if args.warm_caches:
+        command.append('--warm-caches')
+    try:
+        # La salida del hijo va a stderr: stdout queda reservado para el JSON
+        subprocess.run(command, cwd=ROOT, check=True, stdout=sys.stderr)
+        with open(result_path) as handle:
+            return json.load(handle)
+    finally:
+        os.unlink(result_path)
+
+
+def compare(base, current, threshold=0.2):
+    """Filas (tamaño, camino, métrica, antes, después, cambio) que empeoran más que threshold"""
+    regressions = []
+    base_sizes = {run['items']: run for run in base['runs']}
+    for run in current['runs']:
+        previous = base_sizes.get(run['items'])
+        if not previous:
+            continue
+        for path, metrics in run['paths'].items():
+            before = previous['paths'].get(path)
+            if not before:
+                continue
+            for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request', 'peak_rss_mb'):
+                if before[metric] and metrics[metric] > before[metric] * (1 + threshold):
+                    change = metrics[metric] / before[metric] - 1
+                    regressions.append((run['items'], path, metric, before[metric], metrics[metric], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--database-url', default=os.environ.get('BENCHMARK_DATABASE_URL'))
+    parser.add_argument('--repeat', type=int, default=5, help='pasadas por la mezcla de consultas')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--warm-caches', action='store_true', help='medir con las cachés de resultados activas')
+    parser.add_argument('--output', default='-', help="archivo JSON de salida ('-' = stdout)")
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'ACTUAL'),
+                        help='comparar dos salidas y listar regresiones (> --threshold)')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as base, open(args.compare[1]) as current:
+            regressions = compare(json.load(base), json.load(current), args.threshold)
+        for items, path, metric, before, after, change in regressions:
+            print(f"{items:>9,} {path:16} {metric:20} {before:>10} -> {after:<10} (+{change:.0%})")
+        return 1 if regressions else 0
+
+    if args.child:
+        result = run_size(args.child, args.database_url, args.repeat, args.seed, args.warm_caches)
+        with open(args.result_file, 'w') as handle:
+            json.dump(result, handle)
+        return 0
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'database': (args.database_url or 'sqlite://').split(':', 1)[0],
+        'repeat': args.repeat,
+        'warm_caches': args.warm_caches,
+        'query_mix': QUERY_MIX,
+        'runs': [],
+    }
+    for size in args.sizes:
+        print(f"[BENCH] {size:,} items...", file=sys.stderr)
+        report['runs'].append(_run_isolated(size, args))
+
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output == '-':
+        print(payload)
+    else:
+        with open(args.output, 'w') as handle:
+            handle.write(payload + '\n')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Catálogos sintéticos deterministas con vocabulario industrial en español.
+
+generate_catalog(n) inserta proveedores, categorías, productos y servicios
+con inserciones masivas (sin eventos del ORM) y reconstruye catalog_items.
+La misma semilla produce siempre el mismo catálogo, para poder comparar
+mediciones entre commits.
+"""
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from vantage_backend.models import db, User, ProviderProfile, Category, Product, Service
+from vantage_backend.catalog_read_model import rebuild_catalog_items
+
+CHUNK = 10000
+
+CATEGORIES = [
+    'Hidráulica', 'Neumática', 'Eléctrica', 'Automatización', 'Seguridad industrial', 'EPP',
+    'Bombas', 'Válvulas', 'Rodamientos', 'Transmisión de potencia', 'Instrumentación', 'Soldadura',
+    'Herramientas', 'Lubricación', 'Filtración', 'Climatización', 'Minería', 'Tuberías',
+    'Iluminación', 'Control de procesos',
+]
+
+PRODUCT_NOUNS = [
+    'Bomba', 'Válvula', 'Compresor', 'Motor', 'Rodamiento', 'Reductor', 'Variador de frecuencia',
+    'Manómetro', 'Sensor', 'Cilindro', 'Filtro', 'Manguera', 'Acople', 'Guante', 'Casco', 'Arnés',
+    'Cable', 'Tablero', 'Contactor', 'Transformador', 'Correa', 'Cadena', 'Electrodo', 'Esmeril',
+    'Taladro', 'Luminaria', 'Caudalímetro', 'Termocupla', 'Intercambiador', 'Ventilador',
+]
+PRODUCT_QUALIFIERS = [
+    'centrífuga', 'sumergible', 'de diafragma', 'de bola', 'de compuerta', 'de mariposa', 'trifásico',
+    'monofásico', 'de rodillos', 'blindado', 'antideslizante', 'dieléctrico', 'de alta presión',
+    'industrial', 'para minería', 'antiexplosivo', 'de acero inoxidable', 'de PVC', 'de bronce', 'LED',
+]
+MATERIALS = ['acero inoxidable 316', 'hierro fundido', 'bronce', 'PVC', 'polipropileno', 'aluminio', 'nitrilo', 'poliuretano']
+STANDARDS = ['ISO 9001', 'IP67', 'IP65', 'NCh 1258', 'ANSI B16.5', 'IEC 60947', 'EN 388', 'ATEX']
+
+SERVICE_ACTIONS = [
+    'Mantenimiento preventivo', 'Mantenimiento correctivo', 'Calibración', 'Inspección', 'Reparación',
+    'Instalación', 'Montaje', 'Capacitación', 'Auditoría', 'Análisis de vibraciones', 'Termografía',
+    'Asesoría técnica', 'Puesta en marcha', 'Soporte remoto',
+]
+SERVICE_TARGETS = [
+    'bombas centrífugas', 'compresores', 'tableros eléctricos', 'válvulas de control', 'motores eléctricos',
+    'sistemas hidráulicos', 'redes neumáticas', 'equipos de climatización', 'instrumentación',
+    'correas transportadoras', 'subestaciones', 'sistemas contra incendio', 'calderas', 'grúas horquilla',
+]
+MODALITIES = ['Presencial', 'Remoto', 'Híbrido']
+
+COMPANY_PREFIXES = ['Hidro', 'Electro', 'Servi', 'Indus', 'Tecno', 'Mineral', 'Flu', 'Termo', 'Mecano', 'Valvu']
+COMPANY_SUFFIXES = ['Andes', 'Sur', 'Pacífico', 'Norte', 'Austral', 'Central', 'Atacama', 'Maule']
+COMPANY_FORMS = ['SpA', 'Ltda.', 'S.A.', 'EIRL']
+
+
+def _provider_name(rng, index):
+    return f"{rng.choice(COMPANY_PREFIXES)}{rng.choice(COMPANY_SUFFIXES).lower()} {rng.choice(COMPANY_FORMS)} {index}"
+
+
+def _product_row(rng, item_id, n_providers, start):
+    noun, qualifier = rng.choice(PRODUCT_NOUNS), rng.choice(PRODUCT_QUALIFIERS)
+    material, standard = rng.choice(MATERIALS), rng.choice(STANDARDS)
+    return {
+        'id': item_id,
+        'provider_id': rng.randint(1, n_providers),
+        'category_id': rng.randint(1, len(CATEGORIES)),
+        'name': f"{noun} {qualifier} {rng.randint(1, 400)}",
+        'description': f"{noun} {qualifier} fabricado en {material}, apto para operación continua en faena.",
+        'technical_details': f"Material {material}; norma {standard}; presión máx. {rng.randint(2, 40)} bar",
+        'sku': f"{noun[:3].upper()}-{item_id:07d}",
+        'price': round(rng.uniform(10, 25000), 2),
+        'currency': 'USD',
+        'status': rng.choices(('activo', 'borrador', 'inactivo'), (90, 7, 3))[0],
+        'is_featured': rng.random() < 0.02,
+        'has_cert_iso9001': rng.random() < 0.3,
+        'has_cert_iso14001': rng.random() < 0.1,
+        'created_at': start + timedelta(seconds=rng.randint(0, 86400 * 700)),
+    }
+
+
+def _service_row(rng, item_id, n_providers, start):
+    action, target = rng.choice(SERVICE_ACTIONS), rng.choice(SERVICE_TARGETS)
+    return {
+        'id': item_id,
+        'provider_id': rng.randint(1, n_providers),
+        'category_id': rng.randint(1, len(CATEGORIES)),
+        'name': f"{action} de {target}",
+        'description': f"{action} de {target} con técnicos certificados y reporte en 48 horas.",
+        'modality': rng.choice(MODALITIES),
+        'price': round(rng.uniform(50, 8000), 2),
+        'currency': 'USD',
+        'status': rng.choices(('activo', 'borrador', 'inactivo'), (90, 7, 3))[0],
+        'is_featured': rng.random() < 0.02,
+        'has_cert_iso9001': rng.random() < 0.3,
+        'has_cert_iso14001': rng.random() < 0.1,
+        'created_at': start + timedelta(seconds=rng.randint(0, 86400 * 700)),
+    }
+
+
+def generate_catalog(n_items, seed=42, n_providers=None):
+    """
+    Poblar la base con n_items items (60% productos, 40% servicios).
+
+    Devuelve el número de proveedores creados. La base debe estar vacía.
+    """
+    rng = random.Random(seed)
+    n_providers = n_providers or max(50, min(2000, n_items // 200))
+    start = datetime(2023, 1, 1)
+
+    db.session.execute(insert(User.__table__), [
+        {'id': i, 'email': f'proveedor{i}@bench.test', 'password_hash': 'x', 'role': 'proveedor', 'status': 'activo'}
+        for i in range(1, n_providers + 1)
+    ])
+    db.session.execute(insert(ProviderProfile.__table__), [
+        {'id': i, 'user_id': i, 'company_name': _provider_name(rng, i)} for i in range(1, n_providers + 1)
+    ])
+    db.session.execute(insert(Category.__table__), [
+        {'id': i, 'name': name} for i, name in enumerate(CATEGORIES, start=1)
+    ])
+
+    n_products = n_items * 6 // 10
+    for model, count, make_row in ((Product, n_products, _product_row), (Service, n_items - n_products, _service_row)):
+        for first in range(1, count + 1, CHUNK):
+            rows = [make_row(rng, item_id, n_providers, start) for item_id in range(first, min(first + CHUNK, count + 1))]
+            db.session.execute(insert(model.__table__), rows)
+    db.session.commit()
+    rebuild_catalog_items()
+    return n_providers
@@ -0,0 +1,121 @@
+"""
+Fixtures compartidos para las pruebas que levantan la app en proceso
+contra una base SQLite en memoria.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+
+from vantage_backend import create_app
+from vantage_backend.models import db, User, ProviderProfile, Category, Product, Service
+
+
+class InMemoryConfig:
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JWT_SECRET_KEY = 'vantage-test-secret-key-for-pytest-runs'
+    SEMANTIC_INDEX_PATH = None
+
+
+@pytest.fixture
+def app():
+    app = create_app(InMemoryConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    """Cabeceras Authorization con un JWT para el usuario dado"""
+    def _auth_headers(user):
+        return {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+    return _auth_headers
+
+
+@pytest.fixture
+def make_user(app, auth_headers):
+    """Crear un usuario (y su perfil si es proveedor) y devolver (user, headers)"""
+    def _make_user(role='cliente', email=None, company_name=None):
+        user = User(
+            email=email or f"{role}{User.query.count() + 1}@vantage.test",
+            password_hash='x',
+            full_name=f"Usuario {role}",
+            role=role,
+            status='activo'
+        )
+        db.session.add(user)
+        db.session.flush()
+        if role == 'proveedor':
+            db.session.add(ProviderProfile(user_id=user.id, company_name=company_name or f"Proveedor {user.id}"))
+        db.session.commit()
+        return user, auth_headers(user)
+    return _make_user
+
+
+@pytest.fixture
+def seed_catalog(app, make_user):
+    """Poblar el catálogo con n productos y n servicios activos repartidos en 3 proveedores y 3 categorías"""
+    def _seed(n_products=0, n_services=0, featured_every=0):
+        providers = []
+        for _ in range(3):
+            user, _headers = make_user('proveedor')
+            providers.append(user.provider_profile)
+        categories = [Category(name=name) for name in ('Hidráulica', 'Eléctrica', 'Seguridad')]
+        db.session.add_all(categories)
+        db.session.flush()
+
+        for i in range(n_products):
+            db.session.add(Product(
+                provider_id=providers[i % 3].id,
+                category_id=categories[i % 3].id,
+                name=f"Bomba hidráulica {i:04d}",
+                description=f"Descripción del producto {i}",
+                technical_details="Caudal 120 l/min",
+                sku=f"SKU-{i:05d}",
+                price=float(100 + i),
+                status='activo',
+                is_featured=bool(featured_every and i % featured_every == 0)
+            ))
+        for i in range(n_services):
+            db.session.add(Service(
+                provider_id=providers[i % 3].id,
+                category_id=categories[i % 3].id,
+                name=f"Mantenimiento preventivo {i:04d}",
+                description=f"Descripción del servicio {i}",
+                modality=('Presencial', 'Remoto')[i % 2],
+                price=float(50 + i),
+                status='activo',
+                is_featured=bool(featured_every and i % featured_every == 0)
+            ))
+        db.session.commit()
+        return providers, categories
+    return _seed
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager que cuenta las sentencias SQL emitidas dentro del bloque"""
+    @contextmanager
+    def _count():
+        statements = []
+
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', _before_cursor_execute)
+    return _count
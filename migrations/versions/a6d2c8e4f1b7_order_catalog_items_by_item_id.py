@@ -0,0 +1,44 @@
+"""order_catalog_items_by_item_id
+
+Revision ID: a6d2c8e4f1b7
+Revises: f3a9c1d7e5b2
+Create Date: 2026-10-17 23:41:27.518306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2c8e4f1b7'
+down_revision = 'f3a9c1d7e5b2'
+branch_labels = None
+depends_on = None
+
+
+# /catalog/search desempata por (item_id, item_type) en vez del id de la
+# fila, que cambia cada vez que se reproyecta el item
+INDEX_NAME = 'ix_catalog_items_status_created_at'
+NEW_COLUMNS = ['status', 'created_at', 'item_id', 'item_type']
+OLD_COLUMNS = ['status', 'created_at', 'id']
+
+
+def _replace_index(columns):
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.drop_index(INDEX_NAME, table_name='catalog_items')
+        op.create_index(INDEX_NAME, 'catalog_items', columns)
+        return
+
+    # Ver add_hot_path_indexes: CONCURRENTLY fuera de la transacción
+    with op.get_context().autocommit_block():
+        op.drop_index(INDEX_NAME, table_name='catalog_items', postgresql_concurrently=True, if_exists=True)
+        op.create_index(INDEX_NAME, 'catalog_items', columns, postgresql_concurrently=True)
+
+
+def upgrade():
+    _replace_index(NEW_COLUMNS)
+
+
+def downgrade():
+    _replace_index(OLD_COLUMNS)
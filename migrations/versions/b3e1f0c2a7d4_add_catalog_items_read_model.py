@@ -0,0 +1,72 @@
+"""add_catalog_items_read_model
+
+Revision ID: b3e1f0c2a7d4
+Revises: 5a8c655b9f0d
+Create Date: 2026-10-17 10:12:31.204118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e1f0c2a7d4'
+down_revision = '5a8c655b9f0d'
+branch_labels = None
+depends_on = None
+
+
+BACKFILL_SQL = """
+INSERT INTO catalog_items (
+    item_type, item_id, provider_id, provider_name, category_id, category_name,
+    name, sku, modality, status, price, currency,
+    has_cert_iso9001, has_cert_iso14001, is_featured, created_at
+)
+SELECT '{item_type}', i.id, i.provider_id, p.company_name, i.category_id, c.name,
+       i.name, {sku}, {modality}, i.status, i.price, i.currency,
+       i.has_cert_iso9001, i.has_cert_iso14001, i.is_featured, i.created_at
+FROM {table} i
+LEFT JOIN providers_profile p ON p.id = i.provider_id
+LEFT JOIN categories c ON c.id = i.category_id
+"""
+
+
+def upgrade():
+    # Modelo de lectura desnormalizado para /catalog/search
+    op.create_table('catalog_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('item_type', sa.String(length=16), nullable=False),
+        sa.Column('item_id', sa.Integer(), nullable=False),
+        sa.Column('provider_id', sa.Integer(), nullable=False),
+        sa.Column('provider_name', sa.String(), nullable=True),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('category_name', sa.String(), nullable=True),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('sku', sa.String(), nullable=True),
+        sa.Column('modality', sa.String(), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=True),
+        sa.Column('price', sa.Float(), nullable=True),
+        sa.Column('currency', sa.String(), nullable=True),
+        sa.Column('has_cert_iso9001', sa.Boolean(), nullable=True),
+        sa.Column('has_cert_iso14001', sa.Boolean(), nullable=True),
+        sa.Column('is_featured', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('item_type', 'item_id')
+    )
+    op.create_index('ix_catalog_items_status_created_at', 'catalog_items', ['status', 'created_at', 'id'])
+    op.create_index('ix_catalog_items_status_category_id', 'catalog_items', ['status', 'category_id', 'created_at'])
+    op.create_index('ix_catalog_items_status_provider_id', 'catalog_items', ['status', 'provider_id', 'created_at'])
+    op.create_index('ix_catalog_items_status_is_featured', 'catalog_items', ['status', 'is_featured', 'created_at'])
+
+    # Backfill desde las tablas actuales
+    op.execute(BACKFILL_SQL.format(item_type='producto', table='products', sku='i.sku', modality='NULL'))
+    op.execute(BACKFILL_SQL.format(item_type='servicio', table='services', sku='NULL', modality='i.modality'))
+
+
+def downgrade():
+    op.drop_index('ix_catalog_items_status_is_featured', table_name='catalog_items')
+    op.drop_index('ix_catalog_items_status_provider_id', table_name='catalog_items')
+    op.drop_index('ix_catalog_items_status_category_id', table_name='catalog_items')
+    op.drop_index('ix_catalog_items_status_created_at', table_name='catalog_items')
+    op.drop_table('catalog_items')
@@ -0,0 +1,83 @@
+"""add_full_text_search_vectors
+
+Revision ID: c71d2e8f9a10
+Revises: b3e1f0c2a7d4
+Create Date: 2026-10-17 11:03:48.551920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71d2e8f9a10'
+down_revision = 'b3e1f0c2a7d4'
+branch_labels = None
+depends_on = None
+
+
+# Columnas ponderadas de cada tabla: (columna, peso)
+SEARCH_COLUMNS = {
+    'products': [('name', 'A'), ('sku', 'A'), ('description', 'B'), ('technical_details', 'C')],
+    'services': [('name', 'A'), ('description', 'B')],
+}
+
+
+def _vector_expression(table, prefix):
+    return ' || '.join(
+        f"setweight(to_tsvector('spanish_unaccent', coalesce({prefix}{column}, '')), '{weight}')"
+        for column, weight in SEARCH_COLUMNS[table]
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        # SQLite (desarrollo) sigue usando ILIKE
+        return
+
+    # Configuración en español que ignora tildes
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'spanish_unaccent') THEN
+                CREATE TEXT SEARCH CONFIGURATION spanish_unaccent (COPY = spanish);
+                ALTER TEXT SEARCH CONFIGURATION spanish_unaccent
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+            END IF;
+        END
+        $$
+    """)
+
+    for table, columns in SEARCH_COLUMNS.items():
+        column_names = ', '.join(column for column, _weight in columns)
+        op.execute(f"ALTER TABLE {table} ADD COLUMN search_vector tsvector")
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {_vector_expression(table, 'NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {column_names} ON {table}
+            FOR EACH ROW EXECUTE PROCEDURE {table}_search_vector_update()
+        """)
+        op.execute(f"UPDATE {table} SET search_vector = {_vector_expression(table, '')}")
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], postgresql_using='gin')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for table in SEARCH_COLUMNS:
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+        op.drop_column(table, 'search_vector')
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS spanish_unaccent")
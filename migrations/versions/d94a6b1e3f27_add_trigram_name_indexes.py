@@ -0,0 +1,48 @@
+"""add_trigram_name_indexes
+
+Revision ID: d94a6b1e3f27
+Revises: c71d2e8f9a10
+Create Date: 2026-10-17 11:47:12.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd94a6b1e3f27'
+down_revision = 'c71d2e8f9a10'
+branch_labels = None
+depends_on = None
+
+
+# (índice, tabla, columna) para la búsqueda aproximada por trigramas
+TRIGRAM_INDEXES = [
+    ('ix_products_name_trgm', 'products', 'name'),
+    ('ix_products_sku_trgm', 'products', 'sku'),
+    ('ix_services_name_trgm', 'services', 'name'),
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        # SQLite (desarrollo) corrige la consulta con el diccionario ortográfico
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            index_name, table, [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for index_name, table, _column in TRIGRAM_INDEXES:
+        op.drop_index(index_name, table_name=table)
@@ -0,0 +1,28 @@
+"""add_catalog_items_search_tokens
+
+Revision ID: e5f0a7c3b2d8
+Revises: d94a6b1e3f27
+Create Date: 2026-10-17 20:05:41.552310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f0a7c3b2d8'
+down_revision = 'd94a6b1e3f27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Términos analizados de cada item (text_analysis). Los calcula la
+    # aplicación: después de migrar, ejecutar backfill_catalog_items.py
+    with op.batch_alter_table('catalog_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_tokens', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('catalog_items', schema=None) as batch_op:
+        batch_op.drop_column('search_tokens')
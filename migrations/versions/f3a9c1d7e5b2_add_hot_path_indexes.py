@@ -0,0 +1,60 @@
+"""add_hot_path_indexes
+
+Revision ID: f3a9c1d7e5b2
+Revises: e5f0a7c3b2d8
+Create Date: 2026-10-17 22:14:09.731842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9c1d7e5b2'
+down_revision = 'e5f0a7c3b2d8'
+branch_labels = None
+depends_on = None
+
+
+# (índice, tabla, columnas) de los filtros frecuentes de los blueprints.
+# providers_profile(user_id) ya queda indexado por su restricción UNIQUE.
+HOT_PATH_INDEXES = [
+    ('ix_products_status_category_id', 'products', ['status', 'category_id', 'created_at']),
+    ('ix_products_provider_id', 'products', ['provider_id', 'status']),
+    ('ix_services_status_category_id', 'services', ['status', 'category_id', 'created_at']),
+    ('ix_services_provider_id', 'services', ['provider_id', 'status']),
+    ('ix_quote_requests_client_user_id_created_at', 'quote_requests', ['client_user_id', 'created_at', 'id']),
+    ('ix_quote_requests_provider_id_created_at', 'quote_requests', ['provider_id', 'created_at', 'id']),
+    ('ix_quote_requests_provider_id_status', 'quote_requests', ['provider_id', 'status', 'created_at']),
+    ('ix_quote_responses_quote_request_id', 'quote_responses', ['quote_request_id']),
+    ('ix_quote_attachments_quote_request_id', 'quote_attachments', ['quote_request_id']),
+    ('ix_notifications_recipient_id_is_read', 'notifications', ['recipient_id', 'is_read', 'created_at']),
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        for index_name, table, columns in HOT_PATH_INDEXES:
+            op.create_index(index_name, table, columns)
+        return
+
+    # CONCURRENTLY no bloquea escrituras pero no puede correr dentro de una
+    # transacción. Si una construcción falla queda un índice INVALID: se
+    # elimina antes de reintentar, por eso el DROP ... IF EXISTS previo.
+    with op.get_context().autocommit_block():
+        for index_name, table, columns in HOT_PATH_INDEXES:
+            op.drop_index(index_name, table_name=table, postgresql_concurrently=True, if_exists=True)
+            op.create_index(index_name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        for index_name, table, _columns in HOT_PATH_INDEXES:
+            op.drop_index(index_name, table_name=table)
+        return
+
+    with op.get_context().autocommit_block():
+        for index_name, table, _columns in HOT_PATH_INDEXES:
+            op.drop_index(index_name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Pruebas del presupuesto de latencia y el circuit breaker de la etapa IA de
+/catalog/search, contra un servidor de embeddings local (lento, con fallos y
+recuperándose)
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from vantage_backend.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitTimeoutError
+from vantage_backend.semantic_index import semantic_index, semantic_breaker, OpenAIEmbedder, HashingEmbedder
+from vantage_backend.search_cache import search_result_cache
+
+
+class _EmbeddingsHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        stub = self.server
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        stub.requests += 1
+        if stub.mode == 'fail':
+            self.send_response(500)
+            self.end_headers()
+            return
+        if stub.mode == 'slow':
+            time.sleep(stub.delay)
+        vectors = stub.embedder.embed(payload['input'])
+        body = json.dumps({'data': [{'index': i, 'embedding': vector.tolist()} for i, vector in enumerate(vectors)]})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def embedding_stub(app):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _EmbeddingsHandler)
+    server.daemon_threads = True
+    server.mode, server.delay, server.requests = 'ok', 1.0, 0
+    server.embedder = HashingEmbedder(dim=64)
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    semantic_index.configure(embedder=OpenAIEmbedder(base_url=server.url, api_key='test', timeout=5))
+    semantic_breaker.configure(failure_threshold=2, reset_timeout=0.3)
+    semantic_breaker.reset()
+    app.config['SEARCH_AI_BUDGET_MS'] = 300
+    yield server
+    server.shutdown()
+    semantic_index.configure(embedder=HashingEmbedder())
+
+
+def _ai_stage(client):
+    # La etapa IA se salta con la lista cacheada; aquí se mide siempre
+    search_result_cache.clear()
+    search_info = client.get('/catalog/search?q=bomba%20hidraulica').get_json()['data']['search_info']
+    return search_info['ai_search_used'], search_info['ai_stage']
+
+
+def test_breaker_transitions():
+    now = [0.0]
+    breaker = CircuitBreaker('prueba', failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+
+    breaker.record_failure('timeout')
+    assert breaker.allow()
+    breaker.record_failure('timeout')
+    assert breaker.state == 'open' and not breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: 'no se llama')
+
+    now[0] = 10
+    assert breaker.allow()          # una sola prueba half-open
+    assert not breaker.allow()
+    breaker.record_failure('timeout')
+    assert breaker.state == 'open'
+
+    now[0] = 20
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.snapshot()['state'] == 'closed'
+    started = time.perf_counter()
+    with pytest.raises(CircuitTimeoutError):
+        breaker.call(lambda: time.sleep(0.3), budget=0.02)
+    assert time.perf_counter() - started < 0.2      # no espera a que la llamada termine
+    assert breaker.snapshot()['failures'] == 1
+
+
+def test_slow_service_opens_breaker_and_recovers(client, seed_catalog, embedding_stub):
+    seed_catalog(n_products=3)
+
+    used, stage = _ai_stage(client)
+    assert used is True
+    assert stage['breaker']['state'] == 'closed' and stage['fallback'] is False
+
+    embedding_stub.mode = 'slow'
+    for _ in range(2):
+        used, stage = _ai_stage(client)
+        assert used is False and stage['fallback'] is True
+        assert stage['elapsed_ms'] < 900     # el presupuesto corta la espera de 1 s
+    assert stage['breaker']['state'] == 'open'
+
+    requests_before = embedding_stub.requests
+    _used, stage = _ai_stage(client)
+    assert stage['fallback'] is True and stage['elapsed_ms'] < 50
+    assert embedding_stub.requests == requests_before
+
+    embedding_stub.mode = 'ok'
+    time.sleep(0.35)
+    used, stage = _ai_stage(client)
+    assert used is True
+    assert stage['breaker']['state'] == 'closed'
+
+
+def test_failing_service_falls_back_to_structured_search(client, seed_catalog, embedding_stub):
+    seed_catalog(n_products=4)
+    semantic_index.refresh()
+    embedding_stub.mode = 'fail'
+
+    for _ in range(3):
+        data = client.get('/catalog/search?q=bomba').get_json()['data']
+        assert data['pagination']['total'] == 4
+
+    stage = data['search_info']['ai_stage']
+    assert stage['breaker']['state'] == 'open'
+    assert '500' in stage['breaker']['last_error']
+    assert stage['breaker']['rejected'] == 1
+
+
+class _SlowDocumentsEmbedder(HashingEmbedder):
+    """Embedder lento solo al re-embeber filas del catálogo (sin timeout), como una API remota"""
+    def embed(self, texts, timeout=None):
+        if timeout is None:
+            time.sleep(0.6)
+        return super().embed(texts, timeout)
+
+
+def test_pending_writes_are_applied_outside_the_budget_and_breaker(client, app, seed_catalog):
+    from vantage_backend.models import db, Product
+    providers, _categories = seed_catalog(n_products=3)
+    semantic_index.configure(embedder=_SlowDocumentsEmbedder())
+    semantic_breaker.reset()
+    app.config['SEARCH_AI_BUDGET_MS'] = 300
+    try:
+        semantic_index.refresh()
+        db.session.add(Product(provider_id=providers[0].id, name='Compresor de tornillo', status='activo'))
+        db.session.commit()
+
+        search_info = client.get('/catalog/search?q=compresor%20tornillo').get_json()['data']['search_info']
+        stage = search_info['ai_stage']
+        assert stage['stale'] is True and stage['fallback'] is False
+        assert stage['elapsed_ms'] < 450
+        assert stage['breaker']['failures'] == 0 and stage['breaker']['state'] == 'closed'
+        assert search_info['cached'] is False and len(search_result_cache) == 0
+
+        semantic_index._refresher.join()
+        data = client.get('/catalog/search?q=compresor%20tornillo').get_json()['data']
+        assert data['search_info']['ai_stage']['stale'] is False
+        assert data['items'][0]['name'] == 'Compresor de tornillo'
+    finally:
+        semantic_index.configure(embedder=HashingEmbedder())
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la consulta por lotes de items del catálogo
+"""
+from vantage_backend.models import db, Product
+
+
+def test_batch_preserves_order_with_two_queries(client, seed_catalog, count_queries):
+    seed_catalog(n_products=200, n_services=200)
+    refs = [f"servicio:{i}" for i in range(150, 0, -1)] + [f"producto:{i}" for i in range(1, 151)]
+
+    with count_queries() as statements:
+        response = client.post('/catalog/public/items', json={'ids': refs})
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert [f"{item['type']}:{item['id']}" for item in data['items']] == refs
+    assert data['missing'] == []
+    assert len(statements) == 2
+
+
+def test_batch_get_reports_missing_and_inactive(client, seed_catalog):
+    seed_catalog(n_products=3)
+    product = db.session.get(Product, 2)
+    product.status = 'inactivo'
+    db.session.commit()
+
+    data = client.get('/catalog/public/items?ids=producto:3,producto:2,servicio:99,producto:1&fields=name').get_json()
+
+    assert [item['id'] for item in data['items']] == [3, 1]
+    assert set(data['items'][0]) == {'id', 'name'}
+    assert data['missing'] == ['producto:2', 'servicio:99']
+
+
+def test_batch_rejects_bad_refs_and_oversized_requests(client):
+    assert client.get('/catalog/public/items?ids=producto:abc').status_code == 400
+    assert client.post('/catalog/public/items', json={'ids': 'producto:1'}).status_code == 400
+    refs = [f"producto:{i}" for i in range(1, 502)]
+    assert client.post('/catalog/public/items', json={'ids': refs}).status_code == 400
+
+
+def test_ai_dashboard_search_resolves_matches_in_batch(client, seed_catalog, make_user, count_queries):
+    seed_catalog(n_products=20, n_services=20, featured_every=5)
+    _user, headers = make_user('cliente')
+
+    with count_queries() as statements:
+        data = client.post('/api/ia/search-catalog', json={'query': 'bomba hidráulica'}, headers=headers).get_json()
+
+    assert len(data['exact_matches']) == 20
+    assert {item['type'] for item in data['exact_matches']} == {'producto'}
+    first = data['exact_matches'][0]
+    assert first['is_featured'] is True
+    assert first['provider'].startswith('Proveedor') and first['category'] == 'Hidráulica'
+    assert 'reasoning' in first and 'sku' in first
+    # las coincidencias se resuelven con una sola consulta IN de productos
+    assert sum('FROM products' in s and 'IN (' in s for s in statements) == 1
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Pruebas del índice de bitsets de los filtros de baja cardinalidad
+"""
+from datetime import datetime, timedelta
+from vantage_backend.models import db, Product, Service
+from vantage_backend.bitset_index import Bitset, bitset_index
+from vantage_backend.catalog_read_model import search_catalog_items, rebuild_catalog_items
+
+
+def test_bitset_operations():
+    evens = Bitset.from_ids(range(0, 200, 2))
+    thirds = Bitset.from_ids(range(0, 300, 3))
+
+    assert (evens & thirds).ids().tolist() == list(range(0, 200, 6))
+    assert (evens | thirds).count() == len(set(range(0, 200, 2)) | set(range(0, 300, 3)))
+    evens.add(1001)
+    evens.discard(4)
+    assert 1001 in evens and 4 not in evens and 5000 not in evens
+
+
+def _spread_created_at():
+    # Fechas distintas para que ambos caminos compartan un orden sin empates
+    start = datetime(2024, 1, 1)
+    for offset, item in enumerate(Product.query.all() + Service.query.all()):
+        item.created_at = start + timedelta(minutes=(offset * 37) % 101)
+    db.session.commit()
+    rebuild_catalog_items()
+
+
+def test_matches_sql_predicate_path(app, seed_catalog):
+    providers, categories = seed_catalog(n_products=40, n_services=35, featured_every=4)
+    for item in Product.query.filter(Product.id % 3 == 0):
+        item.has_cert_iso9001 = True
+    Service.query.get(2).status = 'inactivo'
+    _spread_created_at()
+
+    combinations = [
+        {},
+        {'type': 'servicio'},
+        {'category_id': categories[1].id, 'is_featured': True},
+        {'provider_id': providers[2].id, 'has_cert_iso9001': True},
+        {'type': 'producto', 'has_cert_iso14001': True},
+    ]
+    for filters in combinations:
+        for page in (1, 3):
+            assert bitset_index.search(filters, None, page, 7) == search_catalog_items(filters, None, page, 7), filters
+
+    ranked = [('servicio', 2), ('producto', 9), ('servicio', 5), ('producto', 4)]
+    assert bitset_index.search({}, ranked, 1, 10) == search_catalog_items({}, ranked, 1, 10)
+
+
+def test_equal_dates_tie_break_the_same_way_in_both_paths(app, seed_catalog):
+    seed_catalog(n_products=4, n_services=4)
+    for item in Product.query.all() + Service.query.all():
+        item.created_at = datetime(2024, 1, 1)
+    db.session.commit()
+    rebuild_catalog_items()
+    # Reproyectar un item cambia el id de su fila en catalog_items, no su lugar
+    db.session.get(Product, 1).name = 'Bomba editada'
+    db.session.commit()
+    bitset_index.rebuild()
+
+    expected = [(item_type, item_id) for item_id in range(4, 0, -1) for item_type in ('producto', 'servicio')]
+    for page in (1, 2, 3):
+        sql_refs, _total = search_catalog_items({}, None, page, 3)
+        bitset_refs, _total = bitset_index.search({}, None, page, 3)
+        assert sql_refs == bitset_refs == expected[(page - 1) * 3:page * 3]
+
+
+def test_incremental_updates_and_listing_totals(client, seed_catalog, make_user):
+    _providers, categories = seed_catalog(n_services=6)
+    _provider, headers = make_user('proveedor')
+    _admin, admin_headers = make_user('administrador')
+
+    def total(params):
+        return client.get(f'/catalog/public/services?{params}').get_json()['pagination']['total_items']
+
+    assert total(f'category_id={categories[0].id}') == 2
+    assert total('modality=Remoto') == 3
+
+    client.post('/catalog/services', json={'name': 'Inspección', 'modality': 'Remoto', 'status': 'activo'}, headers=headers)
+    assert total('modality=Remoto') == 4
+
+    client.put('/catalog/admin/services/1/feature', json={'is_featured': True}, headers=admin_headers)
+    assert total('is_featured=true') == 1
+    assert total('is_featured=false') == 6
+
+
+def test_sql_path_can_be_selected(app, client, seed_catalog):
+    seed_catalog(n_products=5, n_services=5)
+    app.config['CATALOG_BITSET_FILTERS'] = False
+
+    data = client.get('/catalog/search?type=producto').get_json()['data']
+
+    assert data['pagination']['total'] == 5
+    assert bitset_index.stats()['built'] is False
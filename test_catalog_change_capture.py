@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la captura de cambios de productos y servicios desde la sesión
+(deltas a índices y cachés, reconstrucción periódica y métrica de lag)
+"""
+import threading
+
+import pytest
+from sqlalchemy import insert
+
+from vantage_backend import catalog_events
+from vantage_backend.models import db, Product
+from vantage_backend.search_index import InvertedIndex, catalog_search_index
+
+
+@pytest.fixture
+def captured_changes(app):
+    changes = []
+    catalog_events.on_catalog_change(changes.append)
+    yield changes
+    catalog_events._listeners.remove(changes.append)
+
+
+def _names(query):
+    exact, _near = catalog_search_index.search(query)
+    return {name for _ref, name in exact}
+
+
+def test_orm_writes_outside_endpoints_reach_the_index(seed_catalog, captured_changes):
+    providers, categories = seed_catalog(n_products=2)
+    catalog_search_index.refresh()
+    captured_changes.clear()
+
+    db.session.add(Product(provider_id=providers[0].id, category_id=categories[0].id,
+                           name='Compresor de tornillo', status='activo'))
+    db.session.commit()
+
+    assert [(change.item_type, change.fields) for change in captured_changes] == [('producto', None)]
+    assert 'Compresor de tornillo' in _names('compresor')
+
+
+def test_flushes_are_merged_into_one_change_per_item(seed_catalog, captured_changes):
+    seed_catalog(n_products=1)
+    product = Product.query.first()
+    captured_changes.clear()
+
+    product.name = 'Bomba renombrada'
+    db.session.flush()
+    product.is_featured = True
+    db.session.flush()
+    product.name = product.name    # sin cambios: no agrega columnas
+    db.session.commit()
+
+    assert len(captured_changes) == 1
+    assert captured_changes[0].item_id == product.id
+    assert captured_changes[0].fields == {'name', 'is_featured'}
+
+
+def test_rollback_discards_captured_changes(seed_catalog, captured_changes):
+    seed_catalog(n_products=1)
+    captured_changes.clear()
+    version = catalog_events.catalog_version()
+
+    Product.query.first().name = 'No confirmado'
+    db.session.flush()
+    db.session.rollback()
+    db.session.commit()
+
+    assert captured_changes == []
+    assert catalog_events.catalog_version() == version
+
+
+def test_periodic_rebuild_picks_up_writes_outside_the_session(seed_catalog, monkeypatch):
+    providers, _categories = seed_catalog(n_products=1)
+    now = [1000.0]
+    monkeypatch.setattr(catalog_search_index, '_clock', lambda: now[0])
+    monkeypatch.setattr(catalog_search_index, 'rebuild_interval', 60)
+    catalog_search_index.rebuild()
+
+    db.session.execute(insert(Product.__table__), [
+        {'provider_id': providers[0].id, 'name': 'Válvula de compuerta', 'status': 'activo'}
+    ])
+    db.session.commit()
+    assert _names('compuerta') == set()
+
+    now[0] += 61
+    # La reconstrucción corre en segundo plano: la consulta usa el índice anterior
+    assert _names('compuerta') == set()
+    catalog_search_index._rebuilder.join()
+    assert _names('compuerta') == {'Válvula de compuerta'}
+    assert catalog_search_index.maintenance_stats()['last_rebuild_age_s'] == 0
+
+
+def test_writes_during_a_background_rebuild_are_applied_to_the_new_index(seed_catalog, monkeypatch):
+    seed_catalog(n_products=2)
+    now = [1000.0]
+    monkeypatch.setattr(catalog_search_index, '_clock', lambda: now[0])
+    monkeypatch.setattr(catalog_search_index, 'rebuild_interval', 60)
+    catalog_search_index.rebuild()
+
+    built, release = threading.Event(), threading.Event()
+    rebuild = InvertedIndex._rebuild
+
+    def slow_rebuild(index):
+        rebuild(index)
+        built.set()
+        release.wait(5)
+
+    monkeypatch.setattr(InvertedIndex, '_rebuild', slow_rebuild)
+    now[0] += 61
+    catalog_search_index.refresh()
+    assert built.wait(5)
+    assert catalog_search_index.maintenance_stats()['rebuilding'] is True
+
+    # Escritura confirmada después de que la copia leyó el catálogo: el índice actual la aplica
+    Product.query.first().name = 'Compresor de tornillo'
+    db.session.commit()
+    assert _names('compresor') == {'Compresor de tornillo'}
+
+    release.set()
+    catalog_search_index._rebuilder.join()
+    stats = catalog_search_index.maintenance_stats()
+    assert stats['rebuilding'] is False and stats['pending'] == 1
+    assert _names('compresor') == {'Compresor de tornillo'}
+
+
+def test_metrics_report_index_lag(client, seed_catalog, make_user, monkeypatch):
+    seed_catalog(n_products=2)
+    catalog_search_index.refresh()
+    now = [500.0]
+    monkeypatch.setattr(catalog_search_index, '_clock', lambda: now[0])
+    _admin, headers = make_user('administrador')
+
+    client.put(f"/catalog/admin/products/{Product.query.first().id}/feature", json={'is_featured': True}, headers=headers)
+    now[0] += 0.25
+    stats = client.get('/catalog/admin/metrics', headers=headers).get_json()['indexes']['inverted']
+    assert stats['pending'] == 1
+    assert stats['lag_ms'] == 250.0
+
+    deltas = stats['delta_updates']
+    catalog_search_index.search('bomba')
+    stats = catalog_search_index.maintenance_stats()
+    assert stats['pending'] == 0 and stats['lag_ms'] == 0.0
+    assert stats['last_lag_ms'] == 250.0
+    assert stats['delta_updates'] == deltas + 1
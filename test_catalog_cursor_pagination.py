@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la paginación por cursor (keyset) en los listados públicos
+"""
+
+import pytest
+
+from vantage_backend.models import db, Product
+
+
+def _walk(client, url):
+    """Recorrer todas las páginas siguiendo next_cursor"""
+    ids, cursor, pages = [], '', 0
+    while cursor is not None:
+        data = client.get(f"{url}&cursor={cursor}").get_json()
+        ids.extend(item['id'] for item in data.get('products', data.get('services', [])))
+        cursor = data['pagination']['next_cursor']
+        pages += 1
+        assert pages < 100
+    return ids
+
+
+@pytest.mark.parametrize('sort_by', ['name', 'price', 'created_at', 'provider', 'category'])
+@pytest.mark.parametrize('sort_order', ['asc', 'desc'])
+def test_cursor_walk_covers_every_product_once(client, seed_catalog, sort_by, sort_order):
+    providers, _categories = seed_catalog(n_products=23)
+    # Un producto sin precio ni categoría ejercita el tramo de NULLs
+    db.session.add(Product(provider_id=providers[0].id, name='Sin precio', status='activo'))
+    db.session.commit()
+
+    ids = _walk(client, f"/catalog/public/products?per_page=5&sort_by={sort_by}&sort_order={sort_order}")
+
+    assert len(ids) == 24
+    assert len(set(ids)) == 24
+
+
+def test_cursor_order_matches_page_mode(client, seed_catalog):
+    seed_catalog(n_services=17)
+
+    ids = _walk(client, "/catalog/public/services?per_page=4&sort_by=price&sort_order=desc")
+    page_ids = [
+        s['id'] for s in client.get("/catalog/public/services?per_page=50&sort_by=price&sort_order=desc").get_json()['services']
+    ]
+
+    assert ids == page_ids
+
+
+def test_cursor_mode_skips_count(client, seed_catalog, count_queries):
+    seed_catalog(n_products=10)
+
+    with count_queries() as statements:
+        data = client.get("/catalog/public/products?per_page=3&cursor=").get_json()
+
+    assert data['pagination']['has_next'] is True
+    assert 'total_items' not in data['pagination']
+    assert not any('count(' in statement.lower() for statement in statements)
+
+
+def test_cursor_from_other_sort_is_rejected(client, seed_catalog):
+    seed_catalog(n_products=10)
+
+    cursor = client.get("/catalog/public/products?per_page=3&cursor=&sort_by=price").get_json()['pagination']['next_cursor']
+
+    assert client.get(f"/catalog/public/products?cursor={cursor}&sort_by=name").status_code == 400
+    assert client.get("/catalog/public/products?cursor=no-es-un-cursor").status_code == 400
+
+
+def test_page_mode_still_works(client, seed_catalog):
+    seed_catalog(n_products=10)
+
+    data = client.get("/catalog/public/products?page=2&per_page=4").get_json()
+
+    assert data['pagination']['current_page'] == 2
+    assert data['pagination']['total_items'] == 10
+    assert len(data['products']) == 4
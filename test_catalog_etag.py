@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Pruebas de ETag / If-None-Match en los endpoints públicos del catálogo
+"""
+
+from sqlalchemy import update
+
+from vantage_backend import catalog_cache
+from vantage_backend.catalog_events import catalog_version
+from vantage_backend.models import db, Product
+
+
+def test_unchanged_listing_returns_304_without_queries(client, seed_catalog, count_queries):
+    seed_catalog(n_products=5)
+
+    first = client.get('/catalog/public/products?per_page=3')
+    etag = first.headers['ETag']
+    with count_queries() as statements:
+        second = client.get('/catalog/public/products?per_page=3', headers={'If-None-Match': etag})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.headers['ETag'] == etag
+    assert statements == []
+
+
+def test_catalog_write_bumps_version_and_etag(client, seed_catalog, make_user):
+    seed_catalog(n_products=2)
+    _provider, headers = make_user('proveedor')
+
+    etag = client.get('/catalog/public/featured').headers['ETag']
+    version = catalog_version()
+
+    client.post('/catalog/products', json={"name": "Válvula", "status": "activo"}, headers=headers)
+
+    assert catalog_version() > version
+    response = client.get('/catalog/public/featured', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_etag_expires_after_ttl_for_writes_this_process_missed(client, seed_catalog, monkeypatch):
+    seed_catalog(n_products=2)
+    now = [960_000.0]    # inicio de una ventana de 60 s
+    monkeypatch.setattr(catalog_cache, '_clock', lambda: now[0])
+    url = '/catalog/public/products?per_page=5'
+    etag = client.get(url).headers['ETag']
+
+    # Escritura fuera de la sesión (como la de otro worker): la versión no cambia
+    db.session.execute(update(Product.__table__).values(name='Renombrado por otro proceso'))
+    db.session.commit()
+    catalog_cache.response_cache.clear()
+
+    now[0] += 30
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    now[0] += 31
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert {product['name'] for product in response.get_json()['products']} == {'Renombrado por otro proceso'}
+
+
+def test_etag_differs_per_query(client, seed_catalog):
+    seed_catalog(n_products=5)
+
+    page_1 = client.get('/catalog/public/products?page=1&per_page=2').headers['ETag']
+    page_2 = client.get('/catalog/public/products?page=2&per_page=2').headers['ETag']
+
+    assert page_1 != page_2
+    assert client.get('/catalog/public/products?page=2&per_page=2', headers={'If-None-Match': page_1}).status_code == 200
+
+
+def test_detail_validator_follows_updated_at_and_provider(client, seed_catalog, auth_headers, count_queries):
+    providers, _categories = seed_catalog(n_products=3)
+    headers = auth_headers(providers[0].user)
+    product = Product.query.filter_by(provider_id=providers[0].id).first()
+    url = f'/catalog/public/products/{product.id}'
+
+    etag = client.get(url).headers['ETag']
+    with count_queries() as statements:
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    assert len(statements) == 1
+
+    client.put(f'/catalog/products/{product.id}', json={"description": "Nueva descripción"}, headers=headers)
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    client.put('/provider/profile', json={"about_us": "Nuevo texto"}, headers=headers)
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['provider']['about_us'] == 'Nuevo texto'
+
+
+def test_missing_detail_is_404(client):
+    assert client.get('/catalog/public/services/999').status_code == 404
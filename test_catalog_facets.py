@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Pruebas de los conteos por faceta de la búsqueda y los listados del catálogo
+"""
+from vantage_backend.models import db, Product, Service
+from vantage_backend.catalog_facets import parse_facets, listing_facet_source, compute_facets
+
+
+def _certify(model, ids, **flags):
+    for item in model.query.filter(model.id.in_(ids)):
+        for name, value in flags.items():
+            setattr(item, name, value)
+    db.session.commit()
+
+
+def test_parse_facets(app):
+    assert parse_facets({'facets': 'cert, category,bogus'}) == ['category', 'cert']
+    assert parse_facets({'facets': 'modality,featured'}, Product) == ['featured']
+    assert parse_facets({'facets': 'all'}, Service) == ['category', 'provider', 'modality', 'cert', 'featured']
+    assert parse_facets({}) is None
+
+
+def test_product_listing_facets(client, seed_catalog):
+    providers, categories = seed_catalog(n_products=7, featured_every=3)
+    _certify(Product, [1, 2, 3], has_cert_iso9001=True)
+    _certify(Product, [3], has_cert_iso14001=True)
+
+    data = client.get('/catalog/public/products?facets=category,provider,cert,featured').get_json()
+
+    facets = data['facets']
+    assert facets['category'] == [
+        {'id': categories[0].id, 'name': 'Hidráulica', 'count': 3},
+        {'id': categories[1].id, 'name': 'Eléctrica', 'count': 2},
+        {'id': categories[2].id, 'name': 'Seguridad', 'count': 2},
+    ]
+    assert [entry['count'] for entry in facets['provider']] == [3, 2, 2]
+    assert facets['provider'][0]['name'] == providers[0].company_name
+    assert facets['cert'] == {'iso9001': 3, 'iso14001': 1}
+    assert facets['featured'] == 3
+    assert 'modality' not in facets
+
+
+def test_facets_follow_filters_and_omitted_without_request(client, seed_catalog):
+    _providers, categories = seed_catalog(n_services=6)
+
+    data = client.get(f'/catalog/public/services?facets=modality,category&category_id={categories[0].id}').get_json()
+
+    assert data['facets']['category'] == [{'id': categories[0].id, 'name': 'Hidráulica', 'count': 2}]
+    assert data['facets']['modality'] == [{'value': 'Presencial', 'count': 1}, {'value': 'Remoto', 'count': 1}]
+    assert 'facets' not in client.get('/catalog/public/services').get_json()
+
+
+def test_all_facets_in_a_single_statement(app, seed_catalog, count_queries):
+    seed_catalog(n_services=9)
+
+    with count_queries() as statements:
+        facets = compute_facets(listing_facet_source(Service, {}), ['category', 'provider', 'modality', 'cert', 'featured'])
+
+    assert len(statements) == 1
+    assert sum(entry['count'] for entry in facets['category']) == 9
+    assert facets['cert'] == {'iso9001': 0, 'iso14001': 0}
+
+
+def test_catalog_search_facets(client, seed_catalog):
+    seed_catalog(n_products=4, n_services=2)
+    _certify(Service, [1], has_cert_iso14001=True)
+
+    data = client.get('/catalog/search?type=servicio&facets=modality,cert').get_json()['data']
+
+    assert data['facets']['modality'] == [{'value': 'Presencial', 'count': 1}, {'value': 'Remoto', 'count': 1}]
+    assert data['facets']['cert'] == {'iso9001': 0, 'iso14001': 1}
+    assert client.get('/catalog/search').get_json()['data']['facets'] is None
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Pruebas de los fieldsets (?fields=) en los listados públicos y la búsqueda
+"""
+
+
+def _page_query(statements, table):
+    """La sentencia SELECT de la página (la que lleva LIMIT) sobre la tabla dada"""
+    return next(
+        statement for statement in statements
+        if statement.lstrip().upper().startswith('SELECT') and f'FROM {table}' in statement and 'LIMIT' in statement
+    )
+
+
+def test_listing_query_skips_omitted_text_columns(client, seed_catalog, count_queries):
+    seed_catalog(n_products=5)
+
+    with count_queries() as statements:
+        data = client.get('/catalog/public/products?fields=name,price,provider').get_json()
+
+    page_query = _page_query(statements, 'products')
+    assert 'products.description' not in page_query
+    assert 'products.technical_details' not in page_query
+    assert 'categories' not in page_query
+    assert 'products.price' in page_query
+    product = data['products'][0]
+    assert set(product) == {'id', 'name', 'price', 'provider'}
+    assert product['provider']['company_name'].startswith('Proveedor')
+
+
+def test_listing_without_fields_returns_full_payload(client, seed_catalog, count_queries):
+    seed_catalog(n_services=3)
+
+    with count_queries() as statements:
+        service = client.get('/catalog/public/services').get_json()['services'][0]
+
+    assert 'services.description' in _page_query(statements, 'services')
+    assert {'description', 'modality', 'provider', 'category', 'created_at'} <= set(service)
+
+
+def test_fieldset_works_with_cursor_and_sort_columns(client, seed_catalog):
+    seed_catalog(n_products=7)
+
+    first = client.get('/catalog/public/products?fields=name&sort_by=price&per_page=4&cursor=').get_json()
+    cursor = first['pagination']['next_cursor']
+    second = client.get(f'/catalog/public/products?fields=name&sort_by=price&per_page=4&cursor={cursor}').get_json()
+
+    ids = [p['id'] for p in first['products'] + second['products']]
+    assert len(set(ids)) == 7
+    assert set(first['products'][0]) == {'id', 'name'}
+
+
+def test_unknown_fields_are_ignored(client, seed_catalog):
+    seed_catalog(n_products=2)
+
+    product = client.get('/catalog/public/products?fields=name,password_hash').get_json()['products'][0]
+
+    assert set(product) == {'id', 'name'}
+
+
+def test_search_fieldset(client, seed_catalog, count_queries):
+    seed_catalog(n_products=3, n_services=3)
+
+    with count_queries() as statements:
+        items = client.get('/catalog/search?fields=name,type').get_json()['data']['items']
+
+    assert {tuple(sorted(item)) for item in items} == {('id', 'name', 'type')}
+    hydration = [statement for statement in statements if 'FROM products' in statement or 'FROM services' in statement]
+    assert hydration
+    assert not any('products.technical_details' in s or 'services.description' in s for s in hydration)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la búsqueda de texto completo de los listados públicos
+"""
+from sqlalchemy.dialects import postgresql
+from vantage_backend import catalog_queries
+from vantage_backend.catalog_queries import apply_listing_filters, apply_sort, catalog_query
+from vantage_backend.models import Product, Service
+
+
+def _postgres_sql(query):
+    return str(query.statement.compile(dialect=postgresql.dialect()))
+
+
+def test_postgres_uses_tsvector_and_ts_rank(app, monkeypatch):
+    monkeypatch.setattr(catalog_queries, 'full_text_enabled', lambda: True)
+    filters = {'search': 'Bombas hidráu-licas!'}
+
+    query = apply_listing_filters(catalog_query(Product), Product, filters)
+    query = apply_sort(query, Product, 'relevance', 'asc', filters)
+    sql = _postgres_sql(query)
+
+    assert 'products.search_vector @@ to_tsquery' in sql
+    assert 'ILIKE' not in sql.upper()
+    assert 'ORDER BY ts_rank(products.search_vector' in sql
+    params = query.statement.compile(dialect=postgresql.dialect()).params
+    assert 'bombas:* & hidráu:* & licas:*' in params.values()
+
+
+def test_explicit_sort_overrides_relevance(app, monkeypatch):
+    monkeypatch.setattr(catalog_queries, 'full_text_enabled', lambda: True)
+    filters = {'search': 'remoto'}
+
+    query = apply_listing_filters(catalog_query(Service), Service, filters)
+    sql = _postgres_sql(apply_sort(query, Service, 'price', 'desc', filters))
+
+    assert 'services.search_vector @@' in sql
+    assert 'ts_rank' not in sql
+    assert 'ORDER BY services.price DESC' in sql
+
+
+def test_sqlite_falls_back_to_ilike(client, seed_catalog):
+    seed_catalog(n_products=5, n_services=4)
+
+    products = client.get('/catalog/public/products?search=sku-0000').get_json()['products']
+    services = client.get('/catalog/public/services?search=PREVENTIVO 0003').get_json()['services']
+
+    assert [p['name'] for p in products] == [f"Bomba hidráulica {i:04d}" for i in range(5)]
+    assert [s['name'] for s in services] == ['Mantenimiento preventivo 0003']
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la ficha de proveedor cacheada en los detalles de producto y servicio
+"""
+from datetime import date
+from vantage_backend.models import db, ProviderContact, ProviderCertification
+from vantage_backend.provider_cards import provider_card_cache
+
+
+def _provider_queries(statements):
+    return [s for s in statements if 'FROM providers_profile' in s or 'FROM provider_contacts' in s
+            or 'FROM provider_certifications' in s]
+
+
+def test_card_is_shared_across_items_of_same_provider(client, seed_catalog, count_queries):
+    providers, _categories = seed_catalog(n_products=6, n_services=6)
+    db.session.add(ProviderContact(provider_id=providers[0].id, name='Ana', email='ana@hidro.cl', is_primary=True))
+    db.session.add(ProviderCertification(provider_id=providers[0].id, name='ISO 9001', expiry_date=date(2027, 1, 1)))
+    db.session.commit()
+
+    first = client.get('/catalog/public/products/1').get_json()
+    with count_queries() as statements:
+        product = client.get('/catalog/public/products/4').get_json()
+        service = client.get('/catalog/public/services/1').get_json()
+
+    assert _provider_queries(statements) == []
+    assert product['provider'] == service['provider'] == first['provider']
+    assert product['provider']['contacts'][0]['email'] == 'ana@hidro.cl'
+    assert product['provider']['certifications'][0]['expiry_date'] == '2027-01-01'
+    assert product['category']['name'] == 'Hidráulica'
+    assert provider_card_cache.stats()['hits'] == 2
+
+
+def test_profile_update_invalidates_card_and_etag(client, make_user):
+    _user, headers = make_user('proveedor', company_name='Hidro Andes')
+    product_id = client.post('/catalog/products', json={'name': 'Válvula', 'status': 'activo'}, headers=headers).get_json()['product_id']
+
+    first = client.get(f'/catalog/public/products/{product_id}')
+    client.put('/provider/profile', json={'about_us': 'Bombas desde 1990'}, headers=headers)
+    second = client.get(f'/catalog/public/products/{product_id}', headers={'If-None-Match': first.headers['ETag']})
+
+    assert second.status_code == 200
+    assert second.get_json()['provider']['about_us'] == 'Bombas desde 1990'
+
+
+def test_contact_and_certification_changes_invalidate_card(client, seed_catalog):
+    providers, _categories = seed_catalog(n_products=3)
+    provider_id = providers[0].id
+
+    assert client.get('/catalog/public/products/1').get_json()['provider']['contacts'] == []
+
+    contact = ProviderContact(provider_id=provider_id, name='Luis', email='luis@hidro.cl')
+    db.session.add(contact)
+    db.session.commit()
+    assert [c['name'] for c in client.get('/catalog/public/products/1').get_json()['provider']['contacts']] == ['Luis']
+
+    db.session.add(ProviderCertification(provider_id=provider_id, name='ISO 14001'))
+    db.session.delete(contact)
+    db.session.commit()
+    card = client.get('/catalog/public/products/1').get_json()['provider']
+    assert card['contacts'] == []
+    assert [c['name'] for c in card['certifications']] == ['ISO 14001']
+
+
+def test_rolled_back_changes_do_not_invalidate(client, seed_catalog):
+    providers, _categories = seed_catalog(n_products=1)
+    client.get('/catalog/public/products/1')
+
+    db.session.add(ProviderContact(provider_id=providers[0].id, name='Temporal'))
+    db.session.flush()
+    db.session.rollback()
+
+    assert provider_card_cache.stats()['invalidations'] == 0
+    assert client.get('/catalog/public/products/1').get_json()['provider']['contacts'] == []
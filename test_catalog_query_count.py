@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Pruebas del número de consultas por request en los listados públicos del catálogo
+"""
+
+import pytest
+
+from vantage_backend.catalog_queries import totals_cache
+from vantage_backend.bitset_index import bitset_index
+
+
+def _queries_for(client, count_queries, url):
+    # Medir siempre en frío: el total cacheado no debe esconder consultas
+    totals_cache.clear()
+    # Los bitsets se construyen una vez por proceso, no por request
+    bitset_index.refresh()
+    with count_queries() as statements:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(statements)
+
+
+@pytest.mark.parametrize('endpoint', ['/catalog/public/products', '/catalog/public/services'])
+@pytest.mark.parametrize('sort_by', ['name', 'provider', 'category', 'price', 'created_at'])
+def test_listing_query_count_is_constant(client, seed_catalog, count_queries, endpoint, sort_by):
+    seed_catalog(n_products=60, n_services=60)
+
+    small = _queries_for(client, count_queries, f"{endpoint}?per_page=5&sort_by={sort_by}")
+    large = _queries_for(client, count_queries, f"{endpoint}?per_page=50&sort_by={sort_by}")
+
+    assert small == large
+    assert large <= 3
+
+
+def test_featured_query_count_is_constant(client, seed_catalog, count_queries):
+    seed_catalog(n_products=60, n_services=60, featured_every=2)
+
+    small = _queries_for(client, count_queries, '/catalog/public/featured?limit=5')
+    large = _queries_for(client, count_queries, '/catalog/public/featured?limit=30')
+
+    assert small == large
+
+
+def test_search_query_count_is_constant(client, seed_catalog, count_queries):
+    seed_catalog(n_products=60, n_services=60)
+
+    small = _queries_for(client, count_queries, '/catalog/search?per_page=5')
+    large = _queries_for(client, count_queries, '/catalog/search?per_page=40')
+
+    assert small == large
+
+
+def test_listing_payload_keeps_provider_and_category(client, seed_catalog):
+    seed_catalog(n_products=4)
+
+    data = client.get('/catalog/public/products?sort_by=provider').get_json()
+
+    assert data['pagination']['total_items'] == 4
+    product = data['products'][0]
+    assert product['provider']['company_name'].startswith('Proveedor')
+    assert product['category']['name'] in ('Hidráulica', 'Eléctrica', 'Seguridad')
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la caché de respuestas de los endpoints públicos del catálogo
+"""
+
+from vantage_backend.catalog_cache import response_cache
+from vantage_backend.models import Product
+
+
+def test_repeated_request_is_served_from_cache(client, seed_catalog, count_queries):
+    seed_catalog(n_products=5)
+
+    first = client.get('/catalog/public/products?sort_by=price&per_page=3')
+    with count_queries() as statements:
+        # Mismos argumentos en otro orden: misma clave normalizada
+        second = client.get('/catalog/public/products?per_page=3&sort_by=price')
+
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_json() == first.get_json()
+    assert statements == []
+
+
+def test_product_write_invalidates_only_affected_keys(client, seed_catalog, auth_headers):
+    providers, _categories = seed_catalog(n_products=6)
+    headers = auth_headers(providers[0].user)
+    product = Product.query.filter_by(provider_id=providers[0].id).first()
+
+    client.get('/catalog/public/products')
+    client.get(f'/catalog/public/products?provider_id={providers[1].id}')
+    client.get('/catalog/public/categories')
+    client.get('/catalog/public/featured')
+
+    response = client.put(f'/catalog/products/{product.id}', json={"name": "Bomba renombrada"}, headers=headers)
+    assert response.status_code == 200
+
+    assert client.get('/catalog/public/products').headers['X-Cache'] == 'MISS'
+    assert client.get(f'/catalog/public/products?provider_id={providers[1].id}').headers['X-Cache'] == 'HIT'
+    assert client.get('/catalog/public/categories').headers['X-Cache'] == 'HIT'
+    # El producto no es destacado ni cambió is_featured: destacados sigue en caché
+    assert client.get('/catalog/public/featured').headers['X-Cache'] == 'HIT'
+    names = [p['name'] for p in client.get('/catalog/public/products?per_page=50').get_json()['products']]
+    assert 'Bomba renombrada' in names
+
+
+def test_feature_toggle_invalidates_featured(client, seed_catalog, make_user):
+    seed_catalog(n_services=4)
+    _admin, admin_headers = make_user('administrador')
+    service_id = client.get('/catalog/public/services').get_json()['services'][0]['id']
+
+    assert client.get('/catalog/public/featured').get_json()['featured_services'] == []
+
+    response = client.put(f'/catalog/admin/services/{service_id}/feature', json={"is_featured": True}, headers=admin_headers)
+    assert response.status_code == 200
+
+    featured = client.get('/catalog/public/featured')
+    assert featured.headers['X-Cache'] == 'MISS'
+    assert [s['id'] for s in featured.get_json()['featured_services']] == [service_id]
+
+
+def test_lru_bound_counts_evictions(client, seed_catalog):
+    seed_catalog(n_products=3)
+    response_cache.configure(maxsize=2)
+
+    for page in (1, 2, 3):
+        client.get(f'/catalog/public/products?page={page}')
+
+    stats = response_cache.stats()
+    assert stats['size'] == 2
+    assert stats['evictions'] == 1
+    assert stats['misses'] == 3
+
+
+def test_metrics_endpoint_requires_admin(client, make_user):
+    _client_user, client_headers = make_user('cliente')
+    _admin, admin_headers = make_user('administrador')
+
+    client.get('/catalog/public/categories')
+    client.get('/catalog/public/categories')
+
+    assert client.get('/catalog/admin/metrics', headers=client_headers).status_code == 403
+    caches = client.get('/catalog/admin/metrics', headers=admin_headers).get_json()['caches']
+    assert caches['responses']['hits'] == 1
+    assert caches['responses']['misses'] == 1
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la caché de listas rankeadas de las búsquedas de texto
+"""
+from vantage_backend import catalog_bp as catalog_module
+from vantage_backend.search_cache import normalize_query, search_result_cache
+from vantage_backend.search_index import catalog_search_index
+from vantage_backend.circuit_breaker import CircuitOpenError
+
+
+def test_normalize_query():
+    assert normalize_query('  Hidráulica BOMBA bomba ') == 'bomba hidraulica'
+    assert normalize_query('Bombas hidráulicas de acero', analyzed=True) == 'acer bomb hidraulic'
+
+
+def _counting_semantic_search(monkeypatch, ranked):
+    calls = []
+
+    def _search(query, k, min_score, timeout=None, refresh=True):
+        calls.append(query)
+        return [(ref, 0.9) for ref in ranked]
+
+    monkeypatch.setattr(catalog_module.semantic_index, 'search', _search)
+    return calls
+
+
+def test_pages_are_sliced_from_cached_ranking(client, seed_catalog, count_queries, monkeypatch):
+    seed_catalog(n_products=6, n_services=6)
+    ranked = [('servicio', 4), ('producto', 2), ('producto', 5), ('servicio', 1), ('producto', 3)]
+    calls = _counting_semantic_search(monkeypatch, ranked)
+
+    first = client.get('/catalog/search?q=Bomba%20hidráulica&per_page=2').get_json()['data']
+    with count_queries() as statements:
+        second = client.get('/catalog/search?q=hidraulica%20%20bomba&per_page=2&page=2').get_json()['data']
+
+    assert calls == ['Bomba hidráulica']
+    assert first['search_info']['cached'] is False and second['search_info']['cached'] is True
+    assert [(item['type'], item['id']) for item in first['items'] + second['items']] == ranked[:4]
+    assert second['pagination']['total'] == 5
+    # solo la hidratación de la página (una consulta IN por tipo)
+    assert len(statements) <= 2
+    assert not any('catalog_items' in statement for statement in statements)
+
+
+def test_filters_are_part_of_the_key(client, seed_catalog, monkeypatch):
+    seed_catalog(n_products=4, n_services=4)
+    calls = _counting_semantic_search(monkeypatch, [('producto', 1), ('servicio', 2)])
+
+    client.get('/catalog/search?q=bomba')
+    data = client.get('/catalog/search?q=bomba&type=servicio').get_json()['data']
+
+    assert len(calls) == 2
+    assert [(item['type'], item['id']) for item in data['items']] == [('servicio', 2)]
+
+
+def test_catalog_write_invalidates(client, seed_catalog, make_user, monkeypatch):
+    seed_catalog(n_products=3)
+    _user, headers = make_user('proveedor')
+    calls = _counting_semantic_search(monkeypatch, [('producto', 1)])
+
+    client.get('/catalog/search?q=bomba')
+    client.post('/catalog/products', json={'name': 'Bomba nueva', 'status': 'activo'}, headers=headers)
+    data = client.get('/catalog/search?q=bomba').get_json()['data']
+
+    assert len(calls) == 2
+    assert data['search_info']['cached'] is False
+
+
+def test_fallback_results_are_not_cached(client, seed_catalog, monkeypatch):
+    seed_catalog(n_products=3)
+
+    def _open(function, budget=None):
+        raise CircuitOpenError('abierto')
+
+    monkeypatch.setattr(catalog_module.semantic_breaker, 'call', _open)
+    client.get('/catalog/search?q=bomba')
+
+    assert len(search_result_cache) == 0
+
+
+def test_dashboard_search_reuses_cached_ranking(client, seed_catalog, make_user, monkeypatch):
+    seed_catalog(n_products=5)
+    _user, headers = make_user('cliente')
+    catalog_search_index.refresh()
+    calls = []
+    original = catalog_search_index.search
+    monkeypatch.setattr(catalog_search_index, 'search', lambda query, k: calls.append(query) or original(query, k))
+
+    first = client.post('/api/ia/search-catalog', json={'query': 'Bomba hidráulica'}, headers=headers).get_json()
+    second = client.post('/api/ia/search-catalog', json={'query': 'hidráulica bomba'}, headers=headers).get_json()
+    client.post('/api/ia/search-catalog', json={'query': 'bombas hidraulicas'}, headers=headers)
+    client.post('/api/ia/search-catalog', json={'query': 'bomba centrífuga'}, headers=headers)
+
+    # El índice compara términos analizados: tildes y plurales comparten la lista cacheada
+    assert calls == ['Bomba hidráulica', 'bomba centrífuga']
+    assert [item['id'] for item in second['exact_matches']] == [item['id'] for item in first['exact_matches']]
+    assert second['exact_matches'][0]['reasoning'].startswith("Coincidencia exacta: 'hidráulica bomba'")
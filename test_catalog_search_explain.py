@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Pruebas del modo explain de /catalog/search y de los tiempos por etapa en las métricas
+"""
+
+
+def test_explain_requires_admin(client, seed_catalog, make_user):
+    seed_catalog(n_products=2)
+    _user, headers = make_user('cliente')
+
+    assert client.get('/catalog/search?q=bomba&explain=1').status_code == 403
+    assert client.get('/catalog/search?q=bomba&explain=1', headers=headers).status_code == 403
+    assert 'explain' not in client.get('/catalog/search?q=bomba').get_json()
+
+
+def test_explain_reports_stages_sql_candidates_and_cache(client, seed_catalog, make_user):
+    seed_catalog(n_products=4, n_services=2)
+    _admin, headers = make_user('administrador')
+
+    first = client.get('/catalog/search?q=bomba&type=producto&facets=category&explain=1', headers=headers).get_json()
+    explain = first['explain']
+
+    assert [stage['stage'] for stage in explain['stages']] == ['cache', 'ai', 'filter', 'facets', 'hydrate', 'serialize']
+    assert explain['candidates']['filtered'] == first['data']['pagination']['total'] == 4
+    assert explain['candidates']['hydrated'] == len(first['data']['items'])
+    assert explain['cache'] == {'search_results': 'miss'}
+    hydrate_sql = [statement for statement in explain['sql']['statements'] if statement['stage'] == 'hydrate']
+    assert len(hydrate_sql) == 1 and 'FROM products' in hydrate_sql[0]['sql']
+    assert all(statement['ms'] >= 0 for statement in explain['sql']['statements'])
+    assert explain['sql']['count'] == len(explain['sql']['statements'])
+
+    second = client.get('/catalog/search?q=bomba&type=producto&explain=1', headers=headers).get_json()['explain']
+    assert second['cache'] == {'search_results': 'hit'}
+    assert 'ai' not in [stage['stage'] for stage in second['stages']]
+
+
+def test_stage_timings_feed_metrics(client, seed_catalog, make_user):
+    seed_catalog(n_products=3)
+    _admin, headers = make_user('administrador')
+
+    client.get('/catalog/search?q=bomba')
+    client.get('/catalog/search?category=1')
+    stages = client.get('/catalog/admin/metrics', headers=headers).get_json()['search_stages']
+
+    assert stages['filter']['count'] == 2 and stages['hydrate']['count'] == 2
+    assert stages['ai']['count'] == 1
+    assert stages['serialize']['max_ms'] >= stages['serialize']['avg_ms'] >= 0
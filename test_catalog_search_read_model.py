@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Pruebas del modelo de lectura catalog_items y de la paginación de /catalog/search
+"""
+from vantage_backend.models import db, CatalogItem, Product
+from vantage_backend.catalog_read_model import rebuild_catalog_items
+from vantage_backend.bitset_index import bitset_index
+from vantage_backend import catalog_bp as catalog_module
+
+
+def _search(client, params=''):
+    return client.get(f'/catalog/search?{params}').get_json()['data']
+
+
+def test_pages_are_disjoint_and_cover_all_items(client, seed_catalog):
+    seed_catalog(n_products=9, n_services=8)
+
+    seen = []
+    for page in (1, 2, 3):
+        data = _search(client, f'page={page}&per_page=7')
+        seen.extend((item['type'], item['id']) for item in data['items'])
+
+    assert data['pagination'] == {'page': 3, 'per_page': 7, 'total': 17, 'pages': 3}
+    assert len(seen) == 17
+    assert len(set(seen)) == 17
+
+
+def test_search_issues_constant_number_of_queries(client, seed_catalog, count_queries):
+    seed_catalog(n_products=30, n_services=30)
+    bitset_index.refresh()
+
+    with count_queries() as statements:
+        data = _search(client, 'page=2&per_page=10')
+
+    assert len(data['items']) == 10
+    # filtros y total en los bitsets: solo una hidratación por tipo
+    assert len(statements) <= 2
+    assert not any('FROM products' in s and 'LIMIT' not in s and 'IN (' not in s for s in statements)
+
+
+def test_filters_run_on_read_model(client, seed_catalog):
+    providers, categories = seed_catalog(n_products=6, n_services=6, featured_every=3)
+
+    data = _search(client, f'type=servicio&category={categories[0].id}')
+    assert {item['type'] for item in data['items']} == {'servicio'}
+    assert data['pagination']['total'] == 2
+
+    data = _search(client, f'provider={providers[1].id}&is_featured=true')
+    assert data['pagination']['total'] == 0
+
+    data = _search(client, 'is_featured=true')
+    assert data['pagination']['total'] == 4
+
+
+def test_ai_results_keep_relevance_order(client, seed_catalog, monkeypatch):
+    seed_catalog(n_products=4, n_services=4)
+    ranked = [('servicio', 3), ('producto', 2), ('producto', 4)]
+
+    monkeypatch.setattr(catalog_module.semantic_index, 'search',
+                        lambda query, k, min_score, timeout=None, refresh=True: [(ref, 0.9 - i / 10) for i, ref in enumerate(ranked)])
+
+    first = _search(client, 'q=bomba&per_page=2')
+    second = _search(client, 'q=bomba&per_page=2&page=2')
+
+    order = [(item['type'], item['id']) for item in first['items'] + second['items']]
+    assert order == ranked
+    assert first['pagination']['total'] == 3
+    assert first['search_info']['ai_search_used'] is True
+
+
+def test_read_model_follows_writes(client, make_user):
+    user, headers = make_user('proveedor', company_name='Hidro Andes')
+
+    product_id = client.post('/catalog/products', json={'name': 'Válvula', 'status': 'activo'}, headers=headers).get_json()['product_id']
+    row = CatalogItem.query.filter_by(item_type='producto', item_id=product_id).one()
+    assert (row.name, row.provider_name, row.status) == ('Válvula', 'Hidro Andes', 'activo')
+
+    client.put(f'/catalog/products/{product_id}', json={'name': 'Válvula de bola'}, headers=headers)
+    user.provider_profile.company_name = 'Hidro Andes SpA'
+    db.session.commit()
+    row = CatalogItem.query.filter_by(item_type='producto', item_id=product_id).one()
+    assert (row.name, row.provider_name) == ('Válvula de bola', 'Hidro Andes SpA')
+
+    client.delete(f'/catalog/products/{product_id}', headers=headers)
+    assert CatalogItem.query.filter_by(item_type='producto', item_id=product_id).count() == 0
+
+
+def test_rebuild_restores_projection(app, seed_catalog):
+    seed_catalog(n_products=5, n_services=2)
+    db.session.execute(CatalogItem.__table__.delete())
+    db.session.commit()
+
+    assert rebuild_catalog_items() == 7
+    assert CatalogItem.query.filter_by(item_type='producto').count() == Product.query.count()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la búsqueda tolerante a errores y las sugerencias ortográficas
+"""
+from sqlalchemy.dialects import postgresql
+from vantage_backend import catalog_queries
+from vantage_backend.models import db, Product
+from vantage_backend.search_index import catalog_search_index
+from vantage_backend.spelling import SymmetricDeleteDictionary, catalog_speller, edit_distance
+
+
+def test_edit_distance_counts_transpositions():
+    assert edit_distance('valbula', 'válvula') == 2
+    assert edit_distance('rodamientso', 'rodamientos') == 1
+    assert edit_distance('skf', 'skf') == 0
+
+
+def test_symmetric_delete_prefers_closest_then_most_frequent():
+    dictionary = SymmetricDeleteDictionary(max_distance=2)
+    dictionary.add('bomba', 10)
+    dictionary.add('bombo', 1)
+    dictionary.add('hidráulica', 3)
+
+    assert dictionary.lookup('bomba') == ('bomba', 0)
+    assert dictionary.lookup('bonba') == ('bomba', 1)
+    assert dictionary.lookup('hidraulica') == ('hidráulica', 1)
+    assert dictionary.lookup('xxxxxx') is None
+
+
+def test_spelling_endpoint_uses_catalog_vocabulary(client, seed_catalog):
+    seed_catalog(n_products=3)
+    db.session.add(Product(provider_id=1, name='Rodamientos SKF 6204', status='activo'))
+    db.session.commit()
+
+    data = client.get('/catalog/public/spelling?q=rodamientso skf hidraulica').get_json()
+
+    assert data['suggestion'] == 'rodamientos skf hidráulica'
+    assert [c['word'] for c in data['corrections']] == ['rodamientso', 'hidraulica']
+    assert client.get('/catalog/public/spelling?q=').status_code == 400
+
+
+def test_listing_falls_back_to_corrected_search(client, seed_catalog):
+    seed_catalog(n_products=4)
+
+    data = client.get('/catalog/public/products?search=bonba').get_json()
+
+    assert len(data['products']) == 4
+    assert data['search_info']['fuzzy'] is True
+    assert data['search_info']['did_you_mean'] == 'bomba'
+    assert data['pagination']['has_next'] is False
+
+
+def test_listing_with_enough_hits_is_not_rewritten(client, seed_catalog):
+    seed_catalog(n_services=5)
+
+    data = client.get('/catalog/public/services?search=preventivo').get_json()
+
+    assert len(data['services']) == 5
+    assert data['search_info'] == {'fuzzy': False, 'did_you_mean': None, 'corrections': []}
+    assert client.get('/catalog/public/services').get_json()['search_info'] is None
+
+
+def test_postgres_fallback_uses_trigram_word_similarity(app):
+    query = catalog_queries.apply_trigram_search(catalog_queries.catalog_query(Product), Product, 'valbula')
+    sql = str(query.statement.compile(dialect=postgresql.dialect()))
+
+    # '%%' es el escape de '%' del estilo pyformat de psycopg2
+    assert '<%% products.name' in sql and '<%% products.sku' in sql
+    assert 'ORDER BY greatest(word_similarity(' in sql
+
+
+def test_dictionary_remove_and_adjust():
+    dictionary = SymmetricDeleteDictionary(max_distance=2)
+    dictionary.add('bomba', 2)
+    dictionary.add('bombo', 1)
+
+    dictionary.adjust('bombo', 5)
+    assert dictionary.lookup('bonbo') == ('bombo', 1)
+    dictionary.adjust('bombo', -6)
+    assert dictionary.lookup('bonbo') == ('bomba', 2)
+    dictionary.remove('bomba')
+    assert len(dictionary) == 0 and dictionary._deletes == {}
+
+
+def test_speller_applies_index_deltas_without_rebuilding(client, seed_catalog, auth_headers):
+    providers, _categories = seed_catalog(n_products=2)
+    headers = auth_headers(providers[0].user)
+    dictionary = catalog_speller.dictionary()
+
+    product_id = client.post('/catalog/products', json={'name': 'Rodamientos cónicos', 'status': 'activo'},
+                             headers=headers).get_json()['product_id']
+    assert catalog_speller.suggest('rodamientso')[0] == 'rodamientos'
+    client.put(f'/catalog/products/{product_id}', json={'name': 'Acoplamientos cónicos'}, headers=headers)
+    assert catalog_speller.suggest('acoplamientso')[0] == 'acoplamientos'
+    assert catalog_speller.suggest('rodamientso')[0] is None
+    assert catalog_speller.dictionary() is dictionary    # mismo diccionario, actualizado en su lugar
+
+    catalog_search_index.rebuild()
+    assert catalog_speller.dictionary() is not dictionary
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Pruebas del autocompletado del buscador (índice de prefijos)
+"""
+import time
+from vantage_backend import suggest_index as suggest_module
+from vantage_backend.models import db, QuoteRequest, Product
+from vantage_backend.suggest_index import suggest_index
+
+
+def _suggest(client, params):
+    return client.get(f'/catalog/public/suggest?{params}').get_json()['suggestions']
+
+
+def test_matches_any_word_prefix_without_accents(client, seed_catalog):
+    seed_catalog(n_products=3, n_services=2)
+
+    suggestions = _suggest(client, 'q=HIDRAU&limit=20')
+
+    texts = {(s['type'], s['text']) for s in suggestions}
+    assert ('categoria', 'Hidráulica') in texts
+    assert ('producto', 'Bomba hidráulica 0000') in texts
+    assert not any(s['type'] == 'servicio' for s in suggestions)
+
+
+def test_sku_provider_and_type_filter(client, seed_catalog):
+    providers, _categories = seed_catalog(n_products=3)
+
+    assert _suggest(client, 'q=sku-0000&types=sku') == [
+        {'text': f'SKU-0000{i}', 'type': 'sku', 'id': i + 1} for i in range(3)
+    ]
+    provider_name = providers[0].company_name
+    assert _suggest(client, f'q={provider_name}&types=proveedor')[0] == {
+        'text': provider_name, 'type': 'proveedor', 'id': providers[0].id}
+    assert _suggest(client, 'q=') == []
+
+
+def test_featured_then_popular_first(client, seed_catalog, make_user):
+    seed_catalog(n_products=6, featured_every=4)
+    user, _headers = make_user('cliente')
+    for _ in range(3):
+        db.session.add(QuoteRequest(client_user_id=user.id, provider_id=1, item_id=3, item_type='producto'))
+    db.session.commit()
+
+    ids = [s['id'] for s in _suggest(client, 'q=bomba&types=producto&limit=4')]
+
+    assert ids[:3] == [1, 5, 3]
+
+
+def test_incremental_updates_on_writes(client, make_user):
+    _user, headers = make_user('proveedor', company_name='Hidro Andes')
+    product_id = client.post('/catalog/products', json={'name': 'Válvula compuerta', 'sku': 'VC-10', 'status': 'activo'},
+                             headers=headers).get_json()['product_id']
+    assert [s['type'] for s in _suggest(client, 'q=vc-1')] == ['sku']
+    assert _suggest(client, 'q=hidro')[0]['type'] == 'proveedor'
+
+    client.put(f'/catalog/products/{product_id}', json={'name': 'Válvula mariposa'}, headers=headers)
+    assert _suggest(client, 'q=compuerta') == []
+    assert _suggest(client, 'q=mariposa')[0] == {'text': 'Válvula mariposa', 'type': 'producto', 'id': product_id}
+
+    client.delete(f'/catalog/products/{product_id}', headers=headers)
+    assert _suggest(client, 'q=val') == []
+    assert _suggest(client, 'q=hidro') == []
+    assert suggest_index.stats()['keys'] == 0
+
+
+def test_prefixes_with_many_keys_keep_the_best_entries(client, seed_catalog, make_user, monkeypatch):
+    seed_catalog(n_products=6)
+    monkeypatch.setattr(suggest_module, 'MAX_SCANNED_KEYS', 3)
+    monkeypatch.setattr(suggest_module, 'BEST_PER_PREFIX', 2)
+    provider_user, headers = make_user('proveedor', company_name='Bombas Andes')
+    featured = Product(provider_id=provider_user.provider_profile.id, name='Bomba zeta', status='activo', is_featured=True)
+    db.session.add(featured)
+    db.session.commit()
+
+    # Claves que ordenan al final del rango: fuera de un recorrido acotado a 3
+    assert [s['text'] for s in _suggest(client, 'q=bo&types=proveedor')] == ['Bombas Andes']
+    assert _suggest(client, 'q=bo&types=producto&limit=2')[0]['text'] == 'Bomba zeta'
+    assert 'bo' in suggest_index._best
+
+    # La lista se mantiene con los cambios y se recalcula si pierde una de sus entradas
+    client.delete(f'/catalog/products/{featured.id}', headers=headers)
+    assert [s['text'] for s in _suggest(client, 'q=bo&types=producto&limit=2')] == \
+        ['Bomba hidráulica 0000', 'Bomba hidráulica 0001']
+    Product.query.filter_by(name='Bomba hidráulica 0004').one().is_featured = True
+    db.session.commit()
+    assert _suggest(client, 'q=bo&types=producto&limit=1')[0]['text'] == 'Bomba hidráulica 0004'
+
+
+def test_lookup_is_sub_millisecond(app, seed_catalog):
+    seed_catalog(n_products=300, n_services=300)
+    suggest_index.refresh()
+
+    started = time.perf_counter()
+    for _ in range(100):
+        suggest_index.suggest('mantenimiento prev')
+    assert (time.perf_counter() - started) / 100 < 0.001 * 5  # margen para máquinas lentas de CI
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Pruebas de los totales cacheados y aproximados en los listados públicos
+"""
+
+from vantage_backend.catalog_queries import totals_cache
+
+
+def _count_statements(statements):
+    return [statement for statement in statements if 'count(' in statement.lower()]
+
+
+def test_exact_total_is_cached_per_filter_signature(client, seed_catalog, count_queries):
+    seed_catalog(n_products=12)
+
+    first = client.get('/catalog/public/products?search=Bomba&per_page=5').get_json()
+    with count_queries() as statements:
+        # Misma firma de filtros: otra página, otro orden y otra capitalización
+        second = client.get('/catalog/public/products?search=%20bomba&page=2&per_page=5&sort_by=price').get_json()
+
+    assert first['pagination']['total_items'] == second['pagination']['total_items'] == 12
+    assert _count_statements(statements) == []
+    assert totals_cache.stats()['hits'] >= 1
+
+
+def test_total_is_invalidated_on_product_write(client, seed_catalog, make_user):
+    seed_catalog(n_products=5)
+    _user, headers = make_user('proveedor')
+
+    assert client.get('/catalog/public/products').get_json()['pagination']['total_items'] == 5
+
+    response = client.post('/catalog/products', json={"name": "Nueva bomba", "status": "activo"}, headers=headers)
+    assert response.status_code == 201
+
+    assert client.get('/catalog/public/products').get_json()['pagination']['total_items'] == 6
+
+
+def test_include_total_false_skips_count(client, seed_catalog, count_queries):
+    seed_catalog(n_services=7)
+
+    with count_queries() as statements:
+        data = client.get('/catalog/public/services?include_total=false&per_page=3&page=2').get_json()
+
+    pagination = data['pagination']
+    assert pagination['total_items'] is None
+    assert pagination['has_next'] is True
+    assert pagination['has_prev'] is True
+    assert len(data['services']) == 3
+    assert _count_statements(statements) == []
+
+
+def test_include_total_approx_falls_back_to_exact_on_sqlite(client, seed_catalog):
+    seed_catalog(n_products=9)
+
+    pagination = client.get('/catalog/public/products?include_total=approx&per_page=4').get_json()['pagination']
+
+    assert pagination['total_items'] == 9
+    assert pagination['total_pages'] == 3
+    assert pagination['total_is_estimate'] is False
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Regresión de planes de consulta: las consultas de los endpoints más usados
+no deben planificarse como un recorrido secuencial de las tablas grandes.
+
+Se capturan las sentencias SELECT que emite cada endpoint (con sus
+parámetros) sobre un conjunto sembrado y se ejecuta EXPLAIN QUERY PLAN de
+cada una; un "SCAN <tabla>" sobre una tabla caliente hace fallar la prueba.
+"""
+import re
+
+from sqlalchemy import event
+
+from vantage_backend.models import db, QuoteRequest, QuoteResponse, QuoteAttachment, Notification
+
+HOT_TABLES = {
+    'products', 'services', 'quote_requests', 'quote_responses',
+    'quote_attachments', 'notifications', 'providers_profile'
+}
+SCAN = re.compile(r'^SCAN (\w+)')
+
+
+def _seed(seed_catalog, make_user, auth_headers):
+    providers, categories = seed_catalog(n_products=30, n_services=30)
+    client_user, client_headers = make_user('cliente')
+    provider_user = providers[0].user
+    for i in range(20):
+        quote = QuoteRequest(
+            client_user_id=client_user.id,
+            provider_id=providers[i % 3].id,
+            item_id=i + 1,
+            item_type='producto',
+            status=('pendiente', 'respondida')[i % 2]
+        )
+        db.session.add(quote)
+        db.session.flush()
+        db.session.add(QuoteAttachment(quote_request_id=quote.id, file_url=f"adjunto-{i}"))
+        db.session.add(QuoteResponse(quote_request_id=quote.id, provider_id=quote.provider_id, response_pdf_url='r.pdf'))
+        db.session.add(Notification(recipient_id=provider_user.id, type='system', title='Aviso', message=f"Aviso {i}"))
+    db.session.commit()
+    return categories, client_headers, auth_headers(provider_user)
+
+
+def _sequential_scans(client, method, url, headers):
+    """Tablas calientes que el planificador recorrería completas en las consultas del endpoint"""
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', _capture)
+    try:
+        response = client.open(url, method=method, headers=headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', _capture)
+    assert response.status_code == 200, url
+    assert statements, url
+
+    scans = set()
+    connection = db.session.connection()
+    for statement, parameters in statements:
+        for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters):
+            match = SCAN.match(row[-1])
+            if match and match.group(1) in HOT_TABLES:
+                scans.add((match.group(1), ' '.join(statement.split())[:120]))
+    return scans
+
+
+def test_hot_endpoint_queries_use_indexes(client, seed_catalog, make_user, auth_headers):
+    categories, client_headers, provider_headers = _seed(seed_catalog, make_user, auth_headers)
+    hydraulic, electric = categories[0].id, categories[1].id
+    # Los índices en memoria (bitsets, facetas) cargan la tabla completa una vez
+    # por reconstrucción, no por pedido: se construyen antes de medir
+    client.get(f'/catalog/public/products?category_id={electric}')
+    client.get(f'/catalog/public/services?category_id={electric}')
+
+    endpoints = [
+        ('GET', f'/catalog/public/products?category_id={hydraulic}', None),
+        ('GET', f'/catalog/public/services?category_id={hydraulic}&sort_by=created_at', None),
+        ('GET', '/catalog/products', provider_headers),
+        ('GET', '/quotes/received', provider_headers),
+        ('GET', '/quotes/received?status=pendiente', provider_headers),
+        ('GET', '/quotes/my-requests', client_headers),
+        ('GET', '/client/dashboard', client_headers),
+        ('GET', '/provider/notifications', provider_headers),
+        ('PUT', '/provider/notifications/mark-all-read', provider_headers),
+    ]
+    for method, url, headers in endpoints:
+        assert _sequential_scans(client, method, url, headers) == set(), f"{method} {url}"
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Pruebas de las bandejas de cotizaciones de clientes y proveedores: carga
+anticipada, paginación por cursor, filtros y consultas constantes por página
+"""
+from datetime import datetime, timedelta
+
+from vantage_backend.models import db, QuoteRequest, QuoteAttachment, ClientCompany, ClientBranch
+
+BASE_DATE = datetime(2024, 3, 1, 12, 0)
+
+
+def _seed_quotes(make_user, n_quotes=7):
+    """n cotizaciones de dos clientes (con empresa y sucursal) a un proveedor, una por día"""
+    provider_user, provider_headers = make_user('proveedor', company_name='Hidráulica Sur')
+    company = ClientCompany(company_name='Minera Norte')
+    db.session.add(company)
+    db.session.flush()
+    branch = ClientBranch(company_id=company.id, branch_name='Faena Centro')
+    db.session.add(branch)
+    clients = [make_user('cliente') for _ in range(2)]
+    for user, _headers in clients:
+        user.company_id = company.id
+
+    for i in range(n_quotes):
+        client_user = clients[i % 2][0]
+        quote = QuoteRequest(
+            client_user_id=client_user.id,
+            client_branch_id=branch.id,
+            provider_id=provider_user.provider_profile.id,
+            item_id=i + 1,
+            item_type='producto',
+            item_name_snapshot=f"Bomba {i}",
+            quantity=i + 1,
+            status=('pendiente', 'respondida')[i % 2],
+            created_at=BASE_DATE + timedelta(days=i)
+        )
+        db.session.add(quote)
+        db.session.flush()
+        db.session.add_all([QuoteAttachment(quote_request_id=quote.id, file_url=f"f{i}-{n}") for n in range(i % 3)])
+    db.session.commit()
+    return provider_headers, clients
+
+
+def _walk(client, url, headers):
+    """Recorrer todas las páginas siguiendo next_cursor"""
+    pages, cursor = [], None
+    while True:
+        response = client.get(url + (f"&cursor={cursor}" if cursor else ''), headers=headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        pages.append(body['quote_requests'])
+        cursor = body['pagination']['next_cursor']
+        if not body['pagination']['has_next']:
+            return pages
+
+
+def test_provider_inbox_pages_newest_first_with_client_details(client, make_user):
+    provider_headers, _clients = _seed_quotes(make_user)
+
+    pages = _walk(client, '/quotes/received?per_page=3', provider_headers)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    quotes = [quote for page in pages for quote in page]
+    assert [quote['item_name'] for quote in quotes] == [f"Bomba {i}" for i in range(6, -1, -1)]
+    assert quotes[0]['client_company'] == 'Minera Norte' and quotes[0]['client_branch'] == 'Faena Centro'
+    assert [quote['attachments_count'] for quote in quotes] == [i % 3 for i in range(6, -1, -1)]
+
+
+def test_client_inbox_only_lists_own_quotes(client, make_user):
+    _provider_headers, clients = _seed_quotes(make_user)
+    _user, headers = clients[0]
+
+    quotes = [quote for page in _walk(client, '/quotes/my-requests?per_page=2', headers) for quote in page]
+
+    assert [quote['item_name'] for quote in quotes] == ['Bomba 6', 'Bomba 4', 'Bomba 2', 'Bomba 0']
+    assert {quote['provider_name'] for quote in quotes} == {'Hidráulica Sur'}
+
+
+def test_inbox_without_cursor_or_per_page_returns_every_quote(client, make_user):
+    provider_headers, clients = _seed_quotes(make_user, n_quotes=25)
+
+    received = client.get('/quotes/received', headers=provider_headers).get_json()
+    sent = client.get('/quotes/my-requests', headers=clients[0][1]).get_json()
+
+    assert [quote['item_name'] for quote in received['quote_requests']] == [f"Bomba {i}" for i in range(24, -1, -1)]
+    assert received['pagination'] == {'mode': 'all', 'total_items': 25, 'has_next': False, 'next_cursor': None}
+    assert len(sent['quote_requests']) == 13 and sent['pagination']['has_next'] is False
+
+    first_page = client.get('/quotes/received?cursor=', headers=provider_headers).get_json()
+    assert len(first_page['quote_requests']) == 20 and first_page['pagination']['has_next'] is True
+
+
+def test_inbox_filters_by_status_and_dates(client, make_user):
+    provider_headers, _clients = _seed_quotes(make_user)
+
+    answered = client.get('/quotes/received?status=respondida', headers=provider_headers).get_json()
+    ranged = client.get('/quotes/received?date_from=2024-03-02&date_to=2024-03-04', headers=provider_headers).get_json()
+
+    assert [quote['item_name'] for quote in answered['quote_requests']] == ['Bomba 5', 'Bomba 3', 'Bomba 1']
+    assert [quote['item_name'] for quote in ranged['quote_requests']] == ['Bomba 3', 'Bomba 2', 'Bomba 1']
+    assert client.get('/quotes/received?status=aceptada', headers=provider_headers).status_code == 400
+    assert client.get('/quotes/received?date_from=ayer', headers=provider_headers).status_code == 400
+    assert client.get('/quotes/received?cursor=basura', headers=provider_headers).status_code == 400
+
+
+def test_inbox_query_count_is_constant_per_page(client, make_user, count_queries):
+    provider_headers, clients = _seed_quotes(make_user, n_quotes=40)
+    client_headers = clients[0][1]
+
+    counts = {}
+    for per_page in (2, 40):
+        with count_queries() as received:
+            body = client.get(f'/quotes/received?per_page={per_page}', headers=provider_headers).get_json()
+        with count_queries() as sent:
+            client.get(f'/quotes/my-requests?per_page={per_page}', headers=client_headers)
+        assert len(body['quote_requests']) == per_page
+        counts[per_page] = (len(received), len(sent))
+
+    # usuario, (perfil del proveedor), página con sus relaciones y conteo de adjuntos
+    assert counts[2] == counts[40] == (4, 3)
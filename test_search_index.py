@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Pruebas del índice invertido del buscador IA del dashboard
+"""
+from vantage_backend.models import db, Product, Service, Category
+from vantage_backend.search_index import catalog_search_index, tokenize
+
+
+def _linear_scan(query):
+    """Búsqueda por subcadenas previa al índice, como referencia"""
+    words = tokenize(query)
+    exact, near = set(), set()
+    for model, item_type in ((Product, 'producto'), (Service, 'servicio')):
+        for item in model.query.filter_by(status='activo'):
+            extra = item.technical_details if item_type == 'producto' else item.modality
+            text = ' '.join(v or '' for v in (item.name, item.description,
+                                              item.category.name if item.category else '',
+                                              item.provider.company_name if item.provider else '', extra)).lower()
+            similarity = sum(word in text for word in words) / len(words)
+            if similarity >= 0.8:
+                exact.add((item_type, item.id))
+            elif similarity >= 0.3:
+                near.add((item_type, item.id))
+    return exact, near
+
+
+def _search(client, headers, query):
+    return client.post('/api/ia/search-catalog', json={'query': query}, headers=headers).get_json()
+
+
+def test_index_matches_linear_scan_tiers(app, seed_catalog):
+    seed_catalog(n_products=30, n_services=30, featured_every=4)
+
+    for query in ('bomba hidráulica', 'mantenimiento remoto', 'caudal 120', 'proveedor eléctrica', 'xyz'):
+        exact, near = catalog_search_index.search(query)
+        assert ({ref for ref, _name in exact}, {ref for ref, _name in near}) == _linear_scan(query)
+
+
+def test_ranking_by_term_frequency_then_featured_then_recency(app, seed_catalog):
+    seed_catalog(n_products=6, featured_every=3)
+    db.session.add(Product(provider_id=1, name='Bomba bomba bomba', status='activo', description='bomba'))
+    db.session.commit()
+    catalog_search_index.invalidate()
+
+    exact, _near = catalog_search_index.search('bomba')
+    refs = [ref for ref, _name in exact]
+
+    # "bomba" cuatro veces primero; con la misma frecuencia, destacados
+    # (el más reciente primero) y luego el más reciente
+    assert refs[:3] == [('producto', 7), ('producto', 4), ('producto', 1)]
+    assert refs[3] == ('producto', 6)
+
+
+def test_index_is_refreshed_incrementally_on_writes(client, make_user, count_queries):
+    _provider, provider_headers = make_user('proveedor', company_name='Hidro Andes')
+    _client_user, headers = make_user('cliente')
+
+    product_id = client.post('/catalog/products', json={'name': 'Válvula compuerta', 'status': 'activo'},
+                             headers=provider_headers).get_json()['product_id']
+    assert [item['id'] for item in _search(client, headers, 'válvula')['exact_matches']] == [product_id]
+
+    client.put(f'/catalog/products/{product_id}', json={'name': 'Válvula mariposa'}, headers=provider_headers)
+    with count_queries() as statements:
+        exact, _near = catalog_search_index.search('mariposa')
+    assert [ref for ref, _name in exact] == [('producto', product_id)]
+    assert sum('FROM products' in s for s in statements) == 1
+    assert catalog_search_index.search('compuerta') == ([], [])
+
+    client.delete(f'/catalog/products/{product_id}', headers=provider_headers)
+    assert catalog_search_index.search('mariposa') == ([], [])
+    assert catalog_search_index.stats()['documents'] == 0
+
+
+def test_category_rename_rebuilds_index(app, seed_catalog):
+    from vantage_backend.catalog_events import notify_catalog_change
+    _providers, categories = seed_catalog(n_services=3)
+    assert catalog_search_index.search('bombeo') == ([], [])
+
+    category = db.session.get(Category, categories[0].id)
+    category.name = 'Bombeo'
+    db.session.commit()
+    notify_catalog_change('categoria', category.id)
+
+    exact, _near = catalog_search_index.search('bombeo')
+    assert [ref for ref, _name in exact] == [('servicio', 1)]
+
+
+def test_empty_catalog_message(client, make_user):
+    _user, headers = make_user('cliente')
+
+    data = _search(client, headers, 'bomba')
+
+    assert data['results'] == []
+    assert data['reasoning'] == 'El catálogo está vacío'
+
+
+def test_search_keeps_only_top_k_per_tier(app, seed_catalog):
+    seed_catalog(n_products=20, featured_every=7)
+
+    everything, _near = catalog_search_index.search('bomba', k=100)
+    exact, _near = catalog_search_index.search('bomba', k=5)
+
+    assert len(everything) == 20
+    assert exact == everything[:5]
+    assert [ref for ref, _name in exact[:3]] == [('producto', 15), ('producto', 8), ('producto', 1)]
+
+
+def test_words_match_terms_by_prefix(client, make_user):
+    _provider, provider_headers = make_user('proveedor', company_name='Andes')
+    product_id = client.post('/catalog/products', json={'name': 'Electrobomba sumergible', 'status': 'activo'},
+                             headers=provider_headers).get_json()['product_id']
+
+    assert [ref for ref, _name in catalog_search_index.search('electrob')[0]] == [('producto', product_id)]
+    assert catalog_search_index.search('sumerg')[0] != []
+    assert catalog_search_index.search('bomba') == ([], [])    # solo prefijos, no subcadenas
+
+    client.delete(f'/catalog/products/{product_id}', headers=provider_headers)
+    assert catalog_search_index.search('electrob') == ([], [])
+    assert catalog_search_index._terms == sorted(catalog_search_index._postings)
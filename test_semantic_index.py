@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Pruebas del índice semántico en memoria de /catalog/search
+"""
+import numpy as np
+from vantage_backend.models import db, Product
+from vantage_backend.semantic_index import SemanticIndex, HashingEmbedder, semantic_index
+
+
+class _CountingEmbedder(HashingEmbedder):
+    """Embedder determinista que cuenta cuántos textos calcula"""
+    def __init__(self):
+        super().__init__(dim=64)
+        self.embedded = 0
+
+    def embed(self, texts, timeout=None):
+        self.embedded += len(texts)
+        return super().embed(texts, timeout)
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    embedder = HashingEmbedder(dim=128)
+    first = embedder.embed(['Bomba hidráulica', 'Válvula de bola'])
+    second = HashingEmbedder(dim=128).embed(['Bomba hidráulica', 'Válvula de bola'])
+
+    assert first.dtype == np.float32
+    assert np.array_equal(first, second)
+    assert np.allclose(np.linalg.norm(first, axis=1), 1.0)
+
+
+def test_top_k_matches_brute_force_ranking(app, seed_catalog):
+    seed_catalog(n_products=40, n_services=40)
+
+    results = semantic_index.search('mantenimiento preventivo remoto', k=10)
+
+    matrix, refs = semantic_index._matrix, semantic_index._refs
+    assert matrix.flags['C_CONTIGUOUS'] and matrix.dtype == np.float32
+    scores = matrix @ semantic_index.embedder.embed(['mantenimiento preventivo remoto'])[0]
+    expected = sorted(range(len(refs)), key=lambda i: (-scores[i], i))[:10]
+    assert [ref for ref, _score in results] == [refs[i] for i in expected]
+    assert all(ref[0] == 'servicio' for ref, _score in results)
+
+
+def test_catalog_search_queries_index_without_http(client, seed_catalog, monkeypatch):
+    import requests
+    monkeypatch.setattr(requests, 'post', lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError('HTTP')))
+    seed_catalog(n_products=5, n_services=5)
+
+    data = client.get('/catalog/search?q=bomba hidraulica').get_json()['data']
+
+    assert data['search_info']['ai_search_used'] is True
+    # los productos (nombre y categoría coinciden) van antes que los servicios de la misma categoría
+    assert [item['type'] for item in data['items'][:5]] == ['producto'] * 5
+    assert data['pagination']['total'] == data['search_info']['relevant_ids_count']
+
+
+def test_index_persists_and_reuses_embeddings(app, seed_catalog, tmp_path):
+    seed_catalog(n_products=6, n_services=4)
+    path = str(tmp_path / 'semantic_index.npz')
+
+    first = SemanticIndex(_CountingEmbedder(), path)
+    first.refresh()
+    assert first.embedder.embedded == 10
+
+    product = db.session.get(Product, 2)
+    product.name = 'Compresor de aire'
+    db.session.commit()
+
+    second = SemanticIndex(_CountingEmbedder(), path)
+    results = second.search('compresor de aire', k=1)
+    assert second.embedder.embedded == 1 + 1  # el item modificado + la consulta
+    assert results[0][0] == ('producto', 2)
+
+
+def test_incremental_changes_are_saved_on_a_throttled_schedule(app, seed_catalog, tmp_path, monkeypatch):
+    seed_catalog(n_products=3)
+    path = tmp_path / 'semantic_index.npz'
+    index = SemanticIndex(_CountingEmbedder(), str(path), save_interval=60)
+    now = [100.0]
+    monkeypatch.setattr(index, '_clock', lambda: now[0])
+    index.rebuild()
+    saved = path.stat().st_mtime_ns
+
+    product = db.session.get(Product, 1)
+    product.name = 'Compresor de aire'
+    db.session.commit()
+    index.mark_dirty('producto', 1)
+    index.search('compresor')
+    assert path.stat().st_mtime_ns == saved      # delta aplicado en memoria, sin reescribir el archivo
+
+    now[0] += 61
+    index.search('compresor')
+    index._saver.join()
+    assert path.stat().st_mtime_ns != saved
+    assert [p.name for p in tmp_path.iterdir()] == ['semantic_index.npz']   # sin temporales
+    reloaded = SemanticIndex(_CountingEmbedder(), str(path))
+    reloaded.refresh()
+    assert reloaded.embedder.embedded == 0
+
+
+def test_background_rebuild_adopts_the_save_it_already_made(app, seed_catalog, tmp_path, monkeypatch):
+    seed_catalog(n_products=3)
+    path = tmp_path / 'semantic_index.npz'
+    index = SemanticIndex(_CountingEmbedder(), str(path), save_interval=60)
+    index.rebuild_interval = 30
+    now = [100.0]
+    monkeypatch.setattr(index, '_clock', lambda: now[0])
+    index.rebuild()
+
+    db.session.get(Product, 1).name = 'Compresor de aire'
+    db.session.commit()
+    index.mark_dirty('producto', 1)
+    index.search('compresor')             # delta sin guardar (dentro de save_interval)
+
+    now[0] += 31
+    index.search('compresor')             # reconstrucción en segundo plano, que guarda el archivo
+    index._rebuilder.join()
+    saved = path.stat().st_mtime_ns
+
+    now[0] += 31
+    assert index.persist_pending() is None
+    assert path.stat().st_mtime_ns == saved
+
+
+def test_incremental_updates_from_catalog_changes(client, make_user):
+    _user, headers = make_user('proveedor', company_name='Hidro Andes')
+    product_id = client.post('/catalog/products', json={'name': 'Válvula compuerta', 'status': 'activo'},
+                             headers=headers).get_json()['product_id']
+    assert semantic_index.search('valvula compuerta', k=1)[0][0] == ('producto', product_id)
+
+    client.put(f'/catalog/products/{product_id}', json={'name': 'Compresor de tornillo'}, headers=headers)
+    assert semantic_index.search('compresor tornillo', k=1, min_score=0.5)[0][0] == ('producto', product_id)
+
+    client.delete(f'/catalog/products/{product_id}', headers=headers)
+    assert semantic_index.search('compresor tornillo', k=5) == []
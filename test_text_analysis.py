@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Pruebas del análisis de texto en español y de los términos guardados en catalog_items
+"""
+from sqlalchemy import update
+
+from vantage_backend.models import db, Product, Service, CatalogItem
+from vantage_backend.text_analysis import analyze, stem
+from vantage_backend import catalog_read_model
+from vantage_backend.catalog_read_model import rebuild_catalog_items
+from vantage_backend.catalog_queries import apply_listing_filters
+from vantage_backend.search_index import catalog_search_index
+
+
+def _tokens(item_type, item_id):
+    return CatalogItem.query.filter_by(item_type=item_type, item_id=item_id).one().search_tokens
+
+
+def test_analyze_folds_accents_stopwords_and_plurals():
+    assert analyze('Bombas centrífugas de acero inoxidable') == ['bomb', 'centrifug', 'acer', 'inoxidabl']
+    assert analyze('Válvula') == analyze('valvulas')
+    assert analyze('Motores ELÉCTRICOS') == analyze('motor eléctrico') == ['motor', 'electric']
+    assert analyze('para con de la') == []
+    assert [stem(word) for word in ('calibraciones', 'luces', 'compresores', 'guantes')] == \
+        ['calibracion', 'luz', 'compresor', 'guant']
+
+
+def test_analyze_keeps_codes_with_digits():
+    assert analyze('SKU-00012') == ['sku00012', 'sku', '00012']
+    assert analyze('Norma IP67, rosca M12x1.5') == ['norm', 'ip67', 'rosc', 'm12x15', 'm12x1', '5']
+
+
+def test_tokens_are_stored_and_maintained_on_write(seed_catalog):
+    seed_catalog(n_products=1, n_services=1)
+    product, service = Product.query.one(), Service.query.one()
+
+    assert _tokens('producto', product.id).split() == analyze(
+        'Bomba hidráulica 0000 Descripción del producto 0 SKU-00000 Caudal 120 l/min')
+    assert 'presencial' in _tokens('servicio', service.id).split()
+
+    product.name = 'Válvulas de compuerta'
+    db.session.commit()
+    assert _tokens('producto', product.id).startswith('valvul compuert ')
+
+
+def test_rebuild_backfills_tokens(seed_catalog, monkeypatch):
+    seed_catalog(n_products=3)
+    db.session.execute(update(CatalogItem.__table__).values(search_tokens=None))
+    db.session.commit()
+    monkeypatch.setattr(catalog_read_model, '_TOKENS_CHUNK', 2)    # varios lotes por tipo
+
+    rebuild_catalog_items()
+
+    assert all(item.search_tokens.startswith('bomb hidraulic') for item in CatalogItem.query)
+
+
+def test_listing_search_matches_analyzed_terms(client, seed_catalog):
+    seed_catalog(n_products=3, n_services=2)
+
+    products = client.get('/catalog/public/products?search=bombas%20hidraulicas').get_json()['products']
+    services = client.get('/catalog/public/services?search=mantenimientos%20preventivos%200001').get_json()['services']
+
+    assert len(products) == 3
+    assert [s['name'] for s in services] == ['Mantenimiento preventivo 0001']
+
+
+def test_listing_search_falls_back_to_substring_for_items_without_terms(client, seed_catalog):
+    seed_catalog(n_products=3)
+    product = Product.query.first()
+    db.session.execute(
+        update(CatalogItem.__table__).where(CatalogItem.item_id == product.id).values(search_tokens=None)
+    )
+    db.session.commit()
+
+    products = client.get('/catalog/public/products?search=bomba%20hidr').get_json()['products']
+    # La subcadena es literal: sin términos guardados el plural no coincide
+    plural = apply_listing_filters(Product.query, Product, {'search': 'bombas hidraulicas'})
+
+    assert len(products) == 3
+    assert product.id not in {p.id for p in plural} and plural.count() == 2
+
+
+def test_dashboard_index_uses_stored_terms(app, seed_catalog):
+    seed_catalog(n_products=2)
+    product = Product.query.first()
+    # Los términos guardados mandan: el índice no vuelve a analizar el texto del item
+    db.session.execute(
+        update(CatalogItem.__table__).where(CatalogItem.item_id == product.id).values(search_tokens='compresor')
+    )
+    db.session.commit()
+    catalog_search_index.rebuild()
+
+    exact, _near = catalog_search_index.search('Compresores')
+    assert [ref for ref, _name in exact] == [('producto', product.id)]
+    exact, near = catalog_search_index.search('bombas hidráulicas')
+    assert ('producto', product.id) not in {ref for ref, _name in exact}
+    assert ('producto', product.id) in {ref for ref, _name in near}    # solo por su categoría
@@ -20,6 +20,17 @@ def create_app(config_class=Config):
     jwt.init_app(app)
     migrate = Migrate(app, db)
 
+    # Cachés del catálogo en memoria (por proceso)
+    from .catalog_cache import init_catalog_caches
+    init_catalog_caches(app)
+    # Registra los eventos que mantienen el modelo de lectura catalog_items
+    from . import catalog_read_model
+    # Captura los cambios de productos y servicios y los notifica al confirmar
+    from . import catalog_capture
+    # Índice semántico de /catalog/search (embedder y archivo configurables)
+    from .semantic_index import init_semantic_index
+    init_semantic_index(app)
+
     # Configuración de CORS usando variables de entorno
     import os
     
@@ -1,5 +1,6 @@
 from flask import request, jsonify, Blueprint
 from .models import db, User, ProviderProfile
+from .catalog_events import notify_catalog_change
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 
@@ -35,6 +36,7 @@ def register_provider():
     )
     db.session.add(new_provider_profile)
     db.session.commit()
+    notify_catalog_change('proveedor', new_provider_profile.id, new_provider_profile.id)
 
     return jsonify({"message": "Proveedor registrado exitosamente"}), 201
 
@@ -0,0 +1,300 @@
+"""
+Índice de bitsets en memoria para los filtros de baja cardinalidad del catálogo.
+
+Por cada tipo de item y cada valor de status, is_featured, has_cert_iso9001,
+has_cert_iso14001, category_id y modality se guarda el conjunto de ids que
+lo tienen como bits empaquetados en palabras de 64 bits (un bit por id).
+Una combinación de filtros se resuelve con AND de bitsets antes de tocar la
+base de datos: el total es un popcount y solo las referencias de la página
+final se hidratan con SQL. provider_id, de cardinalidad alta, se guarda como
+columna por id y se compara de forma vectorizada.
+
+Los bitsets son densos (sin compresión por tramos ni contenedores): con
+pocos valores por campo ocupan valores x max_id / 8 bytes (61 bitsets,
+0,36 MiB con 100k items) y AND y popcount son una sola operación de numpy
+sobre el arreglo completo. La compresión solo compensaría con campos de
+cardinalidad alta, y por eso provider_id queda fuera de los bitsets.
+
+Los cambios del catálogo se aplican de forma incremental (ver catalog_indexes).
+"""
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+from .models import db, Product, Service
+from .catalog_indexes import CatalogIndex, register_index, ITEM_TYPES
+
+BITSET_FIELDS = ('status', 'is_featured', 'has_cert_iso9001', 'has_cert_iso14001', 'category_id', 'modality')
+
+
+def bitset_filters_enabled():
+    """Resolver los filtros con bitsets (CATALOG_BITSET_FILTERS) o con predicados SQL"""
+    return current_app.config.get('CATALOG_BITSET_FILTERS', True)
+
+
+def _pack(mask):
+    """Arreglo booleano -> palabras uint64 (bit i de la palabra w = posición 64*w + i)"""
+    padded = np.zeros(-(-len(mask) // 64) * 64, dtype=bool)
+    padded[:len(mask)] = mask
+    return np.packbits(padded, bitorder='little').view('<u8')
+
+
+class Bitset:
+    """Conjunto de enteros no negativos como bits empaquetados en palabras de 64 bits"""
+
+    __slots__ = ('words',)
+
+    def __init__(self, words=None):
+        self.words = words if words is not None else np.zeros(0, dtype='<u8')
+
+    @classmethod
+    def from_mask(cls, mask):
+        return cls(_pack(np.asarray(mask, dtype=bool)))
+
+    @classmethod
+    def from_ids(cls, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        mask = np.zeros(int(ids.max()) + 1 if ids.size else 0, dtype=bool)
+        mask[ids] = True
+        return cls.from_mask(mask)
+
+    def add(self, value):
+        word = value >> 6
+        if word >= len(self.words):
+            grown = np.zeros(max(word + 1, 2 * len(self.words)), dtype='<u8')
+            grown[:len(self.words)] = self.words
+            self.words = grown
+        self.words[word] |= np.uint64(1) << np.uint64(value & 63)
+
+    def discard(self, value):
+        word = value >> 6
+        if word < len(self.words):
+            self.words[word] &= ~(np.uint64(1) << np.uint64(value & 63))
+
+    def __contains__(self, value):
+        word = value >> 6
+        return word < len(self.words) and bool((self.words[word] >> np.uint64(value & 63)) & np.uint64(1))
+
+    def __and__(self, other):
+        size = min(len(self.words), len(other.words))
+        return Bitset(self.words[:size] & other.words[:size])
+
+    def __or__(self, other):
+        shorter, longer = sorted((self.words, other.words), key=len)
+        words = longer.copy()
+        words[:len(shorter)] |= shorter
+        return Bitset(words)
+
+    def count(self):
+        return int(np.bitwise_count(self.words).sum())
+
+    def ids(self):
+        """Ids del conjunto en orden ascendente"""
+        return np.flatnonzero(np.unpackbits(self.words.view(np.uint8), bitorder='little'))
+
+    def __len__(self):
+        return self.count()
+
+
+def _grow(array, size, fill):
+    if size <= len(array):
+        return array
+    grown = np.full(max(size, 2 * len(array)), fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class BitsetIndex(CatalogIndex):
+    """Bitsets por valor de los filtros de baja cardinalidad, por tipo de item"""
+
+    name = 'bitset'
+    _state = ('_universe', '_bitsets', '_providers', '_created')
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    def _reset(self):
+        self._universe = {item_type: Bitset() for item_type in ITEM_TYPES}
+        self._bitsets = {item_type: {field: {} for field in BITSET_FIELDS} for item_type in ITEM_TYPES}
+        self._providers = {item_type: np.zeros(0, dtype=np.int64) for item_type in ITEM_TYPES}
+        self._created = {item_type: np.zeros(0, dtype=np.float64) for item_type in ITEM_TYPES}
+
+    # --- Mantenimiento ---
+
+    def _rows(self, item_type, ids=None):
+        model = Product if item_type == 'producto' else Service
+        columns = [model.id, model.status, model.is_featured, model.has_cert_iso9001, model.has_cert_iso14001,
+                   model.category_id, model.provider_id, model.created_at]
+        if model is Service:
+            columns.append(Service.modality)
+        query = select(*columns)
+        if ids is not None:
+            query = query.where(model.id.in_(ids))
+        return db.session.execute(query)
+
+    def _rebuild(self):
+        self._reset()
+        for item_type in ITEM_TYPES:
+            rows = self._rows(item_type).all()
+            if not rows:
+                continue
+            columns = dict(zip(rows[0]._fields, zip(*rows)))
+            ids = np.asarray(columns['id'], dtype=np.int64)
+            size = int(ids.max()) + 1
+            for field in BITSET_FIELDS:
+                if field not in columns:
+                    continue
+                # Un código por valor distinto y un bitset por código
+                codes_by_value = {}
+                codes = np.fromiter(
+                    (codes_by_value.setdefault(value, len(codes_by_value)) for value in columns[field]),
+                    dtype=np.int64, count=len(ids)
+                )
+                for value, code in codes_by_value.items():
+                    mask = np.zeros(size, dtype=bool)
+                    mask[ids[codes == code]] = True
+                    self._bitsets[item_type][field][value] = Bitset.from_mask(mask)
+            mask = np.zeros(size, dtype=bool)
+            mask[ids] = True
+            self._universe[item_type] = Bitset.from_mask(mask)
+            self._providers[item_type] = np.zeros(size, dtype=np.int64)
+            self._providers[item_type][ids] = [provider_id or 0 for provider_id in columns['provider_id']]
+            self._created[item_type] = np.full(size, -np.inf)
+            self._created[item_type][ids] = [created.timestamp() if created else -np.inf for created in columns['created_at']]
+
+    def _update(self, refs):
+        ids_by_type = {}
+        for item_type, item_id in refs:
+            ids_by_type.setdefault(item_type, []).append(item_id)
+            self._remove(item_type, item_id)
+        for item_type, ids in ids_by_type.items():
+            for row in self._rows(item_type, ids):
+                self._add(item_type, row)
+
+    def _provider_refs(self, provider_ids):
+        # Los bitsets no dependen de los datos del proveedor (solo de su id)
+        return []
+
+    def _add(self, item_type, row):
+        for field in BITSET_FIELDS:
+            if field in row._fields:
+                self._bitsets[item_type][field].setdefault(getattr(row, field), Bitset()).add(row.id)
+        self._universe[item_type].add(row.id)
+        self._providers[item_type] = _grow(self._providers[item_type], row.id + 1, 0)
+        self._providers[item_type][row.id] = row.provider_id or 0
+        self._created[item_type] = _grow(self._created[item_type], row.id + 1, -np.inf)
+        self._created[item_type][row.id] = row.created_at.timestamp() if row.created_at else -np.inf
+
+    def _remove(self, item_type, item_id):
+        for values in self._bitsets[item_type].values():
+            for bits in values.values():
+                bits.discard(item_id)
+        self._universe[item_type].discard(item_id)
+
+    # --- Consulta ---
+
+    def match(self, item_type, constraints):
+        """Bitset de los items del tipo con field == valor para cada restricción"""
+        result = self._universe[item_type]
+        for field, value in constraints.items():
+            if field == 'provider_id':
+                bits = Bitset.from_mask(self._providers[item_type] == value)
+            else:
+                bits = self._bitsets[item_type].get(field, {}).get(value)
+                if bits is None:
+                    return Bitset()
+            result = result & bits
+        return result
+
+    def _search_matches(self, filters):
+        """Bitsets por tipo de los items que cumplen los filtros de /catalog/search"""
+        constraints = {'status': 'activo'}
+        for field in ('category_id', 'provider_id'):
+            if filters.get(field):
+                constraints[field] = filters[field]
+        for field in ('has_cert_iso9001', 'has_cert_iso14001', 'is_featured'):
+            if filters.get(field):
+                constraints[field] = True
+        item_types = [filters['type']] if filters.get('type') in ITEM_TYPES else list(ITEM_TYPES)
+        return {item_type: self.match(item_type, constraints) for item_type in item_types}
+
+    def search(self, filters, relevant_refs=None, page=1, per_page=12):
+        """
+        Equivalente en memoria de search_catalog_items: (referencias de la página, total).
+
+        Los filtros se combinan con AND de bitsets; con relevant_refs se
+        conservan esas referencias en su orden y, si no, se ordena por fecha
+        de creación descendente (a igual fecha, id descendente y luego tipo).
+        """
+        offset = (page - 1) * per_page
+        if relevant_refs:
+            refs = self.filter_refs(filters, relevant_refs)
+            return refs[offset:offset + per_page], len(refs)
+        self.refresh()
+        with self._lock:
+            return self._newest(self._search_matches(filters), offset, per_page)
+
+    def filter_refs(self, filters, refs):
+        """Las referencias que cumplen los filtros de /catalog/search, en el mismo orden"""
+        self.refresh()
+        with self._lock:
+            matches = self._search_matches(filters)
+            return [ref for ref in refs if ref[0] in matches and ref[1] in matches[ref[0]]]
+
+    def _newest(self, matches, offset, limit):
+        """Página de referencias por fecha de creación descendente sin ordenar todo el conjunto"""
+        # Códigos en orden alfabético de tipo: el último desempate coincide con el de SQL
+        item_types = sorted(matches)
+        ids, created, codes = [], [], []
+        for code, item_type in enumerate(item_types):
+            found = matches[item_type].ids()
+            ids.append(found)
+            created.append(self._created[item_type][found])
+            codes.append(np.full(len(found), code))
+        ids, created, codes = np.concatenate(ids), np.concatenate(created), np.concatenate(codes)
+        total = len(ids)
+
+        wanted = offset + limit
+        if wanted < total:
+            # Solo los que pueden caer en las primeras `wanted` posiciones (incluye empates)
+            threshold = np.partition(created, total - wanted)[total - wanted]
+            keep = created >= threshold
+            ids, created, codes = ids[keep], created[keep], codes[keep]
+        order = np.lexsort((codes, -ids, -created))[offset:offset + limit]
+        return [(item_types[codes[position]], int(ids[position])) for position in order], total
+
+    def listing_count(self, item_type, filters):
+        """
+        Total de un listado público resuelto con bitsets.
+
+        Devuelve None si los filtros incluyen búsqueda de texto o rango de
+        precio, que no se indexan aquí.
+        """
+        if filters.get('search') or filters.get('min_price') is not None or filters.get('max_price') is not None:
+            return None
+        constraints = {'status': 'activo'}
+        for field in ('category_id', 'provider_id', 'modality'):
+            if filters.get(field):
+                constraints[field] = filters[field]
+        if filters.get('is_featured') is not None:
+            constraints['is_featured'] = filters['is_featured']
+        self.refresh()
+        with self._lock:
+            return self.match(item_type, constraints).count()
+
+    def stats(self):
+        with self._lock:
+            bitsets = [bits for fields in self._bitsets.values() for values in fields.values() for bits in values.values()]
+            return {
+                "built": self._built,
+                "documents": len(self),
+                "bitsets": len(bitsets),
+                "bytes": sum(bits.words.nbytes for bits in bitsets),
+                "pending": self.pending()
+            }
+
+    def __len__(self):
+        return sum(bits.count() for bits in self._universe.values())
+
+
+bitset_index = register_index(BitsetIndex())
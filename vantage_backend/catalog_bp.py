@@ -1,9 +1,30 @@
-from flask import request, jsonify, Blueprint
+from flask import request, jsonify, Blueprint, g, current_app
 from .models import db, Product, Service, ProviderProfile, User, Category, ProviderContact, ProviderCertification
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
 from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+from .catalog_events import provider_version
+from .catalog_cache import cached_response, response_cache, detail_etag
+from .catalog_read_model import search_catalog_items, search_facet_source, rank_relevant_refs
+from .search_cache import search_result_cache, search_cache_key
+from .catalog_facets import parse_facets, listing_facet_source, compute_facets
+from .provider_cards import provider_card, provider_card_cache
+from .spelling import catalog_speller
+from .semantic_index import semantic_index, semantic_breaker
+from .circuit_breaker import CircuitOpenError
+from .suggest_index import suggest_index, SUGGESTION_TYPES
+from .bitset_index import bitset_index, bitset_filters_enabled
+from .catalog_indexes import catalog_indexes
+from .search_explain import SearchTrace, search_stage_metrics
+from .catalog_queries import (
+    catalog_query, parse_listing_filters, apply_listing_filters, apply_sort, keyset_paginate,
+    paginate_listing, TOTAL_MODES, totals_cache, parse_fields, apply_fieldset,
+    load_search_items, parse_item_refs, load_items, apply_fuzzy_fallback, FUZZY_MIN_HITS,
+    PRODUCT_LISTING_FIELDS, SERVICE_LISTING_FIELDS, PRODUCT_SEARCH_FIELDS, SERVICE_SEARCH_FIELDS, ITEM_SEARCH_FIELDS,
+    provider_summary, category_summary, serialize_product_listing, serialize_service_listing
+)
 import os
-import requests
+import time
 from typing import List, Dict, Any
 
 catalog_bp = Blueprint('catalog', __name__, url_prefix='/catalog')
@@ -180,13 +201,13 @@ def handle_service(service_id):
 # --- Public Catalog Endpoints ---
 
 @catalog_bp.route('/public/products', methods=['GET'])
+@cached_response('products')
 def get_public_products():
-    "point público para obtener productos activos con búsqueda, filtros y paginación"""
+    """Endpoint público para obtener productos activos con búsqueda, filtros y paginación"""
     # Obtener parámetros de consulta
-    search = request.args.get('search', '').strip()
-    category_id = request.args.get('category_id', type=int)
-    provider_id = request.args.get('provider_id', type=int)
-    sort_by = request.args.get('sort_by', 'name')  # name, provider, category, created_at, price
+    filters = parse_listing_filters(request.args, Product)
+    fields = parse_fields(request.args, PRODUCT_LISTING_FIELDS)  # fields=id,name,price,... (None = todos)
+    sort_by = request.args.get('sort_by', 'relevance' if filters['search'] else 'name')  # name, provider, category, created_at, price, relevance
     sort_order = request.args.get('sort_order', 'asc')  # asc, desc
     
     # Parámetros de paginación
@@ -198,114 +219,66 @@ def get_public_products():
         page = 1
     if per_page < 1 or per_page > 50:  # Máximo 50 productos por página
         per_page = 12 
-    # Query base
-    query = Product.query.filter_by(status='activo')
-    
-    # Aplicar filtros de búsqueda avanzada
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            db.or_(
-                Product.name.ilike(search_term),
-                Product.description.ilike(search_term),
-                Product.sku.ilike(search_term),
-                Product.technical_details.ilike(search_term)
-            )
-        )
-    
-    # Filtros múltiples
-    if category_id:
-        query = query.filter_by(category_id=category_id)
-    
-    if provider_id:
-        query = query.filter_by(provider_id=provider_id)
-    
-    # Filtros adicionales
-    min_price = request.args.get('min_price', type=float)
-    max_price = request.args.get('max_price', type=float)
-    is_featured = request.args.get('is_featured', type=lambda v: v.lower() == 'true') 
-    if min_price is not None:
-        query = query.filter(Product.price >= min_price)
-    
-    if max_price is not None:
-        query = query.filter(Product.price <= max_price)
-    
-    if is_featured is not None:
-        query = query.filter_by(is_featured=is_featured)
-    
-    # Aplicar ordenamiento
-    if sort_by == 'name':     query = query.order_by(Product.name.asc() if sort_order == 'asc' else Product.name.desc())
-    elif sort_by == 'provider':     query = query.join(ProviderProfile).order_by(
-            ProviderProfile.company_name.asc() if sort_order == 'asc' else ProviderProfile.company_name.desc()
-        )
-    elif sort_by == 'category':     query = query.join(Category).order_by(
-            Category.name.asc() if sort_order == 'asc' else Category.name.desc()
-        )
-    elif sort_by == 'created_at':     query = query.order_by(Product.created_at.asc() if sort_order == 'asc' else Product.created_at.desc())
-    elif sort_by == 'price':     query = query.order_by(Product.price.asc() if sort_order == 'asc' else Product.price.desc())
-    else:
-        query = query.order_by(Product.name.asc())
-    
-    # Aplicar paginación
-    pagination = query.paginate(
-        page=page, 
-        per_page=per_page, 
-        error_out=False
-    )
-    
-    products_list = []
-    for product in pagination.items:
-        provider = ProviderProfile.query.get(product.provider_id)
-        category = Category.query.get(product.category_id)
+    include_total = request.args.get('include_total', 'exact')  # exact, approx, false
+    if include_total not in TOTAL_MODES:
+        include_total = 'exact'
+    # Conteos por faceta del conjunto filtrado (una sola consulta), si se piden
+    facets = parse_facets(request.args, Product)
+    facet_counts = compute_facets(listing_facet_source(Product, filters), facets) if facets else None
+    # Query base con proveedor y categoría precargados
+    query = catalog_query(Product, sort_by=sort_by, fields=fields)
+    query = apply_listing_filters(query, Product, filters)
+    query = apply_fieldset(query, Product, PRODUCT_LISTING_FIELDS, fields, sort_by)
+    
+    # Modo cursor (keyset): opcional, sin OFFSET ni COUNT(*)
+    cursor = request.args.get('cursor')
+    if cursor is not None:
+        try:
+            items, next_cursor = keyset_paginate(query, Product, sort_by, sort_order, cursor, per_page)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
         
-        products_list.append({
-            "id": product.id,
-            "name": product.name,
-            "description": product.description,
-            "technical_details": product.technical_details,
-            "sku": product.sku,
-            "status": product.status,
-            "main_image_url": product.main_image_url,
-            "additional_images": product.additional_images or [],
-            "price": getattr(product, 'price', None),
-            "is_featured": getattr(product, 'is_featured', False),
-            "created_at": product.created_at.isoformat() if hasattr(product, 'created_at') and product.created_at else None,
-            "provider": {
-                "id": provider.id,
-                "company_name": provider.company_name
-            } if provider else None,
-            "category": {
-                "id": category.id,
-                "name": category.name
-            } if category else None
-        })
+        response = {
+            "products": [serialize_product_listing(product, fields) for product in items],
+            "pagination": {
+                "mode": "cursor",
+                "per_page": per_page,
+                "has_next": next_cursor is not None,
+                "next_cursor": next_cursor
+            }
+        }
+        if facet_counts is not None:
+            response["facets"] = facet_counts
+        return jsonify(response)
+    
+    query = apply_sort(query, Product, sort_by, sort_order, filters)
+    
+    # Aplicar paginación; el total puede ser exacto (cacheado), aproximado u omitirse
+    items, pagination_info = paginate_listing(query, Product, filters, page, per_page, include_total)
+    # Búsqueda con pocos resultados: reintento tolerante a errores de tipeo
+    items, pagination_info, search_info = apply_fuzzy_fallback(
+        items, pagination_info, Product, filters, fields, PRODUCT_LISTING_FIELDS, page, per_page
+    )
     
-    # Información de paginación
-    pagination_info = {
-        "current_page": page,
-        "per_page": per_page,
-        "total_items": pagination.total,
-        "total_pages": pagination.pages,
-        "has_next": pagination.has_next,
-        "has_prev": pagination.has_prev,
-        "next_page": pagination.next_num if pagination.has_next else None,
-        "prev_page": pagination.prev_num if pagination.has_prev else None
-    }
+    products_list = [serialize_product_listing(product, fields) for product in items]
     
-    return jsonify({
+    response = {
         "products": products_list,
-        "pagination": pagination_info
-    })
+        "pagination": pagination_info,
+        "search_info": search_info
+    }
+    if facet_counts is not None:
+        response["facets"] = facet_counts
+    return jsonify(response)
 
 @catalog_bp.route('/public/services', methods=['GET'])
+@cached_response('services')
 def get_public_services():
-    """point público para obtener servicios activos con búsqueda, filtros y paginación"""
+    """Endpoint público para obtener servicios activos con búsqueda, filtros y paginación"""
     # Obtener parámetros de consulta
-    search = request.args.get('search', '').strip()
-    category_id = request.args.get('category_id', type=int)
-    provider_id = request.args.get('provider_id', type=int)
-    modality = request.args.get('modality', '').strip()
-    sort_by = request.args.get('sort_by', 'name')  # name, provider, category, modality, created_at
+    filters = parse_listing_filters(request.args, Service)
+    fields = parse_fields(request.args, SERVICE_LISTING_FIELDS)  # fields=id,name,price,... (None = todos)
+    sort_by = request.args.get('sort_by', 'relevance' if filters['search'] else 'name')  # name, provider, category, modality, created_at, relevance
     sort_order = request.args.get('sort_order', 'asc')  # asc, desc
     
     # Parámetros de paginación
@@ -317,105 +290,60 @@ def get_public_services():
         page = 1
     if per_page < 1 or per_page > 50:  # Máximo 50 servicios por página
         per_page = 12 
-    # Query base
-    query = Service.query.filter_by(status='activo')
-    
-    # Aplicar filtros de búsqueda avanzada
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            db.or_(
-                Service.name.ilike(search_term),
-                Service.description.ilike(search_term)
-            )
-        )
-    
-    # Filtros múltiples
-    if category_id:
-        query = query.filter_by(category_id=category_id)
-    
-    if provider_id:
-        query = query.filter_by(provider_id=provider_id)
-    
-    if modality:
-        query = query.filter_by(modality=modality)
-    
-    # Filtros adicionales
-    min_price = request.args.get('min_price', type=float)
-    max_price = request.args.get('max_price', type=float)
-    is_featured = request.args.get('is_featured', type=lambda v: v.lower() == 'true') 
-    if min_price is not None:
-        query = query.filter(Service.price >= min_price)
-    
-    if max_price is not None:
-        query = query.filter(Service.price <= max_price)
-    
-    if is_featured is not None:
-        query = query.filter_by(is_featured=is_featured)
-    
-    # Aplicar ordenamiento
-    if sort_by == 'name':     query = query.order_by(Service.name.asc() if sort_order == 'asc' else Service.name.desc())
-    elif sort_by == 'provider':     query = query.join(ProviderProfile).order_by(
-            ProviderProfile.company_name.asc() if sort_order == 'asc' else ProviderProfile.company_name.desc()
-        )
-    elif sort_by == 'category':     query = query.join(Category).order_by(
-            Category.name.asc() if sort_order == 'asc' else Category.name.desc()
-        )
-    elif sort_by == 'modality':     query = query.order_by(Service.modality.asc() if sort_order == 'asc' else Service.modality.desc())
-    elif sort_by == 'created_at':     query = query.order_by(Service.created_at.asc() if sort_order == 'asc' else Service.created_at.desc())
-    elif sort_by == 'price':     query = query.order_by(Service.price.asc() if sort_order == 'asc' else Service.price.desc())
-    else:
-        query = query.order_by(Service.name.asc())
-    
-    # Aplicar paginación
-    pagination = query.paginate(
-        page=page, 
-        per_page=per_page, 
-        error_out=False
-    )
-    
-    services_list = []
-    for service in pagination.items:
-        provider = ProviderProfile.query.get(service.provider_id)
-        category = Category.query.get(service.category_id)
+    include_total = request.args.get('include_total', 'exact')  # exact, approx, false
+    if include_total not in TOTAL_MODES:
+        include_total = 'exact'
+    # Conteos por faceta del conjunto filtrado (una sola consulta), si se piden
+    facets = parse_facets(request.args, Service)
+    facet_counts = compute_facets(listing_facet_source(Service, filters), facets) if facets else None
+    # Query base con proveedor y categoría precargados
+    query = catalog_query(Service, sort_by=sort_by, fields=fields)
+    query = apply_listing_filters(query, Service, filters)
+    query = apply_fieldset(query, Service, SERVICE_LISTING_FIELDS, fields, sort_by)
+    
+    # Modo cursor (keyset): opcional, sin OFFSET ni COUNT(*)
+    cursor = request.args.get('cursor')
+    if cursor is not None:
+        try:
+            items, next_cursor = keyset_paginate(query, Service, sort_by, sort_order, cursor, per_page)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
         
-        services_list.append({
-            "id": service.id,
-            "name": service.name,
-            "description": service.description,
-            "modality": service.modality,
-            "status": service.status,
-            "price": getattr(service, 'price', None),
-            "is_featured": getattr(service, 'is_featured', False),
-            "created_at": service.created_at.isoformat() if hasattr(service, 'created_at') and service.created_at else None,
-            "provider": {
-                "id": provider.id,
-                "company_name": provider.company_name
-            } if provider else None,
-            "category": {
-                "id": category.id,
-                "name": category.name
-            } if category else None
-        })
+        response = {
+            "services": [serialize_service_listing(service, fields) for service in items],
+            "pagination": {
+                "mode": "cursor",
+                "per_page": per_page,
+                "has_next": next_cursor is not None,
+                "next_cursor": next_cursor
+            }
+        }
+        if facet_counts is not None:
+            response["facets"] = facet_counts
+        return jsonify(response)
+    
+    query = apply_sort(query, Service, sort_by, sort_order, filters)
+    
+    # Aplicar paginación; el total puede ser exacto (cacheado), aproximado u omitirse
+    items, pagination_info = paginate_listing(query, Service, filters, page, per_page, include_total)
+    # Búsqueda con pocos resultados: reintento tolerante a errores de tipeo
+    items, pagination_info, search_info = apply_fuzzy_fallback(
+        items, pagination_info, Service, filters, fields, SERVICE_LISTING_FIELDS, page, per_page
+    )
     
-    # Información de paginación
-    pagination_info = {
-        "current_page": page,
-        "per_page": per_page,
-        "total_items": pagination.total,
-        "total_pages": pagination.pages,
-        "has_next": pagination.has_next,
-        "has_prev": pagination.has_prev,
-        "next_page": pagination.next_num if pagination.has_next else None,
-        "prev_page": pagination.prev_num if pagination.has_prev else None
-    }
+    services_list = [serialize_service_listing(service, fields) for service in items]
     
-    return jsonify({
+    response = {
         "services": services_list,
-        "pagination": pagination_info
-    })
+        "pagination": pagination_info,
+        "search_info": search_info
+    }
+    if facet_counts is not None:
+        response["facets"] = facet_counts
+    return jsonify(response)
 
 @catalog_bp.route('/public/categories', methods=['GET'])
+@cached_response('categories')
 def get_public_categories():
     """Endpoint público para obtener todas las categorías"""
     categories = Category.query.all()
@@ -431,6 +359,7 @@ def get_public_categories():
     return jsonify({"categories": categories_list})
 
 @catalog_bp.route('/public/providers', methods=['GET'])
+@cached_response('providers')
 def get_public_providers():
     """Endpoint público para obtener todos los proveedores activos"""
     # Filtrar por usuarios activos que son proveedores
@@ -441,6 +370,7 @@ def get_public_providers():
     return jsonify(providers=[{"id": p.id, "company_name": p.company_name} for p in providers])
 
 @catalog_bp.route('/public/modalities', methods=['GET'])
+@cached_response('modalities')
 def get_public_modalities():
     """Endpoint público para obtener todas las modalidades de servicios"""
     modalities = db.session.query(Service.modality).distinct().filter(
@@ -450,16 +380,23 @@ def get_public_modalities():
     return jsonify(modalities=[{"name": m[0]} for m in modalities])
 
 @catalog_bp.route('/public/featured', methods=['GET'])
+@cached_response('featured')
 def get_featured_items():
     """Endpoint público para obtener productos y servicios destacados"""
-    featured_products = Product.query.filter_by(status='activo', is_featured=True).all()
-    featured_services = Service.query.filter_by(status='activo', is_featured=True).all()
+    # Limitar el set destacado para que la respuesta no crezca con el catálogo
+    limit = request.args.get('limit', 50, type=int)
+    if limit < 1 or limit > 100:
+        limit = 50
+
+    featured_products = catalog_query(Product).filter(Product.is_featured == True).order_by(
+        Product.created_at.desc(), Product.id.desc()
+    ).limit(limit).all()
+    featured_services = catalog_query(Service).filter(Service.is_featured == True).order_by(
+        Service.created_at.desc(), Service.id.desc()
+    ).limit(limit).all()
     
     products_list = []
     for product in featured_products:
-        provider = ProviderProfile.query.get(product.provider_id)
-        category = Category.query.get(product.category_id)
-        
         products_list.append({
             "id": product.id,
             "name": product.name,
@@ -468,24 +405,12 @@ def get_featured_items():
             "sku": product.sku,
             "status": product.status,
             "is_featured": product.is_featured,
-            "provider": {
-                "id": provider.id,
-                "company_name": provider.company_name,
-                "about_us": provider.about_us,
-                "logo_url": provider.logo_url,
-                "website_url": provider.website_url
-            } if provider else None,
-            "category": {
-                "id": category.id,
-                "name": category.name
-            } if category else None
+            "provider": provider_summary(product.provider, extended=True),
+            "category": category_summary(product.category)
         })
     
     services_list = []
     for service in featured_services:
-        provider = ProviderProfile.query.get(service.provider_id)
-        category = Category.query.get(service.category_id)
-        
         services_list.append({
             "id": service.id,
             "name": service.name,
@@ -493,19 +418,16 @@ def get_featured_items():
             "modality": service.modality,
             "status": service.status,
             "is_featured": service.is_featured,
-            "provider": {
-                "id": provider.id,
-                "company_name": provider.company_name,
-                "about_us": provider.about_us,
-                "logo_url": provider.logo_url,
-                "website_url": provider.website_url
-            } if provider else None,
-            "category": {
-                "id": category.id,
-                "name": category.name
-            } if category else None
+            "provider": provider_summary(service.provider, extended=True),
+            "category": category_summary(service.category)
         })
     
+    # Items incluidos, para que la caché invalide esta respuesta solo si cambian
+    g.cache_item_refs = (
+        {('producto', product.id) for product in featured_products}
+        | {('servicio', service.id) for service in featured_services}
+    )
+    
     return jsonify({
         "featured_products": products_list,
         "featured_services": services_list
@@ -514,37 +436,25 @@ def get_featured_items():
 @catalog_bp.route('/public/products/<int:product_id>', methods=['GET'])
 def get_public_product_detail(product_id):
     """Endpoint público para obtener detalles completos de un producto específico"""
-    product = Product.query.filter_by(id=product_id, status='activo').first()
+    # Validador por recurso: si no cambió, 304 sin armar la ficha completa
+    stamp = db.session.query(Product.updated_at, Product.provider_id).filter_by(id=product_id, status='activo').first()
+    if not stamp:
+        return jsonify({"message": "Producto no encontrado"}), 404
+    etag = detail_etag('p', product_id, stamp.updated_at, provider_version(stamp.provider_id))
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    
+    product = Product.query.options(joinedload(Product.category)).filter_by(id=product_id, status='activo').first()
     if not product:
         return jsonify({"message": "Producto no encontrado"}), 404
     
-    provider = ProviderProfile.query.get(product.provider_id)
-    category = Category.query.get(product.category_id)
-    
-    # Obtener contactos del proveedor
-    provider_contacts = []
-    if provider:
-        contacts = ProviderContact.query.filter_by(provider_id=provider.id).all()
-        provider_contacts = [{
-            "name": contact.name,
-            "email": contact.email,
-            "phone": contact.phone,
-            "position": contact.position,
-            "is_primary": contact.is_primary
-        } for contact in contacts]
-    
-    # Obtener certificaciones del proveedor
-    provider_certifications = []
-    if provider:
-        certifications = ProviderCertification.query.filter_by(provider_id=provider.id).all()
-        provider_certifications = [{
-            "name": cert.name,
-            "file_url": cert.file_url,
-            "expiry_date": cert.expiry_date.isoformat() if cert.expiry_date else None,
-            "uploaded_at": cert.uploaded_at.isoformat()
-        } for cert in certifications]
+    # Bloque de proveedor compartido por todos sus items (cacheado por proveedor)
+    provider = provider_card(product.provider_id)
+    category = product.category
     
-    return jsonify({
+    response = jsonify({
         "id": product.id,
         "name": product.name,
         "description": product.description,
@@ -552,77 +462,114 @@ def get_public_product_detail(product_id):
         "sku": product.sku,
         "status": product.status,
         "is_featured": product.is_featured,
-        "provider": {
-            "id": provider.id,
-            "company_name": provider.company_name,
-            "about_us": provider.about_us,
-            "logo_url": provider.logo_url,
-            "brochure_pdf_url": provider.brochure_pdf_url,
-            "website_url": provider.website_url,
-            "contacts": provider_contacts,
-            "certifications": provider_certifications
-        } if provider else None,
+        "provider": provider,
         "category": {
             "id": category.id,
             "name": category.name
         } if category else None
     })
+    response.set_etag(etag)
+    return response
 
 @catalog_bp.route('/public/services/<int:service_id>', methods=['GET'])
 def get_public_service_detail(service_id):
     """Endpoint público para obtener detalles completos de un servicio específico"""
-    service = Service.query.filter_by(id=service_id, status='activo').first()
+    # Validador por recurso: si no cambió, 304 sin armar la ficha completa
+    stamp = db.session.query(Service.updated_at, Service.provider_id).filter_by(id=service_id, status='activo').first()
+    if not stamp:
+        return jsonify({"message": "Servicio no encontrado"}), 404
+    etag = detail_etag('s', service_id, stamp.updated_at, provider_version(stamp.provider_id))
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    
+    service = Service.query.options(joinedload(Service.category)).filter_by(id=service_id, status='activo').first()
     if not service:
         return jsonify({"message": "Servicio no encontrado"}), 404
     
-    provider = ProviderProfile.query.get(service.provider_id)
-    category = Category.query.get(service.category_id)
-    
-    # Obtener contactos del proveedor
-    provider_contacts = []
-    if provider:
-        contacts = ProviderContact.query.filter_by(provider_id=provider.id).all()
-        provider_contacts = [{
-            "name": contact.name,
-            "email": contact.email,
-            "phone": contact.phone,
-            "position": contact.position,
-            "is_primary": contact.is_primary
-        } for contact in contacts]
-    
-    # Obtener certificaciones del proveedor
-    provider_certifications = []
-    if provider:
-        certifications = ProviderCertification.query.filter_by(provider_id=provider.id).all()
-        provider_certifications = [{
-            "name": cert.name,
-            "file_url": cert.file_url,
-            "expiry_date": cert.expiry_date.isoformat() if cert.expiry_date else None,
-            "uploaded_at": cert.uploaded_at.isoformat()
-        } for cert in certifications]
+    # Bloque de proveedor compartido por todos sus items (cacheado por proveedor)
+    provider = provider_card(service.provider_id)
+    category = service.category
     
-    return jsonify({
+    response = jsonify({
         "id": service.id,
         "name": service.name,
         "description": service.description,
         "modality": service.modality,
         "status": service.status,
         "is_featured": service.is_featured,
-        "provider": {
-            "id": provider.id,
-            "company_name": provider.company_name,
-            "about_us": provider.about_us,
-            "logo_url": provider.logo_url,
-            "brochure_pdf_url": provider.brochure_pdf_url,
-            "website_url": provider.website_url,
-            "contacts": provider_contacts,
-            "certifications": provider_certifications
-        } if provider else None,
+        "provider": provider,
         "category": {
             "id": category.id,
             "name": category.name
         } if category else None
     })
+    response.set_etag(etag)
+    return response
+
+@catalog_bp.route('/public/items', methods=['GET', 'POST'])
+def get_public_items_batch():
+    """
+    Endpoint público para resolver varios productos y servicios de una vez.
+
+    Recibe referencias tipadas ('producto:12', 'servicio:7') en ?ids=a,b,c o
+    en el cuerpo JSON {"ids": [...]} y devuelve los items activos en el mismo
+    orden, con dos consultas IN en total. Acepta ?fields= como la búsqueda.
+    """
+    if request.method == 'POST':
+        raw_ids = (request.get_json(silent=True) or {}).get('ids', [])
+        if not isinstance(raw_ids, list):
+            return jsonify({"message": "ids debe ser una lista"}), 400
+    else:
+        raw_ids = [value for value in request.args.get('ids', '').split(',') if value.strip()]
+
+    try:
+        refs = parse_item_refs(raw_ids)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    fields = parse_fields(request.args, PRODUCT_SEARCH_FIELDS, SERVICE_SEARCH_FIELDS)
+    loaded = load_items(refs, ITEM_SEARCH_FIELDS, fields, status='activo')
+
+    return jsonify({
+        "items": [loaded[ref] for ref in refs if ref in loaded],
+        "missing": [f"{item_type}:{item_id}" for item_type, item_id in refs if (item_type, item_id) not in loaded]
+    })
+
+@catalog_bp.route('/public/suggest', methods=['GET'])
+def get_search_suggestions():
+    """
+    Endpoint público de autocompletado para la caja de búsqueda.
+
+    Sugiere productos, servicios, SKUs, categorías y proveedores cuyo texto
+    empieza por ?q= (en cualquier palabra), desde un índice en memoria.
+    ?types=producto,sku acota los tipos y ?limit= (máx. 20) la cantidad.
+    """
+    query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', 8, type=int), 1), 20)
+    types = None
+    if request.args.get('types'):
+        types = {value.strip() for value in request.args['types'].split(',')} & set(SUGGESTION_TYPES)
+    
+    return jsonify({
+        "query": query,
+        "suggestions": suggest_index.suggest(query, limit=limit, types=types)
+    })
+
+@catalog_bp.route('/public/spelling', methods=['GET'])
+def get_spelling_suggestion():
+    """Endpoint público: sugerencia "¿quisiste decir?" para una consulta del catálogo"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"message": "Consulta requerida"}), 400
+    
+    suggestion, corrections = catalog_speller.suggest(query)
+    return jsonify({
+        "query": query,
+        "suggestion": suggestion,
+        "corrections": corrections
+    })
 
 # --- Admin Endpoints for Featured Management ---
 
@@ -668,186 +615,200 @@ def toggle_service_featured(service_id):
         "is_featured": service.is_featured
     }) 
 
+@catalog_bp.route('/admin/metrics', methods=['GET'])
+@jwt_required()
+def get_catalog_metrics():
+    """Endpoint para administradores: contadores de las cachés, índices y circuit breakers del catálogo"""
+    user_id = get_jwt_identity()
+    user = User.query.get(int(user_id))
+    if not user or user.role != 'administrador':
+        return jsonify({"message": "Acceso no autorizado"}), 403
+    
+    return jsonify({
+        "caches": {
+            "responses": response_cache.stats(),
+            "totals": totals_cache.stats(),
+            "provider_cards": provider_card_cache.stats(),
+            "search_results": search_result_cache.stats()
+        },
+        "indexes": {index.name: index.maintenance_stats() for index in catalog_indexes},
+        "search_stages": search_stage_metrics.snapshot(),
+        "breakers": {
+            "semantic_search": semantic_breaker.snapshot()
+        }
+    })
+
+def _is_admin_request():
+    """Si la petición trae un JWT válido de administrador (el token es opcional)"""
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        return False
+    user = db.session.get(User, int(user_id)) if user_id else None
+    return bool(user and user.role == 'administrador')
+
 @catalog_bp.route('/search', methods=['GET'])
 def search_catalog():
     """
-    Endpoint de búsqueda híbrida que combina búsqueda IA con filtros estructurados
+    Endpoint de búsqueda híbrida que combina búsqueda IA con filtros estructurados.
+
+    Con explain=1 (solo administradores) agrega el desglose por etapa, las
+    sentencias SQL con su duración, los candidatos de cada etapa y el estado
+    de las cachés (ver search_explain).
     """
+    explain = request.args.get('explain') in ('1', 'true')
+    if explain and not _is_admin_request():
+        return jsonify({"message": "Acceso no autorizado"}), 403
+    
     try:
-        # Obtener parámetros de búsqueda
-        query = request.args.get('q', '').strip()
-        category_id = request.args.get('category')
-        provider_id = request.args.get('provider')
-        has_cert_iso9001 = request.args.get('has_cert_iso9001')
-        has_cert_iso14001 = request.args.get('has_cert_iso14001')
-        is_featured = request.args.get('is_featured')
-        item_type = request.args.get('type', 'all')  # 'producto', 'servicio', 'all'
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 12))
-        
-        # Paso A: Búsqueda IA con Pinecone (si hay query de texto)
-        relevant_ids = []
-        if query:
-            try:
-                # Llamada a Pinecone para obtener IDs relevantes
-                pinecone_response = requests.post(
-                    'http://localhost:8000/api/ia/search-catalog',
-                    json={'query': query},
-                    headers={'Content-Type': 'application/json'},
-                    timeout=10
-                )
-                
-                if pinecone_response.status_code == 200:
-                    pinecone_data = pinecone_response.json()
-                    # Extraer IDs de productos y servicios de los resultados
-                    for item in pinecone_data.get('exact_matches', []) + pinecone_data.get('near_matches', []):
-                        relevant_ids.append(item['id'])
-                    
-                    print(f"🔍 Búsqueda IA encontrada: {len(relevant_ids)} IDs relevantes")
+        with SearchTrace(db.engine, capture_sql=explain) as trace:
+            # Obtener parámetros de búsqueda
+            query = request.args.get('q', '').strip()
+            category_id = request.args.get('category')
+            provider_id = request.args.get('provider')
+            has_cert_iso9001 = request.args.get('has_cert_iso9001')
+            has_cert_iso14001 = request.args.get('has_cert_iso14001')
+            is_featured = request.args.get('is_featured')
+            item_type = request.args.get('type', 'all')  # 'producto', 'servicio', 'all'
+            page = max(int(request.args.get('page', 1)), 1)
+            per_page = min(max(int(request.args.get('per_page', 12)), 1), 50)
+            fields = parse_fields(request.args, PRODUCT_SEARCH_FIELDS, SERVICE_SEARCH_FIELDS)
+            
+            filters = {
+                'type': item_type,
+                'category_id': request.args.get('category', type=int),
+                'provider_id': request.args.get('provider', type=int),
+                'has_cert_iso9001': has_cert_iso9001 == 'true',
+                'has_cert_iso14001': has_cert_iso14001 == 'true',
+                'is_featured': is_featured == 'true',
+            }
+            
+            # Búsquedas de texto repetidas: lista rankeada cacheada por consulta normalizada + filtros
+            with trace.stage('cache'):
+                cache_key = search_cache_key('catalog_search', query, filters) if query else None
+                cached = search_result_cache.get(cache_key) if cache_key else None
+            trace.cache_status('search_results', 'hit' if cached else ('miss' if cache_key else 'skip'))
+            
+            # Paso A: búsqueda semántica en el índice en memoria (si hay query de texto),
+            # con presupuesto de latencia y circuit breaker; si se abre, solo filtros
+            relevant_refs = cached['relevant_refs'] if cached else []
+            ai_stage = None
+            if query and cached is None:
+                budget = current_app.config.get('SEARCH_AI_BUDGET_MS', 800) / 1000
+                top_k = current_app.config.get('SEMANTIC_SEARCH_TOP_K', 200)
+                min_score = current_app.config.get('SEMANTIC_MIN_SCORE', 0.25)
+                ai_stage = {'budget_ms': budget * 1000, 'elapsed_ms': 0.0, 'fallback': False, 'stale': False}
+                started = time.perf_counter()
+                with trace.stage('ai'):
+                    # Los cambios pendientes del índice (re-embeddings) se aplican en segundo
+                    # plano y fuera del circuito: se esperan a lo sumo la mitad del presupuesto
+                    ai_stage['stale'] = not semantic_index.refresh_async(wait=budget / 2)
+                    remaining = budget - (time.perf_counter() - started)
+                    try:
+                        if not len(semantic_index):
+                            raise LookupError("Índice semántico aún en construcción")
+                        matches = semantic_breaker.call(lambda: semantic_index.search(
+                            query, k=top_k, min_score=min_score, timeout=remaining, refresh=False
+                        ), budget=remaining)
+                        # (tipo, id) de productos y servicios, en orden de relevancia
+                        relevant_refs = [ref for ref, _score in matches]
+                        print(f"🔍 Búsqueda semántica encontrada: {len(relevant_refs)} IDs relevantes")
+                    except CircuitOpenError:
+                        ai_stage['fallback'] = True
+                    except Exception as e:
+                        print(f"❌ Error en búsqueda semántica: {e}")
+                        # Si falla la búsqueda semántica, continuamos con búsqueda normal
+                        ai_stage['fallback'] = True
+                ai_stage['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                ai_stage['breaker'] = semantic_breaker.snapshot()
+            if query:
+                trace.count('ai_candidates', len(relevant_refs))
+            
+            # Paso B: filtros estructurados, orden y paginación. Los resultados de la
+            # búsqueda IA se filtran enteros (lista acotada y cacheable) y se pagina
+            # por slicing; sin ellos, bitsets en memoria o una consulta sobre catalog_items
+            with trace.stage('filter'):
+                if cached:
+                    ranked_refs = cached['refs']
+                elif relevant_refs:
+                    ranked_refs = rank_relevant_refs(filters, relevant_refs)
                 else:
-                    print(f"⚠️ Error en búsqueda IA: {pinecone_response.status_code}")
-                    
-            except Exception as e:
-                print(f"❌ Error conectando con Pinecone: {e}")
-                # Si falla la búsqueda IA, continuamos con búsqueda normal
-        
-        # Paso B: Aplicar filtros estructurados
-        base_query_products = Product.query
-        base_query_services = Service.query
-        
-        # Filtrar por IDs relevantes si hay resultados de IA
-        if relevant_ids:
-            base_query_products = base_query_products.filter(Product.id.in_(relevant_ids))
-            base_query_services = base_query_services.filter(Service.id.in_(relevant_ids))
-        
-        # Aplicar filtros adicionales
-        if category_id:
-            base_query_products = base_query_products.filter(Product.category_id == category_id)
-            base_query_services = base_query_services.filter(Service.category_id == category_id)
-        
-        if provider_id:
-            base_query_products = base_query_products.filter(Product.provider_id == provider_id)
-            base_query_services = base_query_services.filter(Service.provider_id == provider_id)
-        
-        if has_cert_iso9001 == 'true':
-            base_query_products = base_query_products.filter(Product.has_cert_iso9001 == True)
-            base_query_services = base_query_services.filter(Service.has_cert_iso9001 == True)
-        
-        if has_cert_iso14001 == 'true':
-            base_query_products = base_query_products.filter(Product.has_cert_iso14001 == True)
-            base_query_services = base_query_services.filter(Service.has_cert_iso14001 == True)
-        
-        if is_featured == 'true':
-            base_query_products = base_query_products.filter(Product.is_featured == True)
-            base_query_services = base_query_services.filter(Service.is_featured == True)
-        
-        # Obtener resultados según el tipo
-        results = []
-        total_count = 0
-        
-        if item_type in ['producto', 'all']:
-            products = base_query_products.paginate(
-                page=page, per_page=per_page, error_out=False
-            )
-            for product in products.items:
-                provider = ProviderProfile.query.get(product.provider_id)
-                category = Category.query.get(product.category_id)
-                results.append({
-                    'id': product.id,
-                    'name': product.name,
-                    'description': product.description,
-                    'sku': product.sku,
-                    'price': product.price,
-                    'currency': product.currency,
-                    'technical_details': product.technical_details,
-                    'has_cert_iso9001': product.has_cert_iso9001,
-                    'has_cert_iso14001': product.has_cert_iso14001,
-                    'is_featured': product.is_featured,
-                    'type': 'producto',
-                    'provider': {
-                        'id': provider.id,
-                        'name': provider.company_name
-                    } if provider else None,
-                    'category': {
-                        'id': category.id,
-                        'name': category.name
-                    } if category else None,
-                    'created_at': product.created_at.isoformat() if product.created_at else None
-                })
-            total_count += products.total
-        
-        if item_type in ['servicio', 'all']:
-            services = base_query_services.paginate(
-                page=page, per_page=per_page, error_out=False
-            )
-            for service in services.items:
-                provider = ProviderProfile.query.get(service.provider_id)
-                category = Category.query.get(service.category_id)
-                results.append({
-                    'id': service.id,
-                    'name': service.name,
-                    'description': service.description,
-                    'modality': service.modality,
-                    'duration': service.duration,
-                    'price': service.price,
-                    'currency': service.currency,
-                    'technical_details': service.technical_details,
-                    'has_cert_iso9001': service.has_cert_iso9001,
-                    'has_cert_iso14001': service.has_cert_iso14001,
-                    'is_featured': service.is_featured,
-                    'type': 'servicio',
-                    'provider': {
-                        'id': provider.id,
-                        'name': provider.company_name
-                    } if provider else None,
-                    'category': {
-                        'id': category.id,
-                        'name': category.name
-                    } if category else None,
-                    'created_at': service.created_at.isoformat() if service.created_at else None
+                    ranked_refs = None
+                if ranked_refs is not None:
+                    total_count = len(ranked_refs)
+                    page_refs = ranked_refs[(page - 1) * per_page:page * per_page]
+                elif bitset_filters_enabled():
+                    page_refs, total_count = bitset_index.search(filters, relevant_refs, page, per_page)
+                else:
+                    page_refs, total_count = search_catalog_items(filters, relevant_refs, page, per_page)
+            trace.count('filtered', total_count)
+            trace.count('page', len(page_refs))
+            
+            # Conteos por faceta del mismo conjunto filtrado (una sola consulta)
+            facets = parse_facets(request.args)
+            facet_counts = None
+            if facets:
+                with trace.stage('facets'):
+                    facet_counts = compute_facets(search_facet_source(filters, relevant_refs), facets)
+            
+            # Paso C: hidratar solo los items de la página (una consulta IN por tipo)
+            with trace.stage('hydrate'):
+                paginated_results = load_search_items(page_refs, fields)
+            trace.count('hydrated', len(paginated_results))
+            
+            # Con pocos resultados, sugerir una corrección ortográfica de la consulta
+            did_you_mean = cached['did_you_mean'] if cached else None
+            if query and not cached and total_count < FUZZY_MIN_HITS:
+                with trace.stage('spelling'):
+                    did_you_mean, _corrections = catalog_speller.suggest(query)
+            
+            # Guardar la lista rankeada salvo que la etapa IA haya caído al respaldo
+            # o haya usado un índice con cambios aún sin aplicar
+            if query and not cached and not ai_stage['fallback'] and not ai_stage['stale']:
+                search_result_cache.set(cache_key, {
+                    'relevant_refs': relevant_refs,
+                    'refs': ranked_refs,
+                    'did_you_mean': did_you_mean
                 })
-            total_count += services.total
-        
-        # Ordenar resultados por relevancia (si hay query) o por fecha
-        if query and relevant_ids:
-            # Ordenar por el orden de relevancia de Pinecone
-            id_to_rank = {id: rank for rank, id in enumerate(relevant_ids)}
-            results.sort(key=lambda x: id_to_rank.get(x['id'], len(relevant_ids)))
-        else:
-            # Ordenar por fecha de creación (más recientes primero)
-            results.sort(key=lambda x: x['created_at'] or '', reverse=True)
-        
-        # Aplicar paginación manual si es necesario
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        paginated_results = results[start_idx:end_idx]
-        
-        return jsonify({
-            'success': True,
-            'data': {
-                'items': paginated_results,
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': total_count,
-                    'pages': (total_count + per_page - 1) // per_page
-                },
-                'filters': {
-                    'query': query,
-                    'category_id': category_id,
-                    'provider_id': provider_id,
-                    'has_cert_iso9001': has_cert_iso9001,
-                    'has_cert_iso14001': has_cert_iso14001,
-                    'is_featured': is_featured,
-                    'type': item_type
-                },
-                'search_info': {
-                    'ai_search_used': bool(query and relevant_ids),
-                    'relevant_ids_count': len(relevant_ids),
-                    'total_results': len(paginated_results)
+            
+            payload = {
+                'success': True,
+                'data': {
+                    'items': paginated_results,
+                    'pagination': {
+                        'page': page,
+                        'per_page': per_page,
+                        'total': total_count,
+                        'pages': (total_count + per_page - 1) // per_page
+                    },
+                    'filters': {
+                        'query': query,
+                        'category_id': category_id,
+                        'provider_id': provider_id,
+                        'has_cert_iso9001': has_cert_iso9001,
+                        'has_cert_iso14001': has_cert_iso14001,
+                        'is_featured': is_featured,
+                        'type': item_type
+                    },
+                    'search_info': {
+                        'ai_search_used': bool(query and relevant_refs),
+                        'relevant_ids_count': len(relevant_refs),
+                        'total_results': len(paginated_results),
+                        'did_you_mean': did_you_mean,
+                        'ai_stage': ai_stage,
+                        'cached': bool(cached)
+                    },
+                    'facets': facet_counts
                 }
             }
-        }), 200
+            with trace.stage('serialize'):
+                body = current_app.json.dumps(payload)
+        
+        if explain:
+            payload['explain'] = trace.report()
+            body = current_app.json.dumps(payload)
+        return current_app.response_class(body + '\n', status=200, mimetype='application/json')
         
     except Exception as e:
         print(f"❌ Error en búsqueda de catálogo: {e}")
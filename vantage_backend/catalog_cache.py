@@ -0,0 +1,176 @@
+"""
+Caché de respuestas de los endpoints públicos del catálogo.
+
+Las respuestas anónimas de listados, categorías, proveedores, modalidades y
+destacados se guardan por endpoint + argumentos normalizados. Cada escritura
+en el catálogo invalida solo las entradas que pueden haber cambiado.
+
+Las mismas respuestas llevan un ETag fuerte derivado de la versión del
+catálogo, de modo que un If-None-Match vigente se responde con 304 antes de
+consultar la base de datos o la caché. La versión es un contador por
+proceso que no ve escrituras de otros workers ni las hechas fuera de la
+sesión, así que el ETag incluye además una ventana de CATALOG_ETAG_TTL
+segundos: un validador nunca se reconoce por más tiempo que eso.
+"""
+import hashlib
+import time
+from collections import namedtuple
+from functools import wraps
+from flask import request, g, current_app
+from .cache import TTLCache
+from .catalog_events import on_catalog_change, catalog_version, BOOT_ID
+from .catalog_queries import totals_cache
+from .provider_cards import provider_card_cache
+from .search_cache import search_result_cache
+from .catalog_indexes import catalog_indexes
+from .search_explain import search_stage_metrics
+
+# body: bytes serializados; item_refs: {('producto', id), ...} incluidos en la respuesta
+CachedResponse = namedtuple('CachedResponse', ['body', 'mimetype', 'item_refs'])
+
+response_cache = TTLCache(maxsize=512, ttl=60)
+
+# Listados que se pueden acotar a un proveedor con ?provider_id=
+_PROVIDER_SCOPED = {'producto': 'products', 'servicio': 'services'}
+
+_clock = time.time
+
+
+def init_catalog_caches(app):
+    """Configurar las cachés del catálogo con los límites de la app y reiniciarlas"""
+    totals_cache.configure(
+        maxsize=app.config.get('CATALOG_TOTALS_CACHE_SIZE', 2048),
+        ttl=app.config.get('CATALOG_TOTALS_CACHE_TTL', 300)
+    )
+    response_cache.configure(
+        maxsize=app.config.get('CATALOG_RESPONSE_CACHE_SIZE', 512),
+        ttl=app.config.get('CATALOG_RESPONSE_CACHE_TTL', 60)
+    )
+    provider_card_cache.configure(
+        maxsize=app.config.get('CATALOG_PROVIDER_CARD_CACHE_SIZE', 1024),
+        ttl=app.config.get('CATALOG_PROVIDER_CARD_CACHE_TTL', 600)
+    )
+    search_result_cache.configure(
+        maxsize=app.config.get('CATALOG_SEARCH_CACHE_SIZE', 1024),
+        ttl=app.config.get('CATALOG_SEARCH_CACHE_TTL', 300)
+    )
+    for cache in (totals_cache, response_cache, provider_card_cache, search_result_cache):
+        cache.clear()
+        cache.reset_stats()
+    search_stage_metrics.reset()
+    # Los índices en memoria se construyen con la primera consulta de esta app
+    for index in catalog_indexes:
+        index.rebuild_interval = app.config.get('CATALOG_INDEX_REBUILD_SECONDS', 3600)
+        index.invalidate()
+
+
+def normalized_args(args):
+    """Argumentos de la query como tupla ordenada, sin espacios sobrantes"""
+    return tuple(sorted((key, value.strip()) for key, value in args.items(multi=True)))
+
+
+def etag_window():
+    """Ventana de vigencia actual de los ETag (cambia cada CATALOG_ETAG_TTL segundos)"""
+    ttl = current_app.config.get('CATALOG_ETAG_TTL', 60)
+    return int(_clock() // ttl) if ttl else 0
+
+
+def catalog_etag(key, version):
+    """ETag de una respuesta pública: proceso + ventana + versión del catálogo + clave"""
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:12]
+    return f"{BOOT_ID}-{etag_window()}-{version}-{digest}"
+
+
+def cached_response(endpoint):
+    """
+    Cachear la respuesta 200 de un endpoint público por endpoint + argumentos.
+
+    Antes de cualquier consulta responde 304 si el If-None-Match coincide
+    con el ETag de la versión actual. La vista puede declarar en
+    g.cache_item_refs los items que incluye para que las invalidaciones por
+    item sean exactas (p. ej. destacados).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (endpoint, normalized_args(request.args))
+            version = catalog_version()
+            etag = catalog_etag(key, version)
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                return response
+
+            if not current_app.config.get('CATALOG_RESPONSE_CACHE_ENABLED', True):
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code == 200:
+                    response.set_etag(etag)
+                return response
+
+            entry = response_cache.get(key)
+            if entry is not None:
+                response = current_app.response_class(entry.body, status=200, mimetype=entry.mimetype)
+                response.headers['X-Cache'] = 'HIT'
+                response.set_etag(etag)
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                # Si hubo una escritura mientras se armaba la respuesta no se
+                # guarda: podría haberse leído antes del commit
+                if catalog_version() == version:
+                    response_cache.set(key, CachedResponse(
+                        body=response.get_data(),
+                        mimetype=response.mimetype,
+                        item_refs=frozenset(g.get('cache_item_refs', ()))
+                    ))
+                response.set_etag(etag)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def detail_etag(item_type, item_id, updated_at, provider_version):
+    """Validador por recurso para las fichas públicas de producto y servicio"""
+    stamp = updated_at.strftime('%Y%m%d%H%M%S%f') if updated_at else '0'
+    # provider_version es por proceso: la ventana acota los cambios de perfil de otros workers
+    return f"{BOOT_ID}-{etag_window()}-{item_type}{item_id}-{stamp}-{provider_version}"
+
+
+def is_affected(change, key, entry):
+    """Decidir si un cambio del catálogo puede alterar una respuesta cacheada"""
+    endpoint, args = key
+    fields = change.fields
+    if fields is not None and not fields:
+        return False
+    unknown = fields is None
+    provider_filter = dict(args).get('provider_id')
+    other_provider = provider_filter not in (None, '', str(change.provider_id))
+
+    if change.item_type in _PROVIDER_SCOPED:
+        if endpoint == _PROVIDER_SCOPED[change.item_type]:
+            return not other_provider
+        if endpoint == 'featured':
+            return (unknown or bool(fields & {'is_featured', 'status'})
+                    or (change.item_type, change.item_id) in entry.item_refs)
+        if endpoint == 'modalities':
+            return change.item_type == 'servicio' and (unknown or 'modality' in fields)
+        return False
+
+    if change.item_type == 'categoria':
+        return endpoint in ('categories', 'products', 'services', 'featured')
+
+    if change.item_type == 'proveedor':
+        if endpoint == 'providers':
+            return True
+        if endpoint == 'featured':
+            return True
+        if endpoint in ('products', 'services'):
+            return (unknown or 'company_name' in fields) and not other_provider
+    return False
+
+
+@on_catalog_change
+def _invalidate_responses(change):
+    response_cache.invalidate(lambda key, entry: is_affected(change, key, entry))
@@ -0,0 +1,56 @@
+"""
+Captura de cambios de productos y servicios desde la sesión.
+
+Cada flush anota en session.info los productos y servicios insertados,
+modificados o eliminados (con las columnas que cambiaron); al confirmar la
+transacción se emite un notify_catalog_change por item, de modo que índices
+y cachés reciben el delta sin que cada endpoint tenga que avisar a mano. Un
+rollback descarta lo anotado.
+
+Las escrituras masivas por Core (backfill, benchmarks) no pasan por la
+sesión: para eso los índices tienen la reconstrucción completa periódica.
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .models import Product, Service
+from .catalog_events import notify_catalog_change, changed_fields
+
+CAPTURED_MODELS = {Product: 'producto', Service: 'servicio'}
+
+
+def _record(session, instance, fields):
+    changes = session.info.setdefault('catalog_changes', {})
+    key = (CAPTURED_MODELS[type(instance)], instance.id)
+    previous = changes.get(key)
+    if previous is not None and previous[1] is not None and fields is not None:
+        fields = previous[1] | fields
+    elif previous is not None:
+        fields = None
+    changes[key] = (instance.provider_id, fields)
+
+
+@event.listens_for(Session, 'after_flush')
+def _capture_catalog_changes(session, flush_context):
+    # session.new/dirty/deleted y el historial de atributos aún reflejan este flush
+    for instance in session.new:
+        if type(instance) in CAPTURED_MODELS:
+            _record(session, instance, None)
+    for instance in session.deleted:
+        if type(instance) in CAPTURED_MODELS:
+            _record(session, instance, None)
+    for instance in session.dirty:
+        if type(instance) in CAPTURED_MODELS:
+            fields = changed_fields(instance)
+            if fields:
+                _record(session, instance, fields)
+
+
+@event.listens_for(Session, 'after_commit')
+def _notify_catalog_changes(session):
+    for (item_type, item_id), (provider_id, fields) in session.info.pop('catalog_changes', {}).items():
+        notify_catalog_change(item_type, item_id, provider_id, fields)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_catalog_changes(session):
+    session.info.pop('catalog_changes', None)
@@ -0,0 +1,85 @@
+"""
+Notificaciones de cambios en el catálogo.
+
+Los cambios de productos y servicios se capturan desde la sesión y se
+notifican al confirmar (ver catalog_capture); los endpoints que escriben
+categorías o perfiles de proveedor avisan aquí después del commit. Las
+cachés e índices en memoria se suscriben con on_catalog_change para
+invalidarse o actualizarse.
+
+Cada cambio incrementa además la versión del catálogo (y la del proveedor
+afectado), que se usa para los ETag de los endpoints públicos. Son
+contadores por proceso; BOOT_ID distingue procesos para que dos workers
+nunca generen el mismo validador con contenidos distintos, y la ventana de
+vigencia del ETag (ver catalog_cache) acota las escrituras que este proceso
+no llega a ver.
+"""
+import threading
+import uuid
+from dataclasses import dataclass, field
+from sqlalchemy import inspect
+
+BOOT_ID = uuid.uuid4().hex[:8]
+
+_listeners = []
+_version_lock = threading.Lock()
+_catalog_version = 0
+_provider_versions = {}
+
+
+@dataclass(frozen=True)
+class CatalogChange:
+    """Cambio confirmado sobre un item del catálogo"""
+    item_type: str                      # 'producto', 'servicio', 'categoria', 'proveedor'
+    item_id: int = None
+    provider_id: int = None
+    fields: frozenset = field(default=None)  # None = desconocido (alta/baja)
+
+
+def on_catalog_change(listener):
+    """Registrar un listener que recibe cada CatalogChange (usable como decorador)"""
+    _listeners.append(listener)
+    return listener
+
+
+def notify_catalog_change(item_type, item_id=None, provider_id=None, fields=None):
+    """Avisar a los listeners de un cambio ya confirmado en la base de datos"""
+    change = CatalogChange(
+        item_type=item_type,
+        item_id=item_id,
+        provider_id=provider_id,
+        fields=frozenset(fields) if fields is not None else None
+    )
+    for listener in list(_listeners):
+        try:
+            listener(change)
+        except Exception as e:
+            print(f"⚠️ Error notificando cambio de catálogo ({item_type}:{item_id}): {e}")
+
+    # La versión sube después de invalidar: quien lee la versión nueva ya no
+    # puede recibir una respuesta cacheada anterior al cambio
+    _bump_versions(change)
+
+
+def catalog_version():
+    """Versión monótona del catálogo en este proceso"""
+    return _catalog_version
+
+
+def provider_version(provider_id):
+    """Versión de los datos de un proveedor (perfil, contactos, certificaciones)"""
+    return _provider_versions.get(provider_id, 0)
+
+
+def _bump_versions(change):
+    global _catalog_version
+    with _version_lock:
+        _catalog_version += 1
+        if change.item_type == 'proveedor' and change.provider_id is not None:
+            _provider_versions[change.provider_id] = _provider_versions.get(change.provider_id, 0) + 1
+
+
+def changed_fields(instance):
+    """Nombres de las columnas modificadas en una instancia aún no confirmada"""
+    state = inspect(instance)
+    return {attr.key for attr in state.attrs if attr.history.has_changes()}
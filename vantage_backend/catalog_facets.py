@@ -0,0 +1,109 @@
+"""
+Conteos por facetas (categoría, proveedor, modalidad, certificaciones y
+destacado) para la barra de filtros del catálogo.
+
+Todas las facetas pedidas se calculan en una sola sentencia: el conjunto
+filtrado se declara una vez como CTE y cada faceta es un GROUP BY sobre
+él, unidos con UNION ALL. Añadir facetas no suma round trips.
+"""
+from sqlalchemy import select, func, literal, cast, null, union_all, Integer, String
+from .models import db, Product, Service, ProviderProfile, Category
+from .catalog_queries import apply_listing_filters
+
+FACETS = ('category', 'provider', 'modality', 'cert', 'featured')
+
+
+def parse_facets(args, model=None):
+    """
+    Facetas pedidas en facets=category,provider,... (None si no se pidió ninguna).
+
+    Las desconocidas se ignoran; modality solo aplica a servicios.
+    """
+    requested = [name.strip() for name in args.get('facets', '').split(',') if name.strip()]
+    if requested == ['all']:
+        requested = list(FACETS)
+    facets = [name for name in FACETS if name in requested]
+    if model is Product and 'modality' in facets:
+        facets.remove('modality')
+    return facets or None
+
+
+def listing_facet_source(model, filters):
+    """Conjunto filtrado de un listado público con las columnas de las facetas"""
+    columns = [
+        model.category_id, Category.name.label('category_name'),
+        model.provider_id, ProviderProfile.company_name.label('provider_name'),
+        model.has_cert_iso9001, model.has_cert_iso14001, model.is_featured
+    ]
+    if model is Service:
+        columns.append(Service.modality)
+    query = db.session.query(*columns).select_from(model).outerjoin(
+        Category, Category.id == model.category_id
+    ).outerjoin(
+        ProviderProfile, ProviderProfile.id == model.provider_id
+    ).filter(model.status == 'activo')
+    return apply_listing_filters(query, model, filters).statement
+
+
+def _count_where(facet, label, condition, source):
+    return select(
+        literal(facet).label('facet'), cast(null(), Integer).label('key'),
+        cast(literal(label), String).label('label'), func.count().label('count')
+    ).select_from(source).where(condition)
+
+
+def compute_facets(source, facets):
+    """
+    Conteos de las facetas pedidas sobre el SELECT filtrado source.
+
+    source debe exponer category_id/category_name, provider_id/provider_name,
+    has_cert_iso9001, has_cert_iso14001, is_featured y, opcionalmente,
+    modality. Devuelve {faceta: conteos} con una sola consulta.
+    """
+    if not facets:
+        return None
+    filtered = source.cte('facet_source')
+    parts = []
+    for facet, key, label in (
+        ('category', filtered.c.category_id, filtered.c.category_name),
+        ('provider', filtered.c.provider_id, filtered.c.provider_name),
+    ):
+        if facet in facets:
+            parts.append(select(
+                literal(facet).label('facet'), key.label('key'),
+                cast(func.max(label), String).label('label'), func.count().label('count')
+            ).where(key.isnot(None)).group_by(key))
+    if 'modality' in facets and 'modality' in filtered.c:
+        modality = filtered.c.modality
+        parts.append(select(
+            literal('modality').label('facet'), cast(null(), Integer).label('key'),
+            cast(modality, String).label('label'), func.count().label('count')
+        ).where(modality.isnot(None)).group_by(modality))
+    if 'cert' in facets:
+        parts.append(_count_where('cert', 'iso9001', filtered.c.has_cert_iso9001 == True, filtered))
+        parts.append(_count_where('cert', 'iso14001', filtered.c.has_cert_iso14001 == True, filtered))
+    if 'featured' in facets:
+        parts.append(_count_where('featured', 'featured', filtered.c.is_featured == True, filtered))
+
+    result = {facet: [] for facet in facets if facet in ('category', 'provider', 'modality')}
+    if 'cert' in facets:
+        result['cert'] = {'iso9001': 0, 'iso14001': 0}
+    if 'featured' in facets:
+        result['featured'] = 0
+    if not parts:
+        return result
+
+    for row in db.session.execute(union_all(*parts)):
+        if row.facet in ('category', 'provider'):
+            result[row.facet].append({"id": row.key, "name": row.label, "count": row.count})
+        elif row.facet == 'modality':
+            result['modality'].append({"value": row.label, "count": row.count})
+        elif row.facet == 'cert':
+            result['cert'][row.label] = row.count
+        else:
+            result['featured'] = row.count
+
+    for facet in ('category', 'provider', 'modality'):
+        if facet in result:
+            result[facet].sort(key=lambda entry: (-entry['count'], entry.get('name') or entry.get('value') or ''))
+    return result
@@ -0,0 +1,312 @@
+"""
+Base común de los índices en memoria del catálogo.
+
+Los índices (invertido, semántico, ...) se construyen desde la base de
+datos la primera vez que se usan y luego se actualizan de forma incremental:
+cada aviso del catálogo marca los items afectados y el índice los vuelve a
+leer (una consulta IN por tipo) en la siguiente consulta.
+
+Como red de seguridad ante escrituras que no pasan por la sesión (Core,
+SQL manual), cada índice se reconstruye completo cuando su última
+reconstrucción supera rebuild_interval segundos. Esa reconstrucción corre en
+un hilo aparte sobre una copia del índice: las consultas siguen usando (y
+actualizando con deltas) el índice actual, el estado nuevo se adopta de una
+vez bajo el lock y los items marcados durante la construcción se vuelven a
+aplicar sobre él. maintenance_stats() expone el retraso (lag) entre un
+cambio confirmado y su aplicación en el índice.
+
+refresh_async() aplica los cambios en un hilo aparte con su propio contexto
+de app, para los callers con presupuesto de latencia que no pueden quedar
+esperando una actualización costosa (p. ej. embeddings remotos).
+"""
+import copy
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select, and_, null
+from .models import db, Product, Service, ProviderProfile, Category, CatalogItem
+from .catalog_events import on_catalog_change
+
+ITEM_TYPES = ('producto', 'servicio')
+
+# Filas por lote al recorrer todo el catálogo (yield_per): la reconstrucción
+# no carga el resultado completo en memoria
+DOCUMENT_CHUNK = 1000
+
+catalog_indexes = []
+
+
+def document_rows(item_type, ids=None):
+    """Columnas de texto de productos o servicios y sus términos guardados (sin hidratar modelos)"""
+    model = Product if item_type == 'producto' else Service
+    extra = model.technical_details if item_type == 'producto' else model.modality
+    query = select(
+        model.id, model.name, model.description, extra.label('extra'), model.status,
+        model.is_featured, model.provider_id, model.created_at, model.updated_at,
+        (model.sku if item_type == 'producto' else null()).label('sku'),
+        Category.name.label('category_name'),
+        ProviderProfile.company_name.label('provider_name'),
+        CatalogItem.search_tokens
+    ).select_from(model).outerjoin(
+        Category, Category.id == model.category_id
+    ).outerjoin(
+        ProviderProfile, ProviderProfile.id == model.provider_id
+    ).outerjoin(
+        CatalogItem, and_(CatalogItem.item_type == item_type, CatalogItem.item_id == model.id)
+    )
+    if ids is not None:
+        query = query.where(model.id.in_(ids))
+    else:
+        query = query.execution_options(yield_per=DOCUMENT_CHUNK)
+    return db.session.execute(query)
+
+
+def document_text(row):
+    """Texto buscable de un item: nombre, descripción, categoría, proveedor y extra"""
+    return ' '.join(value or '' for value in (
+        row.name, row.description, row.category_name, row.provider_name, row.extra
+    ))
+
+
+def register_index(index):
+    """Suscribir un índice a los avisos de cambios del catálogo"""
+    catalog_indexes.append(index)
+    return index
+
+
+class CatalogIndex:
+    """
+    Índice del catálogo con reconstrucción perezosa y cambios pendientes.
+
+    Las subclases implementan _rebuild() (todo el catálogo activo),
+    _update(refs) (reindexar esas referencias) y _provider_refs(ids)
+    (referencias indexadas de esos proveedores), y definen name y _state
+    (atributos que reemplaza _rebuild). La reconstrucción periódica llama a
+    _rebuild sobre una copia superficial del índice, así que _rebuild debe
+    asignar contenedores nuevos en vez de modificar los existentes.
+    """
+
+    name = 'index'
+    _state = ()
+
+    def __init__(self, rebuild_interval=None, clock=time.monotonic):
+        self._lock = threading.RLock()
+        self._built = False
+        self._dirty = {}               # referencia -> instante en que se marcó
+        self._dirty_providers = {}
+        self.generation = 0    # cambia con cada modificación del contenido
+        self.rebuild_interval = rebuild_interval
+        self._clock = clock
+        self._built_at = None
+        self.full_rebuilds = 0
+        self.delta_updates = 0
+        self.last_lag_ms = None
+        self.max_lag_ms = 0.0
+        self._refresher = None         # hilo de refresh_async en curso
+        self._refresher_lock = threading.Lock()
+        self._rebuilder = None         # hilo de la reconstrucción periódica en curso
+        self._rebuild_marks = None     # (items, proveedores) marcados desde que empezó
+
+    def rebuild(self):
+        """Construir el índice completo desde la base de datos"""
+        with self._lock:
+            marked = self._oldest_mark()
+            self._rebuild_marks = None     # descarta una reconstrucción en segundo plano
+            self._dirty.clear()
+            self._dirty_providers.clear()
+            self._rebuild()
+            self._built = True
+            self._built_at = self._clock()
+            self.generation += 1
+            self.full_rebuilds += 1
+            self._record_lag(marked)
+            return len(self)
+
+    def mark_dirty(self, item_type, item_id):
+        with self._lock:
+            now = self._clock()
+            self._dirty.setdefault((item_type, item_id), now)
+            if self._rebuild_marks is not None:
+                self._rebuild_marks[0].setdefault((item_type, item_id), now)
+
+    def mark_provider_dirty(self, provider_id):
+        with self._lock:
+            now = self._clock()
+            self._dirty_providers.setdefault(provider_id, now)
+            if self._rebuild_marks is not None:
+                self._rebuild_marks[1].setdefault(provider_id, now)
+
+    def invalidate(self):
+        """Forzar una reconstrucción completa en la siguiente consulta"""
+        with self._lock:
+            self._built = False
+            self._rebuild_marks = None
+
+    def refresh(self):
+        """Aplicar los cambios pendientes (o construir si hace falta)"""
+        with self._lock:
+            if not self._built:
+                self.rebuild()
+                return
+            if self._rebuild_due():
+                self._rebuild_in_background()
+            if self._dirty_providers:
+                marked = min(self._dirty_providers.values())
+                for ref in self._provider_refs(set(self._dirty_providers)):
+                    self._dirty[ref] = min(marked, self._dirty.get(ref, marked))
+                self._dirty_providers.clear()
+            if not self._dirty:
+                return
+            dirty = dict(self._dirty)
+            self._dirty.clear()
+            try:
+                self._update(set(dirty))
+            except Exception:
+                # Reintentar estos cambios en la siguiente consulta
+                for ref, marked in dirty.items():
+                    self._dirty.setdefault(ref, marked)
+                raise
+            self.generation += 1
+            self.delta_updates += 1
+            self._record_lag(min(dirty.values()))
+
+    def up_to_date(self):
+        """¿Construido y sin cambios pendientes? (sin tomar el lock del índice)"""
+        return (self._built and not self._dirty and not self._dirty_providers
+                and not self._rebuild_due())
+
+    def refresh_async(self, wait=None):
+        """
+        Aplicar los cambios pendientes en un hilo aparte y esperar a lo sumo wait segundos.
+
+        Devuelve True si el índice quedó al día dentro de la espera; si no,
+        la actualización sigue en segundo plano y el caller usa el índice
+        tal como está.
+        """
+        if self.up_to_date():
+            return True
+        with self._refresher_lock:
+            if self._refresher is None or not self._refresher.is_alive():
+                self._refresher = threading.Thread(
+                    target=self._refresh_in_context, args=(current_app._get_current_object(),),
+                    name=f"{self.name}-index-refresh", daemon=True
+                )
+                self._refresher.start()
+            refresher = self._refresher
+        refresher.join(wait)
+        return not refresher.is_alive()
+
+    def _refresh_in_context(self, app):
+        with app.app_context():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Error actualizando el índice {self.name}: {e}")
+            finally:
+                db.session.remove()
+
+    def _rebuild_in_background(self):
+        """Reconstruir sobre una copia en otro hilo; el índice actual sigue atendiendo"""
+        marks = self._rebuild_marks = ({}, {})
+        shadow = copy.copy(self)
+        self._rebuilder = threading.Thread(
+            target=self._rebuild_in_context, args=(current_app._get_current_object(), shadow, marks),
+            name=f"{self.name}-index-rebuild", daemon=True
+        )
+        self._rebuilder.start()
+
+    def _rebuild_in_context(self, app, shadow, marks):
+        with app.app_context():
+            try:
+                shadow._rebuild()
+            except Exception as e:
+                print(f"⚠️ Error reconstruyendo el índice {self.name}: {e}")
+                with self._lock:
+                    if self._rebuild_marks is marks:
+                        self._rebuild_marks = None     # se reintenta en la siguiente consulta
+                return
+            finally:
+                db.session.remove()
+        with self._lock:
+            if self._rebuild_marks is not marks:
+                return     # invalidado o reconstruido mientras tanto
+            self._rebuild_marks = None
+            self._adopt(shadow)
+            # Lo marcado antes de empezar ya está en la copia; lo marcado
+            # después pudo leerse antes de confirmarse y se vuelve a aplicar
+            self._dirty, self._dirty_providers = marks
+            self._built_at = self._clock()
+            self.generation += 1
+            self.full_rebuilds += 1
+
+    def _adopt(self, shadow):
+        """Reemplazar el estado del índice por el de una copia reconstruida"""
+        for attribute in self._state:
+            setattr(self, attribute, getattr(shadow, attribute))
+
+    def count(self):
+        """Número de items indexados (aplicando antes los cambios pendientes)"""
+        self.refresh()
+        return len(self)
+
+    def pending(self):
+        with self._lock:
+            return len(self._dirty) + len(self._dirty_providers)
+
+    def maintenance_stats(self):
+        """Cambios pendientes, retraso de aplicación y reconstrucciones del índice"""
+        with self._lock:
+            now = self._clock()
+            oldest = self._oldest_mark()
+            return {
+                "built": self._built,
+                "rebuilding": self._rebuild_marks is not None,
+                "pending": self.pending(),
+                "lag_ms": round((now - oldest) * 1000, 1) if oldest is not None else 0.0,
+                "last_lag_ms": self.last_lag_ms,
+                "max_lag_ms": self.max_lag_ms,
+                "delta_updates": self.delta_updates,
+                "full_rebuilds": self.full_rebuilds,
+                "rebuild_interval_s": self.rebuild_interval,
+                "last_rebuild_age_s": round(now - self._built_at, 1) if self._built_at is not None else None
+            }
+
+    def _rebuild_due(self):
+        return (bool(self.rebuild_interval) and self._rebuild_marks is None
+                and self._clock() - self._built_at >= self.rebuild_interval)
+
+    def _oldest_mark(self):
+        marks = list(self._dirty.values()) + list(self._dirty_providers.values())
+        return min(marks) if marks else None
+
+    def _record_lag(self, marked):
+        if marked is None:
+            return
+        self.last_lag_ms = round((self._clock() - marked) * 1000, 1)
+        self.max_lag_ms = max(self.max_lag_ms, self.last_lag_ms)
+
+    def _rebuild(self):
+        raise NotImplementedError
+
+    def _update(self, refs):
+        raise NotImplementedError
+
+    def _provider_refs(self, provider_ids):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+@on_catalog_change
+def _update_catalog_indexes(change):
+    if change.fields is not None and not change.fields:
+        return
+    for index in catalog_indexes:
+        if change.item_type in ITEM_TYPES:
+            index.mark_dirty(change.item_type, change.item_id)
+        elif change.item_type == 'proveedor':
+            if change.fields is None or 'company_name' in change.fields:
+                index.mark_provider_dirty(change.provider_id)
+        elif change.item_type == 'categoria':
+            index.invalidate()
@@ -0,0 +1,674 @@
+"""
+Capa de consultas compartida para los listados públicos del catálogo.
+
+Construye las queries de productos y servicios precargando proveedor y
+categoría en la misma consulta, de modo que un listado cuesta un número
+fijo de round trips sin importar el tamaño de la página.
+"""
+import base64
+import json
+import math
+import re
+from datetime import datetime
+from sqlalchemy import or_, and_, tuple_, func, literal, literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import joinedload, contains_eager, load_only
+from .models import db, Product, Service, ProviderProfile, Category, CatalogItem
+from .cache import TTLCache
+from .catalog_events import on_catalog_change
+from .spelling import catalog_speller
+from .bitset_index import bitset_index, bitset_filters_enabled
+from .text_analysis import analyze
+
+ITEM_MODELS = {'producto': Product, 'servicio': Service}
+ITEM_TABLES = {'producto': 'products', 'servicio': 'services'}
+
+# Modos de include_total: exacto (cacheado), estimación del planner o sin total
+TOTAL_MODES = ('exact', 'approx', 'false')
+
+# Totales de paginación por firma de filtros; se invalidan al escribir en el catálogo
+totals_cache = TTLCache(maxsize=2048, ttl=300)
+
+# Configuración de búsqueda de texto completo (español + unaccent, ver migración)
+SEARCH_CONFIG = 'spanish_unaccent'
+_SEARCH_TOKEN_RE = re.compile(r'\w+')
+
+# Con menos resultados que esto, la primera página de una búsqueda se
+# reintenta con coincidencia aproximada (trigramas o corrección ortográfica)
+FUZZY_MIN_HITS = 3
+
+
+def catalog_query(model, status='activo', sort_by=None, fields=None):
+    """
+    Query base de productos o servicios con proveedor y categoría precargados.
+
+    Si el listado se ordena por proveedor o categoría se reutiliza el mismo
+    JOIN del ORDER BY para poblar la relación (contains_eager) en lugar de
+    agregar un segundo JOIN. Con un fieldset (fields) solo se precargan las
+    relaciones pedidas.
+    """
+    query = model.query
+    if status:
+        query = query.filter(model.status == status)
+
+    if sort_by == 'provider':
+        query = query.join(model.provider).options(contains_eager(model.provider))
+    elif fields is None or 'provider' in fields:
+        query = query.options(joinedload(model.provider))
+
+    if sort_by == 'category':
+        query = query.outerjoin(model.category).options(contains_eager(model.category))
+    elif fields is None or 'category' in fields:
+        query = query.options(joinedload(model.category))
+
+    return query
+
+
+def parse_listing_filters(args, model):
+    """Extraer y normalizar los filtros de un listado público desde request.args"""
+    filters = {
+        'search': args.get('search', '').strip() or None,
+        'category_id': args.get('category_id', type=int) or None,
+        'provider_id': args.get('provider_id', type=int) or None,
+        'min_price': args.get('min_price', type=float),
+        'max_price': args.get('max_price', type=float),
+        'is_featured': args.get('is_featured', type=lambda v: v.lower() == 'true'),
+    }
+    if model is Service:
+        filters['modality'] = args.get('modality', '').strip() or None
+    return filters
+
+
+def full_text_enabled():
+    """La búsqueda por tsvector solo existe en Postgres; SQLite usa los términos guardados"""
+    return db.engine.dialect.name == 'postgresql'
+
+
+def _search_tsquery(search):
+    """
+    tsquery con prefijos ('bomba hidr' -> bomba:* & hidr:*) o None si no hay tokens.
+
+    Los prefijos mantienen el comportamiento de búsqueda mientras se escribe
+    que tenía el ILIKE; los tokens se limpian antes de llegar a to_tsquery.
+    """
+    tokens = _SEARCH_TOKEN_RE.findall(search.lower())
+    if not tokens:
+        return None
+    return func.to_tsquery(SEARCH_CONFIG, ' & '.join(f"{token}:*" for token in tokens))
+
+
+def _search_vector(model):
+    # Columna mantenida por trigger en Postgres; no se mapea en el modelo
+    return literal_column(f"{model.__tablename__}.search_vector", type_=TSVECTOR)
+
+
+def search_rank(model, filters):
+    """Expresión ts_rank del término buscado (None si no aplica)"""
+    search = filters.get('search')
+    if not search or not full_text_enabled():
+        return None
+    tsquery = _search_tsquery(search)
+    if tsquery is None:
+        return None
+    return func.ts_rank(_search_vector(model), tsquery)
+
+
+def _substring_filter(model, search):
+    """Subcadena literal (ILIKE) en los campos de texto de productos o servicios"""
+    search_term = f"%{search}%"
+    if model is Product:
+        return or_(
+            Product.name.ilike(search_term),
+            Product.description.ilike(search_term),
+            Product.sku.ilike(search_term),
+            Product.technical_details.ilike(search_term)
+        )
+    return or_(
+        Service.name.ilike(search_term),
+        Service.description.ilike(search_term)
+    )
+
+
+def apply_listing_filters(query, model, filters):
+    """Aplicar los filtros normalizados de un listado a la query"""
+    search = filters.get('search')
+    tsquery = _search_tsquery(search) if search and full_text_enabled() else None
+    if tsquery is not None:
+        # Postgres: tsvector ponderado con índice GIN
+        query = query.filter(_search_vector(model).op('@@')(tsquery))
+    elif search and analyze(search):
+        # Términos guardados en catalog_items (tildes, plurales y SKU ya normalizados);
+        # los items aún sin términos (antes del backfill) se buscan por subcadena
+        item_type = 'producto' if model is Product else 'servicio'
+        matching = db.select(CatalogItem.item_id).where(
+            CatalogItem.item_type == item_type,
+            *[CatalogItem.search_tokens.like(f"%{term}%") for term in dict.fromkeys(analyze(search))]
+        )
+        pending = db.select(CatalogItem.item_id).where(
+            CatalogItem.item_type == item_type,
+            CatalogItem.search_tokens.is_(None)
+        )
+        query = query.filter(or_(
+            model.id.in_(matching),
+            and_(model.id.in_(pending), _substring_filter(model, search))
+        ))
+    elif search:
+        # Consulta sin términos (solo palabras vacías o signos): subcadena literal
+        query = query.filter(_substring_filter(model, search))
+
+    if filters.get('category_id'):
+        query = query.filter(model.category_id == filters['category_id'])
+
+    if filters.get('provider_id'):
+        query = query.filter(model.provider_id == filters['provider_id'])
+
+    if filters.get('modality'):
+        query = query.filter(model.modality == filters['modality'])
+
+    if filters.get('min_price') is not None:
+        query = query.filter(model.price >= filters['min_price'])
+
+    if filters.get('max_price') is not None:
+        query = query.filter(model.price <= filters['max_price'])
+
+    if filters.get('is_featured') is not None:
+        query = query.filter(model.is_featured == filters['is_featured'])
+
+    return query
+
+
+def sort_column(model, sort_by):
+    """Columna asociada a un campo de ordenamiento (por defecto, el nombre)"""
+    if sort_by == 'provider':
+        return ProviderProfile.company_name
+    if sort_by == 'category':
+        return Category.name
+    if sort_by in ('created_at', 'price', 'name') or (sort_by == 'modality' and model is Service):
+        return getattr(model, sort_by)
+    return model.name
+
+
+def apply_sort(query, model, sort_by, sort_order, filters=None):
+    """
+    Ordenar por el campo pedido con el id como desempate estable.
+
+    sort_by='relevance' ordena por ts_rank cuando hay búsqueda de texto
+    completo; si no aplica (SQLite o sin búsqueda) se ordena por nombre.
+    """
+    if sort_by == 'relevance':
+        rank = search_rank(model, filters or {})
+        if rank is not None:
+            return query.order_by(rank.desc(), model.id.asc())
+    column = sort_column(model, sort_by)
+    if sort_order == 'desc':
+        return query.order_by(column.desc(), model.id.desc())
+    return query.order_by(column.asc(), model.id.asc())
+
+
+def filter_signature(model, filters):
+    """Clave normalizada de un conjunto de filtros (independiente del orden y la página)"""
+    normalized = []
+    for key, value in sorted(filters.items()):
+        if value is None:
+            continue
+        if key == 'search':
+            value = ' '.join(value.lower().split())
+        normalized.append((key, value))
+    return (model.__tablename__, tuple(normalized))
+
+
+def listing_count(model, filters):
+    """
+    Total exacto de un listado público.
+
+    Sin búsqueda de texto ni rango de precio se resuelve con los bitsets en
+    memoria; si no, COUNT(*) cacheado por firma de filtros.
+    """
+    if bitset_filters_enabled():
+        total = bitset_index.listing_count('producto' if model is Product else 'servicio', filters)
+        if total is not None:
+            return total
+    key = filter_signature(model, filters)
+    total = totals_cache.get(key)
+    if total is None:
+        query = apply_listing_filters(model.query.filter(model.status == 'activo'), model, filters)
+        total = query.order_by(None).count()
+        totals_cache.set(key, total)
+    return total
+
+
+def estimated_count(model, filters):
+    """
+    Estimación de filas del planner de Postgres para el listado.
+
+    Solo se usa en listados sin búsqueda de texto, donde la estimación es
+    fiable; devuelve None si no aplica (SQLite o filtro ILIKE).
+    """
+    if db.engine.dialect.name != 'postgresql' or filters.get('search'):
+        return None
+    query = apply_listing_filters(model.query.filter(model.status == 'activo'), model, filters)
+    compiled = query.with_entities(model.id).statement.compile(dialect=db.engine.dialect)
+    plan = db.session.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + compiled.string, compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def paginate_listing(query, model, filters, page, per_page, include_total='exact'):
+    """
+    Paginación por página con total configurable.
+
+    La página se pide con una fila extra para saber si hay siguiente sin
+    depender del total; el total es exacto (cacheado), estimado o se omite
+    según include_total. Devuelve (items, pagination_info).
+    """
+    rows = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+    items = rows[:per_page]
+    has_next = len(rows) > per_page
+
+    total, is_estimate = None, False
+    if include_total == 'approx':
+        total = estimated_count(model, filters)
+        if total is not None:
+            is_estimate = True
+            # La estimación nunca debe quedar por debajo de lo ya visto
+            total = max(total, (page - 1) * per_page + len(items) + (1 if has_next else 0))
+    if include_total == 'exact' or (include_total == 'approx' and total is None):
+        total = listing_count(model, filters)
+
+    pagination_info = {
+        "current_page": page,
+        "per_page": per_page,
+        "total_items": total,
+        "total_pages": math.ceil(total / per_page) if total is not None else None,
+        "total_is_estimate": is_estimate,
+        "has_next": has_next,
+        "has_prev": page > 1,
+        "next_page": page + 1 if has_next else None,
+        "prev_page": page - 1 if page > 1 else None
+    }
+    return items, pagination_info
+
+
+def _trigram_columns(model):
+    # Columnas con índice GIN gin_trgm_ops (ver migración de pg_trgm)
+    if model is Product:
+        return (Product.name, Product.sku)
+    return (Service.name,)
+
+
+def apply_trigram_search(query, model, search):
+    """Filtrar por word_similarity (operador <% de pg_trgm) y ordenar por similitud"""
+    columns = _trigram_columns(model)
+    similarity = func.greatest(*[func.word_similarity(search, func.coalesce(column, '')) for column in columns])
+    query = query.filter(or_(*[literal(search).op('<%')(column) for column in columns]))
+    return query.order_by(similarity.desc(), model.id.asc())
+
+
+def fuzzy_listing(model, filters, fields, field_map, per_page):
+    """
+    Segunda pasada tolerante a errores de tipeo para una búsqueda con pocos resultados.
+
+    En Postgres usa word_similarity de pg_trgm sobre nombre (y SKU) con el
+    índice de trigramas, ordenado por similitud; en SQLite repite la búsqueda
+    con la consulta corregida por el diccionario ortográfico. Devuelve
+    (items, search_info) con la sugerencia "¿quisiste decir?".
+    """
+    search = filters['search']
+    suggestion, corrections = catalog_speller.suggest(search)
+    query = catalog_query(model, fields=fields)
+    query = apply_listing_filters(query, model, dict(filters, search=None))
+    query = apply_fieldset(query, model, field_map, fields)
+
+    if full_text_enabled():
+        items = apply_trigram_search(query, model, search).limit(per_page).all()
+    elif suggestion:
+        query = apply_listing_filters(query, model, {'search': suggestion})
+        items = apply_sort(query, model, 'name', 'asc').limit(per_page).all()
+    else:
+        items = []
+
+    return items, {
+        "fuzzy": True,
+        "did_you_mean": suggestion,
+        "corrections": corrections
+    }
+
+
+def apply_fuzzy_fallback(items, pagination_info, model, filters, fields, field_map, page, per_page):
+    """
+    Reemplazar la primera página de una búsqueda con pocos resultados por la aproximada.
+
+    Devuelve (items, pagination_info, search_info); search_info es None si no
+    hubo búsqueda de texto. La página aproximada es única (sin siguiente).
+    """
+    if not filters.get('search'):
+        return items, pagination_info, None
+    search_info = {"fuzzy": False, "did_you_mean": None, "corrections": []}
+    if page != 1 or len(items) >= FUZZY_MIN_HITS:
+        return items, pagination_info, search_info
+
+    fuzzy_items, search_info = fuzzy_listing(model, filters, fields, field_map, per_page)
+    if len(fuzzy_items) <= len(items):
+        search_info["fuzzy"] = False
+        return items, pagination_info, search_info
+
+    pagination_info = dict(
+        pagination_info,
+        total_items=len(fuzzy_items),
+        total_pages=1,
+        total_is_estimate=False,
+        has_next=False,
+        next_page=None
+    )
+    return fuzzy_items, pagination_info, search_info
+
+
+@on_catalog_change
+def _invalidate_totals(change):
+    table = ITEM_TABLES.get(change.item_type)
+    if table:
+        totals_cache.invalidate(lambda key, value: key[0] == table)
+
+
+def encode_cursor(sort_by, sort_order, value, item_id):
+    """Cursor opaco con el último valor de ordenamiento y el id de desempate"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort_by, "o": sort_order, "v": value, "id": item_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort_by, sort_order):
+    """Decodificar un cursor; lanza ValueError si es inválido o de otro ordenamiento"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, item_id = payload['v'], int(payload['id'])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Cursor inválido: {e}")
+    if payload.get('s') != sort_by or payload.get('o') != sort_order:
+        raise ValueError("El cursor corresponde a otro ordenamiento")
+    if value is not None and sort_by == 'created_at':
+        value = datetime.fromisoformat(value)
+    return value, item_id
+
+
+def keyset_paginate(query, model, sort_by, sort_order, cursor, per_page):
+    """
+    Paginación por cursor (keyset) sobre cualquier campo de ordenamiento.
+
+    Ordena por (columna, id) con los NULL al final en ambas direcciones y
+    filtra con una comparación de tuplas contra el último elemento visto,
+    así cada página cuesta lo mismo sin OFFSET ni COUNT(*). Devuelve
+    (items, next_cursor); next_cursor es None en la última página.
+    """
+    column = sort_column(model, sort_by)
+    descending = sort_order == 'desc'
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_by, sort_order)
+        if value is None:
+            # Ya estamos en el tramo de NULLs: solo avanza el desempate
+            query = query.filter(and_(column.is_(None), model.id < last_id if descending else model.id > last_id))
+        elif descending:
+            query = query.filter(or_(tuple_(column, model.id) < tuple_(value, last_id), column.is_(None)))
+        else:
+            query = query.filter(or_(tuple_(column, model.id) > tuple_(value, last_id), column.is_(None)))
+
+    if descending:
+        query = query.order_by(column.desc().nulls_last(), model.id.desc())
+    else:
+        query = query.order_by(column.asc().nulls_last(), model.id.asc())
+
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor(sort_by, sort_order, _sort_value(last, model, sort_by), last.id)
+    return items, next_cursor
+
+
+def _sort_value(item, model, sort_by):
+    """Valor de ordenamiento de un item ya cargado (sin consultas extra)"""
+    if sort_by == 'provider':
+        return item.provider.company_name if item.provider else None
+    if sort_by == 'category':
+        return item.category.name if item.category else None
+    return getattr(item, sort_column(model, sort_by).key)
+
+
+def provider_summary(provider, extended=False):
+    """Bloque de proveedor embebido en los listados"""
+    if not provider:
+        return None
+    data = {
+        "id": provider.id,
+        "company_name": provider.company_name
+    }
+    if extended:
+        data.update({
+            "about_us": provider.about_us,
+            "logo_url": provider.logo_url,
+            "website_url": provider.website_url
+        })
+    return data
+
+
+def category_summary(category):
+    """Bloque de categoría embebido en los listados"""
+    if not category:
+        return None
+    return {
+        "id": category.id,
+        "name": category.name
+    }
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+# Campos de cada representación: nombre -> (columnas que requiere, getter).
+# Con ?fields= solo se cargan las columnas de los campos pedidos.
+PRODUCT_LISTING_FIELDS = {
+    "id": ((Product.id,), lambda p: p.id),
+    "name": ((Product.name,), lambda p: p.name),
+    "description": ((Product.description,), lambda p: p.description),
+    "technical_details": ((Product.technical_details,), lambda p: p.technical_details),
+    "sku": ((Product.sku,), lambda p: p.sku),
+    "status": ((Product.status,), lambda p: p.status),
+    "main_image_url": ((Product.main_image_url,), lambda p: p.main_image_url),
+    "additional_images": ((Product.additional_images,), lambda p: p.additional_images or []),
+    "price": ((Product.price,), lambda p: p.price),
+    "is_featured": ((Product.is_featured,), lambda p: p.is_featured),
+    "created_at": ((Product.created_at,), lambda p: _iso(p.created_at)),
+    "provider": ((Product.provider_id,), lambda p: provider_summary(p.provider)),
+    "category": ((Product.category_id,), lambda p: category_summary(p.category)),
+}
+
+SERVICE_LISTING_FIELDS = {
+    "id": ((Service.id,), lambda s: s.id),
+    "name": ((Service.name,), lambda s: s.name),
+    "description": ((Service.description,), lambda s: s.description),
+    "modality": ((Service.modality,), lambda s: s.modality),
+    "status": ((Service.status,), lambda s: s.status),
+    "price": ((Service.price,), lambda s: s.price),
+    "is_featured": ((Service.is_featured,), lambda s: s.is_featured),
+    "created_at": ((Service.created_at,), lambda s: _iso(s.created_at)),
+    "provider": ((Service.provider_id,), lambda s: provider_summary(s.provider)),
+    "category": ((Service.category_id,), lambda s: category_summary(s.category)),
+}
+
+
+def _search_fields(model, item_type, extra):
+    """Campos de un item en /catalog/search (el proveedor va como id + name)"""
+    fields = {
+        "id": ((model.id,), lambda i: i.id),
+        "name": ((model.name,), lambda i: i.name),
+        "description": ((model.description,), lambda i: i.description),
+        "price": ((model.price,), lambda i: i.price),
+        "currency": ((model.currency,), lambda i: i.currency),
+        "technical_details": ((model.technical_details,), lambda i: i.technical_details),
+        "has_cert_iso9001": ((model.has_cert_iso9001,), lambda i: i.has_cert_iso9001),
+        "has_cert_iso14001": ((model.has_cert_iso14001,), lambda i: i.has_cert_iso14001),
+        "is_featured": ((model.is_featured,), lambda i: i.is_featured),
+        "type": ((), lambda i: item_type),
+        "provider": ((model.provider_id,), lambda i: {
+            'id': i.provider.id,
+            'name': i.provider.company_name
+        } if i.provider else None),
+        "category": ((model.category_id,), lambda i: category_summary(i.category)),
+        "created_at": ((model.created_at,), lambda i: _iso(i.created_at)),
+    }
+    fields.update(extra)
+    return fields
+
+
+PRODUCT_SEARCH_FIELDS = _search_fields(Product, 'producto', {
+    "sku": ((Product.sku,), lambda p: p.sku),
+})
+
+SERVICE_SEARCH_FIELDS = _search_fields(Service, 'servicio', {
+    "modality": ((Service.modality,), lambda s: s.modality),
+    "duration": ((Service.duration,), lambda s: s.duration),
+})
+
+
+ITEM_SEARCH_FIELDS = {'producto': PRODUCT_SEARCH_FIELDS, 'servicio': SERVICE_SEARCH_FIELDS}
+
+
+def _dashboard_fields(model, item_type, extra):
+    """Campos de un item en el buscador IA del dashboard (categoría y proveedor como texto)"""
+    fields = {
+        "id": ((model.id,), lambda i: i.id),
+        "type": ((), lambda i: item_type),
+        "name": ((model.name,), lambda i: i.name),
+        "description": ((model.description,), lambda i: i.description),
+    }
+    fields.update(extra)
+    fields.update({
+        "category": ((model.category_id,), lambda i: i.category.name if i.category else ''),
+        "provider": ((model.provider_id,), lambda i: i.provider.company_name if i.provider else ''),
+        "is_featured": ((model.is_featured,), lambda i: i.is_featured),
+    })
+    return fields
+
+
+ITEM_DASHBOARD_FIELDS = {
+    'producto': _dashboard_fields(Product, 'producto', {
+        "technical_details": ((Product.technical_details,), lambda p: p.technical_details),
+        "sku": ((Product.sku,), lambda p: p.sku),
+    }),
+    'servicio': _dashboard_fields(Service, 'servicio', {
+        "modality": ((Service.modality,), lambda s: s.modality),
+    }),
+}
+
+MAX_BATCH_ITEMS = 500
+
+
+def parse_item_refs(values):
+    """
+    Convertir referencias 'producto:12' / 'servicio:7' en tuplas (tipo, id).
+
+    Conserva el orden y descarta duplicados; lanza ValueError si alguna no
+    es válida o si se piden más de MAX_BATCH_ITEMS.
+    """
+    refs = []
+    seen = set()
+    for value in values:
+        item_type, _, raw_id = str(value).strip().partition(':')
+        if item_type not in ITEM_MODELS or not raw_id.isdigit():
+            raise ValueError(f"Referencia inválida: {value}")
+        ref = (item_type, int(raw_id))
+        if ref not in seen:
+            seen.add(ref)
+            refs.append(ref)
+    if len(refs) > MAX_BATCH_ITEMS:
+        raise ValueError(f"Máximo {MAX_BATCH_ITEMS} items por consulta")
+    return refs
+
+
+def load_items(refs, field_maps, fields=None, status=None):
+    """
+    Cargar y serializar items por referencia (tipo, id).
+
+    Usa una consulta IN por tipo (con proveedor y categoría precargados) sin
+    importar cuántas referencias lleguen. Devuelve {(tipo, id): item}; las
+    referencias que no existen no aparecen.
+    """
+    ids_by_type = {}
+    for item_type, item_id in refs:
+        ids_by_type.setdefault(item_type, []).append(item_id)
+
+    loaded = {}
+    for item_type, ids in ids_by_type.items():
+        model = ITEM_MODELS[item_type]
+        field_map = field_maps[item_type]
+        query = catalog_query(model, status=status, fields=fields).filter(model.id.in_(ids))
+        query = apply_fieldset(query, model, field_map, fields)
+        for item in query:
+            loaded[(item_type, item.id)] = serialize_fields(item, field_map, fields)
+    return loaded
+
+
+def load_search_items(refs, fields=None, status=None):
+    """Items de /catalog/search para las referencias dadas, en el orden pedido"""
+    loaded = load_items(refs, ITEM_SEARCH_FIELDS, fields, status)
+    return [loaded[ref] for ref in refs if ref in loaded]
+
+
+def parse_fields(args, *field_maps):
+    """
+    Campos pedidos con ?fields=a,b,c (None = todos).
+
+    Los nombres desconocidos se ignoran y el id se incluye siempre.
+    """
+    raw = args.get('fields', '').strip()
+    if not raw:
+        return None
+    known = set().union(*field_maps)
+    requested = [name.strip() for name in raw.split(',')]
+    return frozenset(name for name in requested if name in known) | {'id'}
+
+
+def apply_fieldset(query, model, field_map, fields, sort_by=None):
+    """
+    Cargar solo las columnas que necesitan los campos pedidos.
+
+    El resto de columnas (típicamente description y technical_details, de
+    tipo Text) queda diferido y no viaja desde la base de datos.
+    """
+    if fields is None:
+        return query
+    columns = {model.id}
+    sort_col = sort_column(model, sort_by)
+    if sort_col.class_ is model:
+        columns.add(sort_col)
+    for name in fields:
+        if name in field_map:
+            columns.update(field_map[name][0])
+    return query.options(load_only(*columns))
+
+
+def serialize_fields(item, field_map, fields=None):
+    """Serializar un item con solo los campos pedidos"""
+    return {
+        name: getter(item)
+        for name, (_columns, getter) in field_map.items()
+        if fields is None or name in fields
+    }
+
+
+def serialize_product_listing(product, fields=None):
+    """Representación de un producto en /catalog/public/products"""
+    return serialize_fields(product, PRODUCT_LISTING_FIELDS, fields)
+
+
+def serialize_service_listing(service, fields=None):
+    """Representación de un servicio en /catalog/public/services"""
+    return serialize_fields(service, SERVICE_LISTING_FIELDS, fields)
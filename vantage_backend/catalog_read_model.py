@@ -0,0 +1,219 @@
+"""
+Modelo de lectura catalog_items.
+
+Proyección desnormalizada de productos y servicios (con nombre de proveedor,
+nombre de categoría, certificaciones, destacado, precio y fecha) sobre la que
+/catalog/search filtra, ordena y pagina en una sola consulta indexada.
+
+Guarda además los términos analizados del texto del item (search_tokens,
+ver text_analysis) para que las búsquedas solo analicen la consulta.
+
+Se mantiene dentro de la misma transacción de cada escritura mediante
+eventos de mapper, y se puede reconstruir completa con rebuild_catalog_items()
+(ver backfill_catalog_items.py).
+"""
+from sqlalchemy import event, select, insert, update, delete, literal, null, and_, case, tuple_, inspect, bindparam, String
+from .models import db, Product, Service, ProviderProfile, Category, CatalogItem
+from .catalog_queries import ITEM_MODELS
+from .text_analysis import analyze_fields
+from .bitset_index import bitset_index, bitset_filters_enabled
+
+_COLUMNS = [
+    'item_type', 'item_id', 'provider_id', 'provider_name', 'category_id', 'category_name',
+    'name', 'sku', 'modality', 'status', 'price', 'currency',
+    'has_cert_iso9001', 'has_cert_iso14001', 'is_featured', 'created_at', 'search_tokens'
+]
+_TOKENS_CHUNK = 5000
+
+
+def item_search_tokens(item_type, item):
+    """Términos guardados de un producto o servicio (nombre, descripción, SKU, detalles o modalidad)"""
+    if item_type == 'producto':
+        return analyze_fields(item.name, item.description, item.sku, item.technical_details)
+    return analyze_fields(item.name, item.description, item.modality)
+
+
+def _projection(item_type, search_tokens=None):
+    """SELECT con las columnas de catalog_items para productos o servicios"""
+    model = ITEM_MODELS[item_type]
+    return select(
+        literal(item_type).label('item_type'),
+        model.id,
+        model.provider_id,
+        ProviderProfile.company_name,
+        model.category_id,
+        Category.name,
+        model.name,
+        model.sku if model is Product else null(),
+        model.modality if model is Service else null(),
+        model.status,
+        model.price,
+        model.currency,
+        model.has_cert_iso9001,
+        model.has_cert_iso14001,
+        model.is_featured,
+        model.created_at,
+        literal(search_tokens, String) if search_tokens is not None else null()
+    ).select_from(model).outerjoin(
+        ProviderProfile, ProviderProfile.id == model.provider_id
+    ).outerjoin(
+        Category, Category.id == model.category_id
+    )
+
+
+def _item_clause(item_type, item_id):
+    return and_(CatalogItem.item_type == item_type, CatalogItem.item_id == item_id)
+
+
+def sync_catalog_item(connection, item_type, item_id, search_tokens=None):
+    """Reproyectar un item en catalog_items (lo elimina si ya no existe)"""
+    model = ITEM_MODELS[item_type]
+    connection.execute(delete(CatalogItem.__table__).where(_item_clause(item_type, item_id)))
+    connection.execute(
+        insert(CatalogItem.__table__).from_select(
+            _COLUMNS, _projection(item_type, search_tokens).where(model.id == item_id)
+        )
+    )
+
+
+def rebuild_catalog_items():
+    """Reconstruir catalog_items completo desde products y services (backfill)"""
+    connection = db.session.connection()
+    connection.execute(delete(CatalogItem.__table__))
+    for item_type in ITEM_MODELS:
+        connection.execute(insert(CatalogItem.__table__).from_select(_COLUMNS, _projection(item_type)))
+        _backfill_search_tokens(connection, item_type)
+    db.session.commit()
+    return CatalogItem.query.count()
+
+
+def _backfill_search_tokens(connection, item_type):
+    """Calcular search_tokens de todos los items de un tipo, por lotes"""
+    model = ITEM_MODELS[item_type]
+    columns = [model.id, model.name, model.description]
+    columns += [model.sku, model.technical_details] if model is Product else [model.modality]
+    statement = update(CatalogItem.__table__).where(
+        _item_clause(item_type, bindparam('target_id'))
+    ).values(search_tokens=bindparam('tokens'))
+
+    # Lotes por clave (id > último id): nunca hay más de un lote en memoria
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(*columns).where(model.id > last_id).order_by(model.id).limit(_TOKENS_CHUNK)
+        ).fetchall()
+        if not rows:
+            return
+        connection.execute(statement, [
+            {'target_id': row.id, 'tokens': item_search_tokens(item_type, row)} for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+def filtered_catalog_items(filters, relevant_refs=None):
+    """Query de catalog_items activos con los filtros de /catalog/search (sin orden)"""
+    query = CatalogItem.query.filter(CatalogItem.status == 'activo')
+
+    if filters.get('type') in ITEM_MODELS:
+        query = query.filter(CatalogItem.item_type == filters['type'])
+    if filters.get('category_id'):
+        query = query.filter(CatalogItem.category_id == filters['category_id'])
+    if filters.get('provider_id'):
+        query = query.filter(CatalogItem.provider_id == filters['provider_id'])
+    if filters.get('has_cert_iso9001'):
+        query = query.filter(CatalogItem.has_cert_iso9001 == True)
+    if filters.get('has_cert_iso14001'):
+        query = query.filter(CatalogItem.has_cert_iso14001 == True)
+    if filters.get('is_featured'):
+        query = query.filter(CatalogItem.is_featured == True)
+    if relevant_refs:
+        query = query.filter(tuple_(CatalogItem.item_type, CatalogItem.item_id).in_(relevant_refs))
+    return query
+
+
+def search_catalog_items(filters, relevant_refs=None, page=1, per_page=12):
+    """
+    Filtrar, ordenar y paginar catalog_items en una sola consulta.
+
+    Con relevant_refs (resultados de la búsqueda IA, en orden de relevancia)
+    se restringe a esos items y se ordena por su posición; si no, por fecha
+    de creación descendente. Los empates se desempatan por (item_id
+    descendente, item_type), como bitset_index: no por el id de la fila, que
+    cambia cada vez que sync_catalog_item reproyecta el item.
+    Devuelve (referencias de la página, total).
+    """
+    query = filtered_catalog_items(filters, relevant_refs)
+
+    ordering = [CatalogItem.created_at.desc(), CatalogItem.item_id.desc(), CatalogItem.item_type]
+    if relevant_refs:
+        rank = case(
+            *[(_item_clause(item_type, item_id), position) for position, (item_type, item_id) in enumerate(relevant_refs)],
+            else_=len(relevant_refs)
+        )
+        ordering.insert(0, rank)
+
+    total = query.order_by(None).count()
+    rows = query.with_entities(CatalogItem.item_type, CatalogItem.item_id).order_by(
+        *ordering
+    ).limit(per_page).offset((page - 1) * per_page).all()
+    return [(row.item_type, row.item_id) for row in rows], total
+
+
+def rank_relevant_refs(filters, relevant_refs):
+    """
+    Lista completa y ordenada de las referencias relevantes que cumplen los filtros.
+
+    Está acotada por el top-k de la búsqueda IA, así que se puede cachear
+    entera y paginar por slicing.
+    """
+    if bitset_filters_enabled():
+        return bitset_index.filter_refs(filters, relevant_refs)
+    refs, _total = search_catalog_items(filters, relevant_refs, 1, len(relevant_refs))
+    return refs
+
+
+def search_facet_source(filters, relevant_refs=None):
+    """Conjunto filtrado de /catalog/search con las columnas de las facetas"""
+    return filtered_catalog_items(filters, relevant_refs).with_entities(
+        CatalogItem.category_id, CatalogItem.category_name,
+        CatalogItem.provider_id, CatalogItem.provider_name,
+        CatalogItem.modality, CatalogItem.has_cert_iso9001,
+        CatalogItem.has_cert_iso14001, CatalogItem.is_featured
+    ).statement
+
+
+# --- Mantenimiento en la misma transacción de cada escritura ---
+
+def _register_item_events(model, item_type):
+    @event.listens_for(model, 'after_insert')
+    @event.listens_for(model, 'after_update')
+    def _sync(mapper, connection, target):
+        sync_catalog_item(connection, item_type, target.id, item_search_tokens(item_type, target))
+
+    @event.listens_for(model, 'after_delete')
+    def _remove(mapper, connection, target):
+        connection.execute(delete(CatalogItem.__table__).where(_item_clause(item_type, target.id)))
+
+
+for _item_type, _model in ITEM_MODELS.items():
+    _register_item_events(_model, _item_type)
+
+
+@event.listens_for(ProviderProfile, 'after_update')
+def _sync_provider_name(mapper, connection, target):
+    if inspect(target).attrs.company_name.history.has_changes():
+        connection.execute(
+            update(CatalogItem.__table__)
+            .where(CatalogItem.provider_id == target.id)
+            .values(provider_name=target.company_name)
+        )
+
+
+@event.listens_for(Category, 'after_update')
+def _sync_category_name(mapper, connection, target):
+    if inspect(target).attrs.name.history.has_changes():
+        connection.execute(
+            update(CatalogItem.__table__)
+            .where(CatalogItem.category_id == target.id)
+            .values(category_name=target.name)
+        )
@@ -0,0 +1,150 @@
+"""
+Circuit breaker para dependencias remotas lentas o caídas.
+
+Tras failure_threshold fallos seguidos (errores o llamadas que exceden el
+presupuesto de latencia) el circuito se abre y las llamadas se rechazan de
+inmediato durante reset_timeout segundos, para que el caller use su camino
+de respaldo sin bloquear el worker. Pasado ese tiempo se deja pasar una
+única llamada de prueba (half-open): si funciona el circuito se cierra y, si
+falla, se vuelve a abrir.
+
+Una llamada con presupuesto corre en un pool de hilos del circuito y el
+caller espera a lo sumo ese presupuesto: si se agota recibe
+CircuitTimeoutError y la llamada sigue en segundo plano hasta que termine.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """La llamada se rechazó porque el circuito está abierto"""
+
+
+class CircuitTimeoutError(TimeoutError):
+    """La llamada excedió el presupuesto de latencia"""
+
+
+class CircuitBreaker:
+    """Circuit breaker por proceso con estado cerrado, abierto y half-open"""
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic, max_workers=4):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._max_workers = max_workers
+        self._executor = None
+        self.reset()
+
+    def configure(self, failure_threshold=None, reset_timeout=None):
+        with self._lock:
+            if failure_threshold is not None:
+                self.failure_threshold = failure_threshold
+            if reset_timeout is not None:
+                self.reset_timeout = reset_timeout
+
+    def reset(self):
+        """Volver al estado cerrado y olvidar los contadores"""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+            self._last_error = None
+            self._last_duration = None
+            self._rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def allow(self):
+        """¿Puede pasar una llamada? En half-open solo una prueba a la vez"""
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._probing = False
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            if self._state == CLOSED:
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self, duration=None):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+            self._last_duration = duration
+
+    def record_failure(self, error, duration=None):
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error)
+            self._last_duration = duration
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probing = False
+
+    def call(self, function, budget=None):
+        """
+        Ejecutar function() a través del circuito.
+
+        Lanza CircuitOpenError si el circuito está abierto. Una excepción de
+        function cuenta como fallo y se propaga. Con budget (segundos) la
+        llamada corre en el pool del circuito y, si no termina a tiempo, se
+        registra un fallo y se lanza CircuitTimeoutError sin esperarla; function
+        no debe depender del contexto de Flask del caller.
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"Circuito '{self.name}' abierto")
+        started = time.perf_counter()
+        try:
+            if budget is None:
+                result = function()
+            else:
+                result = self._pool().submit(function).result(timeout=budget)
+        except FutureTimeoutError:
+            duration = time.perf_counter() - started
+            error = CircuitTimeoutError(f"Presupuesto de latencia excedido ({duration * 1000:.0f} ms)")
+            self.record_failure(error, duration)
+            raise error
+        except Exception as e:
+            self.record_failure(e, time.perf_counter() - started)
+            raise
+        self.record_success(time.perf_counter() - started)
+        return result
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                    thread_name_prefix=f"breaker-{self.name}")
+            return self._executor
+
+    def snapshot(self):
+        """Estado y tiempos del circuito para métricas y respuestas"""
+        with self._lock:
+            retry_in = None
+            if self._state == OPEN:
+                retry_in = max(self.reset_timeout - (self._clock() - self._opened_at), 0.0)
+            return {
+                "name": self.name,
+                "state": self._state,
+                "failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "rejected": self._rejected,
+                "retry_in_s": round(retry_in, 3) if retry_in is not None else None,
+                "last_error": self._last_error,
+                "last_duration_ms": round(self._last_duration * 1000, 1) if self._last_duration is not None else None
+            }
@@ -14,4 +14,54 @@ class Config:
     # Configuración de CORS
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000').split(',')
     CORS_METHODS = ['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS']
-    CORS_ALLOW_HEADERS = ['Content-Type', 'Authorization', 'X-Requested-With'] 
\ No newline at end of file
+    CORS_ALLOW_HEADERS = ['Content-Type', 'Authorization', 'X-Requested-With']
+    
+    # Caché de totales de paginación del catálogo (por proceso)
+    CATALOG_TOTALS_CACHE_TTL = int(os.environ.get('CATALOG_TOTALS_CACHE_TTL', 300))
+    CATALOG_TOTALS_CACHE_SIZE = int(os.environ.get('CATALOG_TOTALS_CACHE_SIZE', 2048))
+    
+    # Caché de respuestas de los endpoints públicos del catálogo (por proceso)
+    CATALOG_RESPONSE_CACHE_ENABLED = os.environ.get('CATALOG_RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    CATALOG_RESPONSE_CACHE_TTL = int(os.environ.get('CATALOG_RESPONSE_CACHE_TTL', 60))
+    CATALOG_RESPONSE_CACHE_SIZE = int(os.environ.get('CATALOG_RESPONSE_CACHE_SIZE', 512))
+    # Vigencia máxima de los ETag públicos: acota cuánto puede durar un 304
+    # obsoleto ante escrituras de otros workers o fuera de la sesión
+    CATALOG_ETAG_TTL = int(os.environ.get('CATALOG_ETAG_TTL', 60))
+
+    # Fichas de proveedor de las páginas de detalle (perfil, contactos, certificaciones)
+    CATALOG_PROVIDER_CARD_CACHE_TTL = int(os.environ.get('CATALOG_PROVIDER_CARD_CACHE_TTL', 600))
+    CATALOG_PROVIDER_CARD_CACHE_SIZE = int(os.environ.get('CATALOG_PROVIDER_CARD_CACHE_SIZE', 1024))
+
+    # Listas rankeadas de las búsquedas de texto (/catalog/search y buscador IA del dashboard)
+    CATALOG_SEARCH_CACHE_TTL = int(os.environ.get('CATALOG_SEARCH_CACHE_TTL', 300))
+    CATALOG_SEARCH_CACHE_SIZE = int(os.environ.get('CATALOG_SEARCH_CACHE_SIZE', 1024))
+
+    # Índice semántico de /catalog/search: embedder ('hashing' local u 'openai'),
+    # archivo donde se persisten los embeddings (vacío = solo memoria) y top-k
+    SEMANTIC_EMBEDDER = os.environ.get('SEMANTIC_EMBEDDER', 'hashing')
+    SEMANTIC_INDEX_PATH = os.environ.get(
+        'SEMANTIC_INDEX_PATH',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'semantic_index.npz')
+    )
+    SEMANTIC_EMBEDDER_URL = os.environ.get('SEMANTIC_EMBEDDER_URL')  # servicio compatible con /embeddings
+    # Cambios incrementales del índice semántico: se guardan a disco a lo sumo cada N segundos
+    SEMANTIC_INDEX_SAVE_SECONDS = int(os.environ.get('SEMANTIC_INDEX_SAVE_SECONDS', 300))
+    SEMANTIC_SEARCH_TOP_K = int(os.environ.get('SEMANTIC_SEARCH_TOP_K', 200))
+    SEMANTIC_MIN_SCORE = float(os.environ.get('SEMANTIC_MIN_SCORE', 0.25))
+
+    # Resultados por nivel (exactos / cercanos) del buscador IA del dashboard
+    DASHBOARD_SEARCH_TOP_K = int(os.environ.get('DASHBOARD_SEARCH_TOP_K', 50))
+
+    # Presupuesto de latencia de la etapa IA de /catalog/search y circuit breaker:
+    # se abre tras N fallos seguidos y prueba de nuevo pasados RESET segundos
+    SEARCH_AI_BUDGET_MS = int(os.environ.get('SEARCH_AI_BUDGET_MS', 800))
+    SEARCH_AI_BREAKER_FAILURES = int(os.environ.get('SEARCH_AI_BREAKER_FAILURES', 5))
+    SEARCH_AI_BREAKER_RESET_SECONDS = float(os.environ.get('SEARCH_AI_BREAKER_RESET_SECONDS', 30))
+
+    # Filtros de baja cardinalidad del catálogo resueltos con bitsets en memoria
+    # (false = predicados SQL sobre catalog_items y COUNT(*) cacheado)
+    CATALOG_BITSET_FILTERS = os.environ.get('CATALOG_BITSET_FILTERS', 'true').lower() == 'true'
+
+    # Reconstrucción completa periódica de los índices en memoria (0 = nunca),
+    # red de seguridad para escrituras que no pasan por la sesión
+    CATALOG_INDEX_REBUILD_SECONDS = int(os.environ.get('CATALOG_INDEX_REBUILD_SECONDS', 3600))
@@ -112,6 +112,10 @@ class Product(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     category = db.relationship('Category', backref='products')
+    __table_args__ = (
+        db.Index('ix_products_status_category_id', 'status', 'category_id', 'created_at'),
+        db.Index('ix_products_provider_id', 'provider_id', 'status'),
+    )
 
 class Service(db.Model):
     __tablename__ = 'services'
@@ -132,6 +136,10 @@ class Service(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     category = db.relationship('Category', backref='services')
+    __table_args__ = (
+        db.Index('ix_services_status_category_id', 'status', 'category_id', 'created_at'),
+        db.Index('ix_services_provider_id', 'provider_id', 'status'),
+    )
 
 class ProviderCertification(db.Model):
     __tablename__ = 'provider_certifications'
@@ -142,6 +150,36 @@ class ProviderCertification(db.Model):
     expiry_date = db.Column(db.Date, nullable=True)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+# --- MODELO DE LECTURA: CATÁLOGO UNIFICADO ---
+class CatalogItem(db.Model):
+    """Proyección desnormalizada de productos y servicios para la búsqueda (ver catalog_read_model)"""
+    __tablename__ = 'catalog_items'
+    id = db.Column(db.Integer, primary_key=True)
+    item_type = db.Column(db.String(16), nullable=False)  # 'producto' o 'servicio'
+    item_id = db.Column(db.Integer, nullable=False)
+    provider_id = db.Column(db.Integer, nullable=False)
+    provider_name = db.Column(db.String)
+    category_id = db.Column(db.Integer)
+    category_name = db.Column(db.String)
+    name = db.Column(db.String)
+    sku = db.Column(db.String)
+    modality = db.Column(db.String)
+    status = db.Column(db.String(16))
+    price = db.Column(db.Float)
+    currency = db.Column(db.String)
+    has_cert_iso9001 = db.Column(db.Boolean, default=False)
+    has_cert_iso14001 = db.Column(db.Boolean, default=False)
+    is_featured = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime)
+    search_tokens = db.Column(db.Text)  # términos analizados (ver text_analysis)
+    __table_args__ = (
+        db.UniqueConstraint('item_type', 'item_id'),
+        db.Index('ix_catalog_items_status_created_at', 'status', 'created_at', 'item_id', 'item_type'),
+        db.Index('ix_catalog_items_status_category_id', 'status', 'category_id', 'created_at'),
+        db.Index('ix_catalog_items_status_provider_id', 'status', 'provider_id', 'created_at'),
+        db.Index('ix_catalog_items_status_is_featured', 'status', 'is_featured', 'created_at'),
+    )
+
 # --- GRUPO: INTERACCIONES Y CONTENIDO ---
 class QuoteRequest(db.Model):
     __tablename__ = 'quote_requests'
@@ -159,6 +197,12 @@ class QuoteRequest(db.Model):
     responded_at = db.Column(db.DateTime, nullable=True)
     client = db.relationship('User', backref='sent_quotes')
     provider = db.relationship('ProviderProfile', backref='received_quotes')
+    branch = db.relationship('ClientBranch')
+    __table_args__ = (
+        db.Index('ix_quote_requests_client_user_id_created_at', 'client_user_id', 'created_at', 'id'),
+        db.Index('ix_quote_requests_provider_id_created_at', 'provider_id', 'created_at', 'id'),
+        db.Index('ix_quote_requests_provider_id_status', 'provider_id', 'status', 'created_at'),
+    )
 
 class QuoteAttachment(db.Model):
     __tablename__ = 'quote_attachments'
@@ -167,6 +211,9 @@ class QuoteAttachment(db.Model):
     file_url = db.Column(db.String)
     original_filename = db.Column(db.String)
     quote_request = db.relationship('QuoteRequest', backref='attachments')
+    __table_args__ = (
+        db.Index('ix_quote_attachments_quote_request_id', 'quote_request_id'),
+    )
 
 # --- RESPUESTAS DE COTIZACIÓN ---
 class QuoteResponse(db.Model):
@@ -182,6 +229,9 @@ class QuoteResponse(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     quote_request = db.relationship('QuoteRequest', backref='responses')
     provider = db.relationship('ProviderProfile', backref='quote_responses')
+    __table_args__ = (
+        db.Index('ix_quote_responses_quote_request_id', 'quote_request_id'),
+    )
 
 # --- GRUPO: NOTIFICACIONES ---
 class Notification(db.Model):
@@ -195,4 +245,7 @@ class Notification(db.Model):
     data = db.Column(db.JSON)  # Datos adicionales en formato JSON
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     read_at = db.Column(db.DateTime, nullable=True)
-    recipient = db.relationship('User', backref='notifications') 
\ No newline at end of file
+    recipient = db.relationship('User', backref='notifications')
+    __table_args__ = (
+        db.Index('ix_notifications_recipient_id_is_read', 'recipient_id', 'is_read', 'created_at'),
+    )
@@ -1,6 +1,7 @@
 from flask import request, jsonify, Blueprint
 from .models import db, ProviderProfile, Product, User
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from .catalog_events import notify_catalog_change, changed_fields
 import os
 from werkzeug.utils import secure_filename
 
@@ -53,7 +54,9 @@ def update_provider_profile():
     profile.website_url = data.get('website_url', profile.website_url)
     # Actualizar más campos...
     
+    fields = changed_fields(profile)
     db.session.commit()
+    notify_catalog_change('proveedor', profile.id, profile.id, fields)
     return jsonify({"message": "Perfil actualizado exitosamente"})
 
 @provider_bp.route('/profile/logo', methods=['PUT'])
@@ -84,7 +87,9 @@ def upload_logo():
         # Guarda la ruta del archivo en el perfil del proveedor
         profile = ProviderProfile.query.filter_by(user_id=int(user_id)).first()
         profile.logo_url = file_path
+        fields = changed_fields(profile)
         db.session.commit()
+        notify_catalog_change('proveedor', profile.id, profile.id, fields)
 
         return jsonify({"message": "Logo subido exitosamente", "path": file_path})
 
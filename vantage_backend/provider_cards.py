@@ -0,0 +1,95 @@
+"""
+Ficha de proveedor cacheada para las páginas de detalle del catálogo.
+
+El bloque de proveedor (perfil, contactos y certificaciones) es idéntico
+para todos los productos y servicios de un mismo proveedor, así que se
+serializa una vez y se guarda por id de proveedor. Se invalida con cada
+cambio 'proveedor' del catálogo; los cambios de contactos y certificaciones
+se detectan en la sesión y se notifican al confirmar la transacción.
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session, selectinload
+from .cache import TTLCache
+from .catalog_events import on_catalog_change, notify_catalog_change, provider_version
+from .models import ProviderProfile, ProviderContact, ProviderCertification
+
+provider_card_cache = TTLCache(maxsize=1024, ttl=600)
+
+
+def _serialize_card(provider):
+    return {
+        "id": provider.id,
+        "company_name": provider.company_name,
+        "about_us": provider.about_us,
+        "logo_url": provider.logo_url,
+        "brochure_pdf_url": provider.brochure_pdf_url,
+        "website_url": provider.website_url,
+        "contacts": [{
+            "name": contact.name,
+            "email": contact.email,
+            "phone": contact.phone,
+            "position": contact.position,
+            "is_primary": contact.is_primary
+        } for contact in provider.contacts],
+        "certifications": [{
+            "name": cert.name,
+            "file_url": cert.file_url,
+            "expiry_date": cert.expiry_date.isoformat() if cert.expiry_date else None,
+            "uploaded_at": cert.uploaded_at.isoformat()
+        } for cert in provider.certifications]
+    }
+
+
+def provider_card(provider_id):
+    """Bloque de proveedor de las fichas de detalle (None si no existe)"""
+    card = provider_card_cache.get(provider_id)
+    if card is not None:
+        return card
+
+    version = provider_version(provider_id)
+    provider = ProviderProfile.query.options(
+        selectinload(ProviderProfile.contacts),
+        selectinload(ProviderProfile.certifications)
+    ).filter_by(id=provider_id).first()
+    if not provider:
+        return None
+
+    card = _serialize_card(provider)
+    # Si el proveedor cambió mientras se armaba la ficha no se guarda
+    if provider_version(provider_id) == version:
+        provider_card_cache.set(provider_id, card)
+    return card
+
+
+@on_catalog_change
+def _invalidate_provider_card(change):
+    if change.item_type != 'proveedor' or (change.fields is not None and not change.fields):
+        return
+    if change.provider_id is None:
+        provider_card_cache.clear()
+    else:
+        provider_card_cache.invalidate(lambda key, value: key == change.provider_id)
+
+
+# --- Contactos y certificaciones: avisar al confirmar la transacción ---
+
+def _track_provider_child(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_provider_cards', set()).add(target.provider_id)
+
+
+for _model in (ProviderContact, ProviderCertification):
+    for _event_name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _event_name, _track_provider_child)
+
+
+@event.listens_for(Session, 'after_commit')
+def _notify_provider_children(session):
+    for provider_id in session.info.pop('changed_provider_cards', ()):
+        notify_catalog_change('proveedor', provider_id, provider_id, {'contacts', 'certifications'})
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_provider_children(session):
+    session.info.pop('changed_provider_cards', None)
@@ -1,8 +1,13 @@
 from flask import Blueprint, request, jsonify, send_from_directory
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from .models import db, QuoteRequest, QuoteAttachment, User, ProviderProfile, Product, Service, ClientBranch
-from datetime import datetime
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from .notifications_bp import create_quote_request_notification
+from .catalog_queries import load_items, keyset_paginate, ITEM_MODELS, ITEM_DASHBOARD_FIELDS
+from .search_index import catalog_search_index
+from .search_cache import search_result_cache, search_cache_key
 import os
 import json
 
@@ -106,10 +111,78 @@ def create_quote_request():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+QUOTE_STATUSES = ('pendiente', 'respondida', 'cancelada')
+INBOX_PER_PAGE = 20
+INBOX_MAX_PER_PAGE = 100
+
+
+def _parse_inbox_date(value, end=False):
+    """Fecha ISO de los filtros; una fecha sin hora como cota superior incluye todo ese día"""
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def paginate_inbox(query):
+    """
+    Filtros (status, date_from, date_to) y paginación por cursor de una bandeja de cotizaciones.
+
+    Ordena por (created_at, id) descendente con keyset_paginate, así cada
+    página cuesta lo mismo sin importar cuántas cotizaciones tenga el usuario.
+    El modo cursor es opcional (como en los listados del catálogo): sin
+    cursor ni per_page se devuelve la bandeja completa, como antes.
+    Devuelve (quotes, pagination); lanza ValueError si algún parámetro es inválido.
+    """
+    per_page = request.args.get('per_page', INBOX_PER_PAGE, type=int)
+    if per_page < 1 or per_page > INBOX_MAX_PER_PAGE:
+        per_page = INBOX_PER_PAGE
+
+    status = request.args.get('status')
+    if status:
+        if status not in QUOTE_STATUSES:
+            raise ValueError(f"Estado inválido: {status}")
+        query = query.filter(QuoteRequest.status == status)
+    date_from = request.args.get('date_from')
+    if date_from:
+        query = query.filter(QuoteRequest.created_at >= _parse_inbox_date(date_from))
+    date_to = request.args.get('date_to')
+    if date_to:
+        query = query.filter(QuoteRequest.created_at < _parse_inbox_date(date_to, end=True))
+
+    cursor = request.args.get('cursor')
+    if cursor is None and 'per_page' not in request.args:
+        quotes = query.order_by(QuoteRequest.created_at.desc(), QuoteRequest.id.desc()).all()
+        return quotes, {
+            'mode': 'all',
+            'total_items': len(quotes),
+            'has_next': False,
+            'next_cursor': None
+        }
+
+    quotes, next_cursor = keyset_paginate(query, QuoteRequest, 'created_at', 'desc', cursor, per_page)
+    return quotes, {
+        'mode': 'cursor',
+        'per_page': per_page,
+        'has_next': next_cursor is not None,
+        'next_cursor': next_cursor
+    }
+
+
+def attachment_counts(quotes):
+    """Cantidad de adjuntos por cotización de la página, en una sola consulta agrupada"""
+    if not quotes:
+        return {}
+    rows = db.session.query(QuoteAttachment.quote_request_id, func.count(QuoteAttachment.id)).filter(
+        QuoteAttachment.quote_request_id.in_([quote.id for quote in quotes])
+    ).group_by(QuoteAttachment.quote_request_id)
+    return dict(rows.all())
+
+
 @quotes_bp.route('/quotes/my-requests', methods=['GET'])
 @jwt_required()
 def get_my_quote_requests():
-    """Obtener las solicitudes de cotización del cliente"""
+    """Obtener las solicitudes de cotización del cliente (todas, o paginadas por cursor)"""
     try:
         user_id = get_jwt_identity()
         user = User.query.get(user_id)
@@ -117,12 +190,19 @@ def get_my_quote_requests():
         if not user or user.role != 'cliente':
             return jsonify({'error': 'Acceso denegado'}), 403
         
-        # Obtener todas las solicitudes del cliente
-        quote_requests = QuoteRequest.query.filter_by(client_user_id=user_id).order_by(QuoteRequest.created_at.desc()).all()
+        # Proveedor precargado en la misma consulta de la página
+        query = QuoteRequest.query.options(joinedload(QuoteRequest.provider)).filter(
+            QuoteRequest.client_user_id == user.id
+        )
+        try:
+            quote_requests, pagination = paginate_inbox(query)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        attachments = attachment_counts(quote_requests)
         
         requests_data = []
         for quote in quote_requests:
-            provider = ProviderProfile.query.get(quote.provider_id)
+            provider = quote.provider
             requests_data.append({
                 'id': quote.id,
                 'provider_name': provider.company_name if provider else 'Proveedor no encontrado',
@@ -133,10 +213,10 @@ def get_my_quote_requests():
                 'message': quote.message,
                 'created_at': quote.created_at.isoformat(),
                 'status': quote.status,
-                'attachments_count': len(quote.attachments)
+                'attachments_count': attachments.get(quote.id, 0)
             })
         
-        return jsonify({'quote_requests': requests_data}), 200
+        return jsonify({'quote_requests': requests_data, 'pagination': pagination}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -146,7 +226,7 @@ def get_my_quote_requests():
 @quotes_bp.route('/quotes/received', methods=['GET'])
 @jwt_required()
 def get_received_quotes():
-    """Obtener las solicitudes de cotización recibidas por el proveedor"""
+    """Obtener las solicitudes de cotización recibidas por el proveedor (todas, o paginadas por cursor)"""
     try:
         user_id = get_jwt_identity()
         user = User.query.get(user_id)
@@ -158,13 +238,21 @@ def get_received_quotes():
         if not provider:
             return jsonify({'error': 'Perfil de proveedor no encontrado'}), 404
         
-        # Obtener todas las solicitudes recibidas
-        quote_requests = QuoteRequest.query.filter_by(provider_id=provider.id).order_by(QuoteRequest.created_at.desc()).all()
+        # Cliente, su empresa y la sucursal precargados en la misma consulta de la página
+        query = QuoteRequest.query.options(
+            joinedload(QuoteRequest.client).joinedload(User.company),
+            joinedload(QuoteRequest.branch)
+        ).filter(QuoteRequest.provider_id == provider.id)
+        try:
+            quote_requests, pagination = paginate_inbox(query)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        attachments = attachment_counts(quote_requests)
         
         requests_data = []
         for quote in quote_requests:
-            client = User.query.get(quote.client_user_id)
-            branch = ClientBranch.query.get(quote.client_branch_id) if quote.client_branch_id else None
+            client = quote.client
+            branch = quote.branch
             
             requests_data.append({
                 'id': quote.id,
@@ -177,10 +265,10 @@ def get_received_quotes():
                 'message': quote.message,
                 'created_at': quote.created_at.isoformat(),
                 'status': quote.status,
-                'attachments_count': len(quote.attachments)
+                'attachments_count': attachments.get(quote.id, 0)
             })
         
-        return jsonify({'quote_requests': requests_data}), 200
+        return jsonify({'quote_requests': requests_data, 'pagination': pagination}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -869,105 +957,37 @@ def search_catalog_ia():
         if not query:
             return jsonify({'error': 'Consulta requerida'}), 400
         
-        # Obtener todos los productos y servicios activos
-        products = Product.query.filter(Product.status == 'activo').all()
-        services = Service.query.filter(Service.status == 'activo').all()
-        
         print(f"[SEARCH] Consulta: '{query}'")
-        print(f"[SEARCH] Productos encontrados: {len(products)}")
-        print(f"[SEARCH] Servicios encontrados: {len(services)}")
-        
-        # Preparar datos para el análisis IA
-        catalog_data = []
-        
-        # Agregar productos
-        for product in products:
-            catalog_data.append({
-                'id': product.id,
-                'type': 'producto',
-                'name': product.name,
-                'description': product.description or '',
-                'technical_details': product.technical_details or '',
-                'category': product.category.name if product.category else '',
-                'provider': product.provider.company_name if product.provider else '',
-                'sku': product.sku or '',
-                'is_featured': product.is_featured
-            })
-        
-        # Agregar servicios
-        for service in services:
-            catalog_data.append({
-                'id': service.id,
-                'type': 'servicio',
-                'name': service.name,
-                'description': service.description or '',
-                'category': service.category.name if service.category else '',
-                'provider': service.provider.company_name if service.provider else '',
-                'modality': service.modality or '',
-                'is_featured': service.is_featured
-            })
         
-        if not catalog_data:
+        # Índice invertido en memoria (se construye una vez y se actualiza con los cambios del catálogo)
+        if not catalog_search_index.count():
             return jsonify({
                 'message': 'No hay productos o servicios disponibles',
                 'results': [],
                 'reasoning': 'El catálogo está vacío'
             })
         
-        print(f"[SEARCH] Datos del catálogo preparados: {len(catalog_data)} items")
-        print(f"[SEARCH] Primeros 3 productos: {[item['name'] for item in catalog_data[:3] if item['type'] == 'producto']}")
-        print(f"[SEARCH] Primeros 3 servicios: {[item['name'] for item in catalog_data[:3] if item['type'] == 'servicio']}")
-        
-        # Búsqueda local inteligente (fallback cuando OpenAI no está disponible)
-        print(f"[SEARCH] Usando búsqueda local inteligente")
-        
-        # Normalizar la consulta
-        query_lower = query.lower().strip()
-        query_words = query_lower.split()
-        
-        exact_matches = []
-        near_matches = []
-        
-        # Función para calcular similitud
-        def calculate_similarity(item_text, query_words):
-            item_lower = item_text.lower()
-            score = 0
-            for word in query_words:
-                if word in item_lower:
-                    score += 1
-            return score / len(query_words) if query_words else 0
-        
-        # Buscar en todos los items
-        for item in catalog_data:
-            # Crear texto de búsqueda para el item
-            search_text = f"{item['name']} {item['description']} {item['category']} {item['provider']}"
-            if item['type'] == 'producto' and 'technical_details' in item:
-                search_text += f" {item['technical_details']}"
-            if item['type'] == 'servicio' and 'modality' in item:
-                search_text += f" {item['modality']}"
-            
-            # Calcular similitud
-            similarity = calculate_similarity(search_text, query_words)
-            
-            # Determinar si es coincidencia exacta o cercana
-            if similarity >= 0.8:  # Alta similitud
-                exact_matches.append({
-                    "id": item['id'],
-                    "type": item['type'],
-                    "name": item['name'],
-                    "reasoning": f"Coincidencia exacta: '{query}' encontrado en {item['name']}"
-                })
-            elif similarity >= 0.3:  # Similitud media
-                near_matches.append({
-                    "id": item['id'],
-                    "type": item['type'],
-                    "name": item['name'],
-                    "reasoning": f"Coincidencia cercana: '{query}' relacionado con {item['name']}"
-                })
-        
-        # Ordenar por relevancia (destacados primero)
-        exact_matches.sort(key=lambda x: catalog_data[x['id']-1].get('is_featured', False), reverse=True)
-        near_matches.sort(key=lambda x: catalog_data[x['id']-1].get('is_featured', False), reverse=True)
+        print(f"[SEARCH] Usando índice invertido local ({catalog_search_index.stats()['documents']} items)")
+        
+        # Lista rankeada cacheada por los términos analizados de la consulta (los mismos que usa el índice)
+        cache_key = search_cache_key('dashboard_ia', query, analyzed=True)
+        cached = search_result_cache.get(cache_key)
+        if cached is None:
+            cached = catalog_search_index.search(query, k=current_app.config.get('DASHBOARD_SEARCH_TOP_K', 50))
+            search_result_cache.set(cache_key, cached)
+        exact_refs, near_refs = cached
+        exact_matches = [{
+            "id": item_id,
+            "type": item_type,
+            "name": name,
+            "reasoning": f"Coincidencia exacta: '{query}' encontrado en {name}"
+        } for (item_type, item_id), name in exact_refs]
+        near_matches = [{
+            "id": item_id,
+            "type": item_type,
+            "name": name,
+            "reasoning": f"Coincidencia cercana: '{query}' relacionado con {name}"
+        } for (item_type, item_id), name in near_refs]
         
         analysis_result = {
             "exact_matches": exact_matches,
@@ -979,79 +999,23 @@ def search_catalog_ia():
         print(f"[SEARCH] Exact matches: {len(exact_matches)}")
         print(f"[SEARCH] Near matches: {len(near_matches)}")
         
-        # Obtener los items completos basados en los IDs
-        exact_items = []
-        near_items = []
+        # Obtener los items completos basados en los IDs (una consulta IN por tipo)
+        matches = analysis_result.get('exact_matches', []) + analysis_result.get('near_matches', [])
+        loaded = load_items(
+            [(match.get('type'), match.get('id')) for match in matches if match.get('type') in ITEM_MODELS],
+            ITEM_DASHBOARD_FIELDS
+        )
         
-        # Procesar coincidencias exactas
-        for match in analysis_result.get('exact_matches', []):
-            item_id = match.get('id')
-            item_type = match.get('type')
-            
-            if item_type == 'producto':
-                item = Product.query.get(item_id)
-                if item:
-                    exact_items.append({
-                        'id': item.id,
-                        'type': 'producto',
-                        'name': item.name,
-                        'description': item.description,
-                        'technical_details': item.technical_details,
-                        'sku': item.sku,
-                        'category': item.category.name if item.category else '',
-                        'provider': item.provider.company_name if item.provider else '',
-                        'is_featured': item.is_featured,
-                        'reasoning': match.get('reasoning', '')
-                    })
-            elif item_type == 'servicio':
-                item = Service.query.get(item_id)
+        def resolve_matches(match_list):
+            items = []
+            for match in match_list:
+                item = loaded.get((match.get('type'), match.get('id')))
                 if item:
-                    exact_items.append({
-                        'id': item.id,
-                        'type': 'servicio',
-                        'name': item.name,
-                        'description': item.description,
-                        'category': item.category.name if item.category else '',
-                        'provider': item.provider.company_name if item.provider else '',
-                        'modality': item.modality,
-                        'is_featured': item.is_featured,
-                        'reasoning': match.get('reasoning', '')
-                    })
-        
-        # Procesar coincidencias cercanas
-        for match in analysis_result.get('near_matches', []):
-            item_id = match.get('id')
-            item_type = match.get('type')
-            
-            if item_type == 'producto':
-                item = Product.query.get(item_id)
-                if item:
-                    near_items.append({
-                        'id': item.id,
-                        'type': 'producto',
-                        'name': item.name,
-                        'description': item.description,
-                        'technical_details': item.technical_details,
-                        'sku': item.sku,
-                        'category': item.category.name if item.category else '',
-                        'provider': item.provider.company_name if item.provider else '',
-                        'is_featured': item.is_featured,
-                        'reasoning': match.get('reasoning', '')
-                    })
-            elif item_type == 'servicio':
-                item = Service.query.get(item_id)
-                if item:
-                    near_items.append({
-                        'id': item.id,
-                        'type': 'servicio',
-                        'name': item.name,
-                        'description': item.description,
-                        'category': item.category.name if item.category else '',
-                        'provider': item.provider.company_name if item.provider else '',
-                        'modality': item.modality,
-                        'is_featured': item.is_featured,
-                        'reasoning': match.get('reasoning', '')
-                    })
+                    items.append(dict(item, reasoning=match.get('reasoning', '')))
+            return items
+        
+        exact_items = resolve_matches(analysis_result.get('exact_matches', []))
+        near_items = resolve_matches(analysis_result.get('near_matches', []))
         
         return jsonify({
             'message': 'Búsqueda completada',
@@ -0,0 +1,45 @@
+"""
+Caché de resultados de búsqueda del catálogo.
+
+Guarda la lista rankeada de referencias de una búsqueda de texto (ya
+filtrada) por consulta normalizada + filtros, de modo que las consultas
+populares ("bomba", "mantenimiento", "epp") no repiten la etapa IA ni el
+filtrado: cada página se sirve cortando la lista cacheada e hidratando solo
+esa página.
+
+La clave incluye la versión del catálogo y cualquier cambio vacía la caché,
+así que una lista nunca sobrevive a una escritura.
+"""
+from .cache import TTLCache
+from .catalog_events import on_catalog_change, catalog_version
+from .search_index import tokenize
+from .text_analysis import analyze, fold
+
+search_result_cache = TTLCache(maxsize=1024, ttl=300)
+
+
+def normalize_query(query, analyzed=False):
+    """
+    'Bomba  Hidráulica' -> 'bomba hidraulica'; tokens únicos y ordenados.
+
+    analyzed=True normaliza con los términos de text_analysis ('bombas' ->
+    'bomb'), para búsquedas que solo ven esos términos (índice invertido
+    del dashboard); la búsqueda semántica recibe el texto y no los usa.
+    """
+    terms = analyze(query) if analyzed else tokenize(fold(query))
+    return ' '.join(sorted(set(terms)))
+
+
+def search_cache_key(scope, query, filters=None, analyzed=False):
+    """Clave de una búsqueda: ámbito, versión del catálogo, consulta normalizada y filtros activos"""
+    active = tuple(sorted(
+        (name, value) for name, value in (filters or {}).items() if value not in (None, False, '')
+    ))
+    return (scope, catalog_version(), normalize_query(query, analyzed), active)
+
+
+@on_catalog_change
+def _invalidate_search_results(change):
+    if change.fields is not None and not change.fields:
+        return
+    search_result_cache.invalidate(lambda key, value: True)
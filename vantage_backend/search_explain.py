@@ -0,0 +1,133 @@
+"""
+Tiempos por etapa de /catalog/search y modo explain.
+
+Cada búsqueda se mide con un SearchTrace: duración de cada etapa (caché,
+etapa IA, filtros, facetas, hidratación, corrección, serialización),
+candidatos que quedan tras cada una y estado de las cachés. Las duraciones
+alimentan search_stage_metrics (expuesto en /catalog/admin/metrics).
+
+Con explain=1 (solo administradores) la respuesta incluye además el
+desglose completo y las sentencias SQL emitidas durante la búsqueda con su
+duración y la etapa en que corrieron.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from sqlalchemy import event
+
+SAMPLES_PER_STAGE = 512
+
+
+class StageMetrics:
+    """Duraciones recientes por etapa (ventana acotada) con conteo, promedio, p95 y máximo"""
+
+    def __init__(self, samples=SAMPLES_PER_STAGE):
+        self._samples = samples
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def record(self, stage, elapsed_ms):
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = {'count': 0, 'max_ms': 0.0, 'recent': deque(maxlen=self._samples)}
+            entry['count'] += 1
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['recent'].append(elapsed_ms)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for stage, entry in self._stages.items():
+                recent = sorted(entry['recent'])
+                result[stage] = {
+                    'count': entry['count'],
+                    'avg_ms': round(sum(recent) / len(recent), 2),
+                    'p95_ms': round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 2),
+                    'max_ms': round(entry['max_ms'], 2)
+                }
+            return result
+
+
+search_stage_metrics = StageMetrics()
+
+
+class SearchTrace:
+    """Medición de una búsqueda; con capture_sql registra las sentencias de este hilo"""
+
+    def __init__(self, engine=None, capture_sql=False, metrics=search_stage_metrics):
+        self.metrics = metrics
+        self.stages = []
+        self.candidates = {}
+        self.cache = {}
+        self.statements = []
+        self._stage = None
+        self._engine = engine if capture_sql else None
+        self._thread = threading.get_ident()
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        previous, self._stage = self._stage, name
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._stage = previous
+            self.stages.append({'stage': name, 'ms': round(elapsed_ms, 2)})
+            if self.metrics is not None:
+                self.metrics.record(name, elapsed_ms)
+
+    def count(self, name, value):
+        self.candidates[name] = value
+
+    def cache_status(self, name, status):
+        self.cache[name] = status
+
+    # --- Sentencias SQL (solo explain) ---
+
+    def __enter__(self):
+        if self._engine is not None:
+            event.listen(self._engine, 'before_cursor_execute', self._before_execute)
+            event.listen(self._engine, 'after_cursor_execute', self._after_execute)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._engine is not None:
+            event.remove(self._engine, 'before_cursor_execute', self._before_execute)
+            event.remove(self._engine, 'after_cursor_execute', self._after_execute)
+        return False
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self._thread:
+            conn.info.setdefault('explain_started', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() != self._thread or not conn.info.get('explain_started'):
+            return
+        started = conn.info['explain_started'].pop()
+        self.statements.append({
+            'stage': self._stage,
+            'sql': ' '.join(statement.split()),
+            'ms': round((time.perf_counter() - started) * 1000, 2)
+        })
+
+    def report(self):
+        """Desglose para la respuesta con explain=1"""
+        return {
+            'total_ms': round((time.perf_counter() - self._started) * 1000, 2),
+            'stages': self.stages,
+            'candidates': self.candidates,
+            'cache': self.cache,
+            'sql': {
+                'count': len(self.statements),
+                'total_ms': round(sum(statement['ms'] for statement in self.statements), 2),
+                'statements': self.statements
+            }
+        }
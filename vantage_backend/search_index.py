@@ -0,0 +1,238 @@
+"""
+Índice invertido en memoria para el buscador IA del dashboard.
+
+Cada producto y servicio activo se indexa con los términos analizados que
+guarda catalog_items.search_tokens (más los de su categoría y proveedor) como
+término -> {(tipo, id): frecuencia}. La consulta pasa por el mismo análisis
+(tildes, plurales, palabras vacías, SKU; ver text_analysis), así que
+"valvulas" encuentra "Válvula". Los términos se guardan además en una lista
+ordenada: cada palabra de la consulta se resuelve con bisect sobre el rango
+de términos que empiezan por ella (coincidencia exacta o por prefijo), sin
+recorrer el vocabulario ni el catálogo.
+
+El índice se construye la primera vez que se usa y se actualiza de forma
+incremental con los avisos del catálogo: los items modificados se marcan y
+se reindexan (una consulta IN por tipo) en la siguiente búsqueda.
+"""
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import Counter, deque
+from .catalog_indexes import CatalogIndex, register_index, document_rows, document_text, ITEM_TYPES
+from .text_analysis import analyze, analyze_fields, analyze_name
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Fracción de palabras de la consulta que deben aparecer en el item
+EXACT_THRESHOLD = 0.8
+NEAR_THRESHOLD = 0.3
+
+# Resultados por nivel (exactos / cercanos) que devuelve una búsqueda
+TOP_K = 50
+
+# Actualizaciones incrementales cuyo cambio de vocabulario se recuerda para el corrector
+VOCABULARY_LOG_SIZE = 1024
+
+
+def tokenize(text):
+    """Tokens en minúsculas de un texto"""
+    return _TOKEN_RE.findall((text or '').lower())
+
+
+class InvertedIndex(CatalogIndex):
+    """Índice token -> posting list con puntuación por frecuencia de términos"""
+
+    name = 'inverted'
+    _state = ('_postings', '_terms', '_documents', '_words')
+
+    def __init__(self):
+        super().__init__()
+        self._postings = {}    # término -> {ref: tf}
+        self._terms = []       # términos de _postings, ordenados (búsqueda por prefijo)
+        self._documents = {}   # ref -> {'name', 'is_featured', 'provider_id', 'created', 'terms', 'words'}
+        self._words = Counter()  # palabras tal como se escriben -> documentos (para el corrector)
+        self._word_delta = None  # cambios de _words durante una actualización incremental
+        self._vocabulary_log = deque(maxlen=VOCABULARY_LOG_SIZE)  # (generación, Counter de deltas)
+        self._vocabulary_reset = 0  # generación de la última reconstrucción completa
+
+    # --- Mantenimiento ---
+
+    def _rebuild(self):
+        self._postings = {}
+        self._terms = None     # se ordena una sola vez al final
+        self._documents = {}
+        self._words = Counter()
+        for item_type in ITEM_TYPES:
+            for row in document_rows(item_type):
+                if row.status == 'activo':
+                    self._add(item_type, row)
+        self._terms = sorted(self._postings)
+        self._vocabulary_log = deque(maxlen=VOCABULARY_LOG_SIZE)
+        self._vocabulary_reset = self.generation + 1
+
+    def _adopt(self, shadow):
+        super()._adopt(shadow)
+        self._vocabulary_log = deque(maxlen=VOCABULARY_LOG_SIZE)
+        self._vocabulary_reset = self.generation + 1
+
+    def _update(self, refs):
+        self._word_delta = Counter()
+        try:
+            ids_by_type = {}
+            for item_type, item_id in refs:
+                ids_by_type.setdefault(item_type, []).append(item_id)
+                self._remove((item_type, item_id))
+            for item_type, ids in ids_by_type.items():
+                for row in document_rows(item_type, ids):
+                    if row.status == 'activo':
+                        self._add(item_type, row)
+        finally:
+            # Registrado aun si falla a mitad: lo ya aplicado a _words también cuenta
+            self._vocabulary_log.append((self.generation + 1, self._word_delta))
+            self._word_delta = None
+
+    def _provider_refs(self, provider_ids):
+        return [ref for ref, document in self._documents.items() if document['provider_id'] in provider_ids]
+
+    def _add(self, item_type, row):
+        ref = (item_type, row.id)
+        stored = row.search_tokens
+        if stored is None:
+            # Item aún sin términos guardados (antes del backfill)
+            stored = analyze_fields(row.name, row.description, row.sku, row.extra)
+        terms = Counter(stored.split())
+        terms.update(analyze_name(row.category_name or ''))
+        terms.update(analyze_name(row.provider_name or ''))
+        for term, tf in terms.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = {}
+                if self._terms is not None:
+                    insort(self._terms, term)
+            posting[ref] = tf
+        words = frozenset(tokenize(document_text(row)))
+        self._words.update(words)
+        if self._word_delta is not None:
+            self._word_delta.update(words)
+        self._documents[ref] = {
+            'name': row.name,
+            'is_featured': bool(row.is_featured),
+            'provider_id': row.provider_id,
+            'created': row.created_at.timestamp() if row.created_at else 0.0,
+            'terms': tuple(terms),    # solo para desindexar
+            'words': tuple(words)
+        }
+
+    def _remove(self, ref):
+        document = self._documents.pop(ref, None)
+        if not document:
+            return
+        for term in document['terms']:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(ref, None)
+                if not posting:
+                    del self._postings[term]
+                    del self._terms[bisect_left(self._terms, term)]
+        self._words.subtract(document['words'])
+        if self._word_delta is not None:
+            self._word_delta.subtract(document['words'])
+        for word in document['words']:
+            if self._words[word] <= 0:
+                del self._words[word]
+
+    # --- Consulta ---
+
+    def search(self, query, k=TOP_K):
+        """
+        Buscar items cuyo texto contenga los términos de la consulta.
+
+        Un término coincide con los términos indexados que empiezan por él
+        (exacto o prefijo). Devuelve (exact, near):
+        los k mejores (ref, nombre) con cobertura >= EXACT_THRESHOLD y
+        >= NEAR_THRESHOLD, por frecuencia de los términos coincidentes (suma
+        de tf), luego destacados y luego los más recientes. Cada nivel se
+        elige con un heap de tamaño k, sin ordenar todas las coincidencias.
+        """
+        self.refresh()
+        words = list(dict.fromkeys(analyze(query)))
+        if not words:
+            return [], []
+
+        with self._lock:
+            coverage = Counter()
+            tf_score = Counter()
+            for word in words:
+                matched = Counter()
+                for term in self._prefixed(word):
+                    matched.update(self._postings[term])
+                coverage.update(matched.keys())
+                tf_score.update(matched)
+
+            documents = self._documents
+            exact_hits = EXACT_THRESHOLD * len(words)
+            near_hits = NEAR_THRESHOLD * len(words)
+
+            def rank(ref):
+                document = documents[ref]
+                return (-tf_score[ref], not document['is_featured'], -document['created'], ref)
+
+            exact = heapq.nsmallest(k, (ref for ref, hits in coverage.items() if hits >= exact_hits), key=rank)
+            near = heapq.nsmallest(
+                k, (ref for ref, hits in coverage.items() if near_hits <= hits < exact_hits), key=rank
+            )
+            return (
+                [(ref, documents[ref]['name']) for ref in exact],
+                [(ref, documents[ref]['name']) for ref in near]
+            )
+
+    def _prefixed(self, word):
+        """Términos indexados que empiezan por word (rango contiguo de la lista ordenada)"""
+        terms = self._terms
+        position = bisect_left(terms, word)
+        while position < len(terms) and terms[position].startswith(word):
+            yield terms[position]
+            position += 1
+
+    def vocabulary(self):
+        """Palabras del catálogo (sin analizar) con su frecuencia de documentos"""
+        self.refresh()
+        with self._lock:
+            return dict(self._words)
+
+    def vocabulary_changes(self, since):
+        """
+        Cambios del vocabulario desde la generación since, para el corrector.
+
+        Devuelve (generación, palabras, cambios). Si hubo una reconstrucción
+        después de since (o el registro ya no llega tan atrás), palabras es el
+        vocabulario completo y cambios None; si no, palabras es None y cambios
+        un Counter palabra -> delta de frecuencia de las actualizaciones
+        incrementales posteriores a since.
+        """
+        self.refresh()
+        with self._lock:
+            log = self._vocabulary_log
+            if since is None or since < self._vocabulary_reset or (log and log[0][0] > since + 1):
+                return self.generation, dict(self._words), None
+            changes = Counter()
+            for generation, delta in log:
+                if generation > since:
+                    changes.update(delta)
+            return self.generation, None, changes
+
+    def stats(self):
+        with self._lock:
+            return {
+                "built": self._built,
+                "documents": len(self._documents),
+                "terms": len(self._postings),
+                "words": len(self._words),
+                "pending": self.pending()
+            }
+
+    def __len__(self):
+        return len(self._documents)
+
+
+catalog_search_index = register_index(InvertedIndex())
@@ -0,0 +1,362 @@
+"""
+Índice semántico en memoria para /catalog/search.
+
+Los embeddings de los items activos se guardan en una matriz float32
+contigua (una fila por item, normalizada) y se persisten a disco en un
+.npz junto con la referencia y un hash del texto de cada fila. Al arrancar
+se carga el archivo y solo se recalculan los items cuyo texto cambió.
+
+El archivo se escribe al terminar cada reconstrucción completa; los
+cambios incrementales se guardan a lo sumo cada save_interval segundos, en
+un hilo aparte y a partir de una instantánea de la matriz. Cada escritura
+usa un temporal único en el mismo directorio y os.replace, así que varios
+procesos pueden guardar a la vez sin pisarse el temporal.
+
+Una consulta es un producto matriz-vector (similitud coseno) seguido de
+argpartition para el top-k, sin llamadas HTTP ni recorridos del catálogo.
+La matriz y sus referencias se publican juntas (_view) al terminar cada
+cambio, así una consulta no espera a una actualización en curso.
+
+El cálculo de embeddings es intercambiable (SEMANTIC_EMBEDDER): 'hashing'
+es local y determinista (n-gramas de caracteres con hashing trick) y
+'openai' usa la API de embeddings (o un servicio compatible). Las llamadas
+remotas de la búsqueda pasan por un circuit breaker (semantic_breaker).
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import unicodedata
+import zlib
+import numpy as np
+import requests
+from .catalog_indexes import CatalogIndex, register_index, document_rows, document_text, ITEM_TYPES
+from .search_index import tokenize
+from .circuit_breaker import CircuitBreaker
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class HashingEmbedder:
+    """Embedder local y determinista: palabras y trigramas de caracteres con hashing trick"""
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.signature = f"hashing-{dim}"
+
+    def _features(self, text):
+        plain = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+        for token in tokenize(plain):
+            yield token
+            padded = f"#{token}#"
+            for i in range(len(padded) - 2):
+                yield padded[i:i + 3]
+
+    def embed(self, texts, timeout=None):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = zlib.crc32(feature.encode())
+                sign = 1.0 if (digest >> 31) & 1 else -1.0
+                matrix[row, digest % self.dim] += sign
+        return _normalize_rows(matrix)
+
+
+class OpenAIEmbedder:
+    """
+    Embeddings de la API de OpenAI o de un servicio compatible (/embeddings).
+
+    base_url permite apuntar a un servicio local con la misma API; cada
+    llamada tiene timeout para no bloquear el worker si el servicio se cuelga.
+    """
+
+    def __init__(self, model='text-embedding-3-small', batch_size=100, base_url=None, api_key=None, timeout=30.0):
+        self.model = model
+        self.batch_size = batch_size
+        self.base_url = (base_url or 'https://api.openai.com/v1').rstrip('/')
+        self.api_key = api_key or os.environ.get('OPENAI_API_KEY') or os.environ.get('OPENAI_KEY')
+        self.timeout = timeout
+        self.signature = f"openai-{model}"
+
+    def embed(self, texts, timeout=None):
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = requests.post(
+                f"{self.base_url}/embeddings",
+                json={'model': self.model, 'input': texts[start:start + self.batch_size]},
+                headers={'Authorization': f"Bearer {self.api_key}"},
+                timeout=timeout or self.timeout
+            )
+            response.raise_for_status()
+            data = sorted(response.json()['data'], key=lambda item: item['index'])
+            vectors.extend(item['embedding'] for item in data)
+        return _normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+
+EMBEDDERS = {
+    'hashing': HashingEmbedder,
+    'openai': OpenAIEmbedder,
+}
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+class SemanticIndex(CatalogIndex):
+    """Matriz de embeddings del catálogo con top-k por producto matriz-vector"""
+
+    name = 'semantic'
+    # Con la matriz se adopta su estado de guardado: la copia ya escribió el archivo
+    _state = ('_matrix', '_refs', '_digests', '_providers', '_positions', '_saved_at', '_unsaved')
+
+    def __init__(self, embedder=None, path=None, save_interval=300):
+        super().__init__()
+        self.embedder = embedder or HashingEmbedder()
+        self.path = path
+        self.save_interval = save_interval
+        self._saved_at = None
+        self._unsaved = False
+        self._saver = None     # hilo de guardado en curso
+        self._reset()
+        self._publish()
+
+    def configure(self, embedder=None, path=None, save_interval=None):
+        """Cambiar embedder y archivo; el índice se reconstruye en la siguiente consulta"""
+        with self._lock:
+            if embedder is not None:
+                self.embedder = embedder
+            if save_interval is not None:
+                self.save_interval = save_interval
+            self.path = path
+            self._reset()
+            self._publish()
+            self._built = False
+
+    def _reset(self):
+        dim = getattr(self.embedder, 'dim', 0)
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._refs = []
+        self._digests = []
+        self._providers = []
+        self._positions = {}
+
+    def _publish(self):
+        """Publicar matriz y referencias como una sola tupla para las consultas sin lock"""
+        self._view = (self._matrix, self._refs)
+
+    # --- Mantenimiento ---
+
+    def refresh(self):
+        super().refresh()
+        self.persist_pending()
+
+    def _rebuild(self):
+        self._reset()
+        self._load()
+        rows = [(item_type, row) for item_type in ITEM_TYPES for row in document_rows(item_type)]
+        if self._apply(rows, scope=None):
+            self._save(self._snapshot())
+            self._saved_at = self._clock()
+            self._unsaved = False
+        self._publish()
+
+    def _adopt(self, shadow):
+        super()._adopt(shadow)
+        self._publish()
+
+    def _update(self, refs):
+        ids_by_type = {}
+        for item_type, item_id in refs:
+            ids_by_type.setdefault(item_type, []).append(item_id)
+        rows = [(item_type, row) for item_type, ids in ids_by_type.items() for row in document_rows(item_type, ids)]
+        if self._apply(rows, scope=refs):
+            self._unsaved = True
+
+    def _provider_refs(self, provider_ids):
+        return [ref for ref, provider_id in zip(self._refs, self._providers) if provider_id in provider_ids]
+
+    def _apply(self, rows, scope):
+        """
+        Conciliar la matriz con las filas leídas de la base de datos.
+
+        scope=None concilia todo el catálogo; si no, solo esas referencias.
+        Solo se calculan embeddings de los items nuevos o con texto distinto.
+        Devuelve True si la matriz cambió.
+        """
+        wanted = {}
+        for item_type, row in rows:
+            if row.status == 'activo':
+                text = document_text(row)
+                wanted[(item_type, row.id)] = (text, _digest(text), row.provider_id)
+
+        keep = []
+        for position, ref in enumerate(self._refs):
+            if scope is not None and ref not in scope:
+                keep.append(position)
+            elif ref in wanted and wanted[ref][1] == self._digests[position]:
+                keep.append(position)
+                self._providers[position] = wanted[ref][2]
+        kept_refs = {self._refs[position] for position in keep}
+        changed = [ref for ref in wanted if ref not in kept_refs]
+        if len(keep) == len(self._refs) and not changed:
+            return False
+
+        new_vectors = self.embedder.embed([wanted[ref][0] for ref in changed]) if changed else None
+        blocks = [self._matrix[keep]] if keep else []
+        if new_vectors is not None:
+            blocks.append(new_vectors)
+        if blocks:
+            self._matrix = np.ascontiguousarray(np.vstack(blocks), dtype=np.float32)
+        else:
+            self._matrix = np.zeros((0, self._matrix.shape[1]), dtype=np.float32)
+        self._refs = [self._refs[position] for position in keep] + changed
+        self._digests = [self._digests[position] for position in keep] + [wanted[ref][1] for ref in changed]
+        self._providers = [self._providers[position] for position in keep] + [wanted[ref][2] for ref in changed]
+        self._positions = {ref: position for position, ref in enumerate(self._refs)}
+        self._publish()
+        return True
+
+    # --- Persistencia ---
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data['signature']) != self.embedder.signature:
+                    return
+                matrix = data['matrix'].astype(np.float32)
+                refs = [(item_type, int(item_id)) for item_type, item_id in
+                        (ref.split(':') for ref in data['refs'].tolist())]
+                digests = data['digests'].tolist()
+        except Exception as e:
+            print(f"⚠️ No se pudo cargar el índice semántico ({self.path}): {e}")
+            return
+        self._matrix = np.ascontiguousarray(matrix)
+        self._refs = refs
+        self._digests = digests
+        self._providers = [None] * len(refs)
+        self._positions = {ref: position for position, ref in enumerate(refs)}
+
+    def _snapshot(self):
+        """Estado a persistir; _apply reemplaza matriz y listas en lugar de modificarlas"""
+        return self.path, self._matrix, self._refs, self._digests, self.embedder.signature
+
+    def persist_pending(self):
+        """
+        Guardar en segundo plano los cambios incrementales sin persistir.
+
+        Solo si pasaron save_interval segundos desde el último guardado y no
+        hay otro en curso; devuelve el hilo lanzado o None.
+        """
+        with self._lock:
+            if not self._unsaved or not self.path or (self._saver and self._saver.is_alive()):
+                return None
+            if self._saved_at is not None and self._clock() - self._saved_at < self.save_interval:
+                return None
+            self._saver = threading.Thread(target=self._save, args=(self._snapshot(),),
+                                           name='semantic-index-save', daemon=True)
+            self._saved_at = self._clock()
+            self._unsaved = False
+            self._saver.start()
+            return self._saver
+
+    @staticmethod
+    def _save(snapshot):
+        path, matrix, refs, digests, signature = snapshot
+        if not path:
+            return
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        handle = tempfile.NamedTemporaryFile(dir=directory, prefix=os.path.basename(path) + '.',
+                                             suffix='.tmp', delete=False)
+        try:
+            with handle:
+                np.savez(
+                    handle,
+                    matrix=matrix,
+                    refs=np.array([f"{item_type}:{item_id}" for item_type, item_id in refs], dtype=str),
+                    digests=np.array(digests, dtype=str),
+                    signature=np.array(signature)
+                )
+            os.replace(handle.name, path)
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar el índice semántico ({path}): {e}")
+            try:
+                os.unlink(handle.name)
+            except OSError:
+                pass
+
+    # --- Consulta ---
+
+    def search(self, query, k=100, min_score=None, timeout=None, refresh=True):
+        """
+        Top-k items más similares a la consulta: lista de (ref, score) descendente.
+
+        Un producto matriz-vector da la similitud coseno de todas las filas y
+        argpartition selecciona las k mayores sin ordenar toda la matriz.
+        timeout limita el cálculo del embedding de la consulta (embedders
+        remotos). Con refresh=False no se aplican los cambios pendientes y
+        no se toma el lock: se consulta la última matriz publicada.
+        """
+        if refresh:
+            self.refresh()
+        matrix, refs = self._view
+        total = len(refs)
+        if not total or not query.strip():
+            return []
+        vector = self.embedder.embed([query], timeout=timeout)[0]
+        scores = matrix @ vector
+        k = min(k, total)
+        top = np.argpartition(-scores, k - 1)[:k] if k < total else np.arange(total)
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [
+            (refs[position], float(scores[position]))
+            for position in top
+            if min_score is None or scores[position] >= min_score
+        ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "built": self._built,
+                "documents": len(self._refs),
+                "dimensions": int(self._matrix.shape[1]),
+                "embedder": self.embedder.signature,
+                "persisted": bool(self.path),
+                "pending": self.pending()
+            }
+
+    def __len__(self):
+        return len(self._refs)
+
+
+semantic_index = register_index(SemanticIndex())
+
+# Etapa IA de /catalog/search: si el embedder falla o excede el presupuesto,
+# el circuito se abre y la búsqueda sigue solo con filtros estructurados
+semantic_breaker = CircuitBreaker('semantic_search')
+
+
+def init_semantic_index(app):
+    """Configurar el embedder, el archivo y el circuit breaker del índice semántico desde la app"""
+    name = app.config.get('SEMANTIC_EMBEDDER', 'hashing')
+    if name == 'openai':
+        embedder = OpenAIEmbedder(base_url=app.config.get('SEMANTIC_EMBEDDER_URL') or None)
+    else:
+        embedder = EMBEDDERS[name]() if name in EMBEDDERS else HashingEmbedder()
+    semantic_index.configure(
+        embedder=embedder,
+        path=app.config.get('SEMANTIC_INDEX_PATH') or None,
+        save_interval=app.config.get('SEMANTIC_INDEX_SAVE_SECONDS', 300)
+    )
+    semantic_breaker.configure(
+        failure_threshold=app.config.get('SEARCH_AI_BREAKER_FAILURES', 5),
+        reset_timeout=app.config.get('SEARCH_AI_BREAKER_RESET_SECONDS', 30)
+    )
+    semantic_breaker.reset()
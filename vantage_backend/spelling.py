@@ -0,0 +1,169 @@
+"""
+Sugerencias ortográficas ("¿quisiste decir?") para la búsqueda del catálogo.
+
+Usa un diccionario de borrado simétrico (symmetric delete): cada palabra del
+vocabulario del catálogo se registra junto con todas sus variantes con hasta
+MAX_EDIT_DISTANCE letras borradas. Para corregir una palabra basta generar
+sus propios borrados y buscarlos en el diccionario, sin recorrer el
+vocabulario ni la base de datos; los candidatos se verifican con la
+distancia de Damerau-Levenshtein.
+
+El vocabulario sale del índice invertido del buscador (search_index). Las
+actualizaciones incrementales del índice se aplican al diccionario palabra
+por palabra (altas, bajas y frecuencias); solo una reconstrucción completa
+del índice reconstruye el diccionario.
+"""
+import threading
+from .search_index import catalog_search_index, tokenize
+
+MAX_EDIT_DISTANCE = 2
+MIN_WORD_LENGTH = 3
+
+
+def _deletes(word, max_distance):
+    """Variantes de la palabra con hasta max_distance letras borradas"""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for variant in frontier:
+            if len(variant) <= 1:
+                continue
+            for i in range(len(variant)):
+                next_frontier.add(variant[:i] + variant[i + 1:])
+        next_frontier -= results
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def edit_distance(a, b):
+    """Distancia de Damerau-Levenshtein (alineamiento óptimo de cadenas)"""
+    previous_row = None
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before_previous, previous_row = previous_row, row
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], before_previous[j - 2] + 1)
+    return row[len(b)]
+
+
+class SymmetricDeleteDictionary:
+    """Diccionario de corrección por borrado simétrico"""
+
+    def __init__(self, max_distance=MAX_EDIT_DISTANCE):
+        self.max_distance = max_distance
+        self._words = {}     # palabra -> frecuencia
+        self._deletes = {}   # borrado -> {palabras}
+
+    def add(self, word, frequency=1):
+        if word in self._words:
+            self._words[word] += frequency
+            return
+        self._words[word] = frequency
+        for variant in _deletes(word, self.max_distance):
+            self._deletes.setdefault(variant, set()).add(word)
+
+    def remove(self, word):
+        if self._words.pop(word, None) is None:
+            return
+        for variant in _deletes(word, self.max_distance):
+            words = self._deletes.get(variant)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self._deletes[variant]
+
+    def adjust(self, word, delta):
+        """Sumar delta a la frecuencia de una palabra (la agrega o la quita según corresponda)"""
+        frequency = self._words.get(word, 0) + delta
+        if frequency <= 0:
+            self.remove(word)
+        elif word in self._words:
+            self._words[word] = frequency
+        else:
+            self.add(word, frequency)
+
+    def lookup(self, word):
+        """
+        Mejor corrección de una palabra: (palabra, distancia) o None.
+
+        Una palabra conocida se devuelve tal cual; si no, gana la menor
+        distancia y, a igual distancia, la palabra más frecuente.
+        """
+        if word in self._words:
+            return word, 0
+        best = None
+        for variant in _deletes(word, self.max_distance):
+            for candidate in self._deletes.get(variant, ()):
+                distance = edit_distance(word, candidate)
+                if distance > self.max_distance:
+                    continue
+                key = (distance, -self._words[candidate], candidate)
+                if best is None or key < best:
+                    best = key
+        if best is None:
+            return None
+        return best[2], best[0]
+
+    def __len__(self):
+        return len(self._words)
+
+
+def _spellable(word):
+    return len(word) >= MIN_WORD_LENGTH and not word.isdigit()
+
+
+class CatalogSpeller:
+    """Diccionario del vocabulario del catálogo, al día con los cambios del índice"""
+
+    def __init__(self, index):
+        self._index = index
+        self._lock = threading.Lock()
+        self._dictionary = SymmetricDeleteDictionary()
+        self._generation = None
+
+    def dictionary(self):
+        with self._lock:
+            generation, vocabulary, changes = self._index.vocabulary_changes(self._generation)
+            if vocabulary is not None:
+                dictionary = SymmetricDeleteDictionary()
+                for word, frequency in vocabulary.items():
+                    if _spellable(word):
+                        dictionary.add(word, frequency)
+                self._dictionary = dictionary
+            else:
+                for word, delta in changes.items():
+                    if delta and _spellable(word):
+                        self._dictionary.adjust(word, delta)
+            self._generation = generation
+            return self._dictionary
+
+    def suggest(self, query):
+        """
+        Corregir cada palabra de la consulta.
+
+        Devuelve (sugerencia, correcciones); sugerencia es None si no hubo
+        nada que corregir. Las palabras desconocidas sin candidato se dejan
+        como están.
+        """
+        dictionary = self.dictionary()
+        words = tokenize(query)
+        corrections = []
+        corrected = []
+        for word in words:
+            match = dictionary.lookup(word) if _spellable(word) else None
+            if match and match[1] > 0:
+                corrections.append({"word": word, "suggestion": match[0], "distance": match[1]})
+                corrected.append(match[0])
+            else:
+                corrected.append(word)
+        suggestion = ' '.join(corrected) if corrections else None
+        return suggestion, corrections
+
+
+catalog_speller = CatalogSpeller(catalog_search_index)
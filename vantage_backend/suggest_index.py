@@ -0,0 +1,278 @@
+"""
+Índice de prefijos para el autocompletado del buscador del catálogo.
+
+Guarda nombres de productos y servicios, SKUs, categorías y proveedores
+como una lista ordenada de claves normalizadas (minúsculas, sin tildes),
+una por cada palabra inicial del texto, de modo que "hidr" encuentra
+"Bomba hidráulica". Una consulta es un bisect más un recorrido corto de
+las claves con ese prefijo, sin tocar la base de datos.
+
+Las sugerencias se ordenan por destacado y popularidad (cotizaciones
+pedidas del item, o items activos de la categoría o proveedor). Los
+prefijos con más de MAX_SCANNED_KEYS claves (p. ej. "a") no se recorren en
+cada consulta: la primera vez se calculan sus mejores BEST_PER_PREFIX
+entradas por tipo con un recorrido completo y luego esas listas se
+mantienen con cada cambio, así el tope nunca deja fuera a las mejores. Los
+cambios del catálogo se aplican de forma incremental (ver catalog_indexes).
+"""
+import heapq
+import itertools
+import unicodedata
+from bisect import bisect_left, insort
+from sqlalchemy import select, func
+from .models import db, Product, Service, ProviderProfile, Category, QuoteRequest
+from .catalog_indexes import CatalogIndex, register_index, ITEM_TYPES
+
+SUGGESTION_TYPES = ('producto', 'servicio', 'sku', 'categoria', 'proveedor')
+
+# Máximo de claves recorridas por consulta; los prefijos con más claves
+# (muy cortos, como "a") usan listas precalculadas de las mejores entradas
+MAX_SCANNED_KEYS = 2000
+
+# Entradas guardadas por tipo en cada lista precalculada (límite máximo de /suggest)
+BEST_PER_PREFIX = 20
+
+
+def normalize(text):
+    """Minúsculas, sin tildes y con espacios simples"""
+    plain = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode()
+    return ' '.join(plain.lower().split())
+
+
+def _word_suffixes(text):
+    """'bomba hidraulica 2' -> ['bomba hidraulica 2', 'hidraulica 2', '2']"""
+    words = normalize(text).split()
+    return [' '.join(words[i:]) for i in range(len(words))]
+
+
+def _rank(entry_key, entry):
+    """Destacados y más populares primero; a igual rango, el texto más corto"""
+    return (not entry['featured'], -entry['popularity'], len(entry['text']), entry['text'], entry_key)
+
+
+class SuggestIndex(CatalogIndex):
+    """Lista ordenada de (clave, entrada) consultada con bisect"""
+
+    name = 'suggest'
+    _state = ('_keys', '_entries', '_best')
+
+    def __init__(self):
+        super().__init__()
+        self._keys = []       # [(clave normalizada, (tipo, id))] ordenada
+        self._entries = {}    # (tipo, id) -> {'text', 'featured', 'popularity', 'provider_id', 'category_id'}
+        self._best = {}       # prefijo con muchas claves -> {tipo: [rango, ...] ordenada, hasta BEST_PER_PREFIX}
+
+    # --- Mantenimiento ---
+
+    def _rebuild(self):
+        self._keys = []
+        self._entries = {}
+        self._best = {}
+        for entry_key, entry in self._load_items():
+            self._put(entry_key, entry, sort=False)
+        for entry_key, entry in self._load_groups():
+            self._put(entry_key, entry, sort=False)
+        self._keys.sort()
+
+    def _update(self, refs):
+        touched_providers, touched_categories = set(), set()
+        for item_type, item_id in refs:
+            for entry_key in ((item_type, item_id), ('sku', item_id) if item_type == 'producto' else None):
+                entry = self._entries.get(entry_key) if entry_key else None
+                if entry:
+                    touched_providers.add(entry['provider_id'])
+                    touched_categories.add(entry['category_id'])
+                    self._drop(entry_key)
+
+        for entry_key, entry in self._load_items(refs):
+            touched_providers.add(entry['provider_id'])
+            touched_categories.add(entry['category_id'])
+            self._put(entry_key, entry)
+
+        # Los contadores de proveedores y categorías afectados
+        for entry_key in [('proveedor', pid) for pid in touched_providers] + [('categoria', cid) for cid in touched_categories]:
+            self._drop(entry_key)
+        for entry_key, entry in self._load_groups(touched_providers, touched_categories):
+            self._put(entry_key, entry)
+
+    def _provider_refs(self, provider_ids):
+        return [
+            entry_key for entry_key, entry in self._entries.items()
+            if entry_key[0] in ITEM_TYPES and entry['provider_id'] in provider_ids
+        ]
+
+    def _put(self, entry_key, entry, sort=True):
+        self._entries[entry_key] = entry
+        keys = _word_suffixes(entry['text'])
+        for key in keys:
+            if sort:
+                insort(self._keys, (key, entry_key))
+            else:
+                self._keys.append((key, entry_key))
+        rank = _rank(entry_key, entry)
+        for prefix in self._best_prefixes(keys):
+            best = self._best[prefix].setdefault(entry_key[0], [])
+            insort(best, rank)
+            del best[BEST_PER_PREFIX:]
+
+    def _drop(self, entry_key):
+        entry = self._entries.pop(entry_key, None)
+        if not entry:
+            return
+        keys = _word_suffixes(entry['text'])
+        for key in keys:
+            position = bisect_left(self._keys, (key, entry_key))
+            if position < len(self._keys) and self._keys[position] == (key, entry_key):
+                del self._keys[position]
+        rank = _rank(entry_key, entry)
+        for prefix in self._best_prefixes(keys):
+            best = self._best[prefix].get(entry_key[0], [])
+            position = bisect_left(best, rank)
+            if position < len(best) and best[position] == rank:
+                if len(best) == BEST_PER_PREFIX:
+                    # La siguiente mejor quedó fuera de la lista: se recalcula al consultar
+                    del self._best[prefix]
+                else:
+                    del best[position]
+
+    def _best_prefixes(self, keys):
+        """Prefijos de estas claves que tienen lista precalculada"""
+        if not self._best:
+            return set()
+        return {key[:length] for key in keys for length in range(1, len(key) + 1) if key[:length] in self._best}
+
+    def _load_items(self, refs=None):
+        """Entradas de productos, SKUs y servicios activos (todos o los de refs)"""
+        ids_by_type = {item_type: None for item_type in ITEM_TYPES}
+        if refs is not None:
+            ids_by_type = {item_type: [item_id for t, item_id in refs if t == item_type] for item_type in ITEM_TYPES}
+
+        for item_type, model in (('producto', Product), ('servicio', Service)):
+            ids = ids_by_type[item_type]
+            if ids == []:
+                continue
+            popularity = select(
+                QuoteRequest.item_id, func.count(QuoteRequest.id).label('quotes')
+            ).where(QuoteRequest.item_type == item_type).group_by(QuoteRequest.item_id).subquery()
+            columns = [model.id, model.name, model.is_featured, model.provider_id, model.category_id,
+                       func.coalesce(popularity.c.quotes, 0).label('quotes')]
+            if model is Product:
+                columns.append(Product.sku)
+            query = select(*columns).outerjoin(popularity, popularity.c.item_id == model.id).where(model.status == 'activo')
+            if ids is not None:
+                query = query.where(model.id.in_(ids))
+
+            for row in db.session.execute(query):
+                entry = {
+                    'text': row.name or '',
+                    'featured': bool(row.is_featured),
+                    'popularity': row.quotes,
+                    'provider_id': row.provider_id,
+                    'category_id': row.category_id
+                }
+                if entry['text']:
+                    yield (item_type, row.id), entry
+                if model is Product and row.sku:
+                    yield ('sku', row.id), dict(entry, text=row.sku)
+
+    def _load_groups(self, provider_ids=None, category_ids=None):
+        """Entradas de proveedores y categorías con items activos (popularidad = nº de items)"""
+        for entry_type, model, column, ids in (
+            ('proveedor', ProviderProfile, ProviderProfile.company_name, provider_ids),
+            ('categoria', Category, Category.name, category_ids)
+        ):
+            if ids is not None and not ids:
+                continue
+            foreign_key = 'provider_id' if entry_type == 'proveedor' else 'category_id'
+            counts = select(
+                getattr(Product, foreign_key).label('group_id'), Product.id.label('item_id')
+            ).where(Product.status == 'activo').union_all(
+                select(getattr(Service, foreign_key), Service.id).where(Service.status == 'activo')
+            ).subquery()
+            query = select(model.id, column.label('text'), func.count(counts.c.item_id).label('items')).join(
+                counts, counts.c.group_id == model.id
+            ).group_by(model.id, column)
+            if ids is not None:
+                query = query.where(model.id.in_(ids))
+
+            for row in db.session.execute(query):
+                if row.text:
+                    yield (entry_type, row.id), {
+                        'text': row.text,
+                        'featured': False,
+                        'popularity': row.items,
+                        'provider_id': row.id if entry_type == 'proveedor' else None,
+                        'category_id': row.id if entry_type == 'categoria' else None
+                    }
+
+    # --- Consulta ---
+
+    def suggest(self, prefix, limit=8, types=None):
+        """
+        Sugerencias cuyo texto (o alguna de sus palabras) empieza por el prefijo.
+
+        Devuelve hasta limit dicts {text, type, id}, destacados y más
+        populares primero; a igual rango, el texto más corto.
+        """
+        self.refresh()
+        needle = normalize(prefix)
+        if not needle:
+            return []
+        with self._lock:
+            lists = self._best.get(needle)
+            if lists is None and self._range_exceeds(needle, MAX_SCANNED_KEYS):
+                lists = self._compute_best(needle)
+            if lists is not None and limit <= BEST_PER_PREFIX:
+                ranks = heapq.merge(*(best for entry_type, best in lists.items() if types is None or entry_type in types))
+                best = [rank[-1] for rank in itertools.islice(ranks, limit)]
+            else:
+                found = {entry_key for entry_key in self._scan(needle) if types is None or entry_key[0] in types}
+                best = [rank[-1] for rank in heapq.nsmallest(
+                    limit, (_rank(entry_key, self._entries[entry_key]) for entry_key in found)
+                )]
+            return [{
+                'text': self._entries[entry_key]['text'],
+                'type': entry_key[0],
+                'id': entry_key[1]
+            } for entry_key in best]
+
+    def _scan(self, needle):
+        """Entradas de las claves que empiezan por needle, en orden de clave"""
+        position = bisect_left(self._keys, (needle,))
+        while position < len(self._keys):
+            key, entry_key = self._keys[position]
+            if not key.startswith(needle):
+                return
+            yield entry_key
+            position += 1
+
+    def _range_exceeds(self, needle, count):
+        """¿Hay más de count claves con este prefijo? (sin recorrerlas)"""
+        position = bisect_left(self._keys, (needle,)) + count
+        return position < len(self._keys) and self._keys[position][0].startswith(needle)
+
+    def _compute_best(self, needle):
+        """Mejores entradas por tipo de un prefijo (recorrido completo, una vez)"""
+        by_type = {}
+        for entry_key in set(self._scan(needle)):
+            by_type.setdefault(entry_key[0], []).append(_rank(entry_key, self._entries[entry_key]))
+        lists = self._best[needle] = {
+            entry_type: heapq.nsmallest(BEST_PER_PREFIX, ranks) for entry_type, ranks in by_type.items()
+        }
+        return lists
+
+    def stats(self):
+        with self._lock:
+            return {
+                "built": self._built,
+                "entries": len(self._entries),
+                "keys": len(self._keys),
+                "best_prefixes": len(self._best),
+                "pending": self.pending()
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+suggest_index = register_index(SuggestIndex())
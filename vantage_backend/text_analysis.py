@@ -0,0 +1,82 @@
+"""
+Análisis de texto en español para la búsqueda del catálogo.
+
+analyze(text) produce los términos con los que se indexa y se consulta:
+minúsculas sin tildes, sin palabras vacías ("de", "para", "con"...), con
+un stemming liviano (plural y género: "válvulas" -> "valvul", "bombas" y
+"bomba" -> "bomb") y con los códigos que llevan dígitos (SKU, modelos,
+normas) conservados enteros además de sus partes ("SKU-00012" ->
+"sku00012", "sku", "00012"), para que "sku-0001" o "SKU 00012" los
+encuentren.
+
+Los términos de cada producto y servicio se guardan en
+catalog_items.search_tokens al escribir el item; en la consulta solo se
+analiza el texto buscado.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+_WORD_RE = re.compile(r'[a-z0-9]+(?:[-_/.][a-z0-9]+)*')
+_SEPARATOR_RE = re.compile(r'[-_/.]')
+
+STOPWORDS = frozenset("""
+a al algo algunas algunos ante antes aun como con contra cual cuando de del desde donde durante e el
+ella ellas ellos en entre era es esa esas ese eso esos esta estan estas este esto estos fue ha hasta
+hay la las le les lo los mas me mi muy nada ni no nos o otra otras otro otros para pero poco por
+porque que quien se sea ser si sin sobre su sus tambien tan tanto te todo todos tu un una unas uno
+unos y ya
+""".split())
+
+
+def fold(text):
+    """Minúsculas sin tildes ni diéresis ('Hidráulica' -> 'hidraulica'); la ñ queda como n"""
+    decomposed = unicodedata.normalize('NFKD', (text or '').lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def stem(word):
+    """Stemming liviano: quita el plural y la vocal final de género ('motores' -> 'motor')"""
+    if len(word) > 5 and word.endswith(('ciones', 'siones')):
+        return word[:-2]
+    if len(word) > 4 and word.endswith('ces'):
+        return word[:-3] + 'z'
+    if len(word) > 4 and word.endswith('es') and word[-3] in 'lrndj':
+        word = word[:-2]
+    elif len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+    if len(word) > 4 and word[-1] in 'aoe':
+        word = word[:-1]
+    return word
+
+
+def _terms(chunk):
+    if any(char.isdigit() for char in chunk):
+        parts = [part for part in _SEPARATOR_RE.split(chunk) if part]
+        if len(parts) == 1:
+            return [chunk]
+        return [''.join(parts)] + parts
+    terms = []
+    for word in _SEPARATOR_RE.split(chunk):
+        if len(word) > 1 and word not in STOPWORDS:
+            terms.append(stem(word))
+    return terms
+
+
+def analyze(text):
+    """Términos de un texto (con repeticiones, en orden de aparición)"""
+    terms = []
+    for chunk in _WORD_RE.findall(fold(text)):
+        terms.extend(_terms(chunk))
+    return terms
+
+
+def analyze_fields(*values):
+    """Términos de varios campos, como texto listo para guardar ('bomb centrifug ...')"""
+    return ' '.join(analyze(' '.join(value for value in values if value)))
+
+
+@lru_cache(maxsize=4096)
+def analyze_name(name):
+    """Términos de nombres muy repetidos (categorías, proveedores), cacheados"""
+    return tuple(analyze(name))